@@ -0,0 +1,62 @@
+"""
+Production app server config: gunicorn -c app/gunicorn.conf.py
+
+The Django app is imported and warmed up once in the master
+(preload_app), then workers are forked and share it copy-on-write.
+Worker count, class and timeouts come from the APP_SERVER_* settings.
+"""
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from app import warmup  # noqa: E402
+from monitoring import metrics  # noqa: E402
+from station import exports  # noqa: E402
+
+bind = settings.APP_SERVER_BIND
+workers = settings.APP_SERVER_WORKERS
+worker_class = settings.APP_SERVER_WORKER_CLASS
+timeout = settings.APP_SERVER_TIMEOUT
+graceful_timeout = settings.APP_SERVER_GRACEFUL_TIMEOUT
+keepalive = settings.APP_SERVER_KEEPALIVE
+max_requests = settings.APP_SERVER_MAX_REQUESTS
+max_requests_jitter = settings.APP_SERVER_MAX_REQUESTS // 10
+preload_app = True
+
+if worker_class == "sync":
+    wsgi_app = "app.wsgi:application"
+else:
+    wsgi_app = "app.asgi:application"
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    metrics.clear_directory()
+
+
+def when_ready(server):
+    warmup.warm_up()
+    warmup.freeze_heap()
+    server.log.info("Warmed up URL resolvers, serializers and database")
+
+
+def post_worker_init(worker):
+    warmup.warm_worker()
+    if worker_class == "sync":
+        exports.worker_heartbeat = worker.notify
+
+
+def worker_exit(server, worker):
+    # Recycled (max_requests) workers keep their last counts
+    metrics.REGISTRY.close()
+
+
+def child_exit(server, worker):
+    metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,152 @@
+"""
+Read replicas (REPLICA_DATABASES). Safe requests to views using
+ReplicaReadsMixin read from a replica; writes, reads in a transaction
+and every other view use the primary.
+
+A user who just ordered reads from the primary for REPLICA_STICKY_SECONDS
+(a signed cookie bound to the user, so every worker process sees it), to
+find their own order and seats. A replica lagging more than
+REPLICA_MAX_LAG_SECONDS, or failing its lag check, is skipped.
+"""
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from monitoring.db import replica_lag
+from monitoring.metrics import DB_PRIMARY_READS, DB_REPLICA_LAG
+
+PIN_SALT = "app.replicas.pin"
+
+# Alias reads are routed to in this request, None for the primary
+_read_database = ContextVar("read_database", default=None)
+# Alias: (monotonic time of the check, lag or None)
+_lag_checks = {}
+_rotation = itertools.count()
+
+
+@contextmanager
+def reads_from(alias):
+    """Route reads outside transactions to `alias` (None: the primary)"""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        # A transaction reads what it wrote, and locks, on the primary
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def checked_lag(alias):
+    """Lag of a replica, checked at most every REPLICA_LAG_CHECK_SECONDS"""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    interval = settings.REPLICA_LAG_CHECK_SECONDS
+    if checked is None or now - checked[0] >= interval:
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            lag = None
+        checked = _lag_checks[alias] = (now, lag)
+        DB_REPLICA_LAG.set(-1 if lag is None else lag, database=alias)
+
+    return checked[1]
+
+
+def healthy_replica():
+    """The next replica in rotation close enough to the primary, or None"""
+    replicas = settings.REPLICA_DATABASES
+    start = next(_rotation)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        lag = checked_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+            return alias
+
+    return None
+
+
+def pin_to_primary(response, user_id):
+    """Send the user's reads to the primary until the replicas catch up"""
+    response.set_cookie(
+        settings.REPLICA_PIN_COOKIE,
+        signing.TimestampSigner(salt=PIN_SALT).sign(str(user_id)),
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def pinned_to_primary(cookies, user_id):
+    value = cookies.get(settings.REPLICA_PIN_COOKIE)
+    if value is None or user_id is None:
+        return False
+    try:
+        pinned_user = signing.TimestampSigner(salt=PIN_SALT).unsign(
+            value, max_age=settings.REPLICA_STICKY_SECONDS
+        )
+    except signing.BadSignature:
+        return False
+
+    return pinned_user == str(user_id)
+
+
+def read_database(cookies, user_id):
+    """Replica a user's safe request reads from, None for the primary"""
+    if not settings.REPLICA_DATABASES:
+        return None
+    if pinned_to_primary(cookies, user_id):
+        DB_PRIMARY_READS.inc(reason="pinned")
+        return None
+
+    alias = healthy_replica()
+    if alias is None:
+        DB_PRIMARY_READS.inc(reason="lagging")
+    return alias
+
+
+class ReplicaReadsMixin:
+    """
+    Safe requests of a DRF view read from a replica, once authenticated.
+    `primary_actions` keep reading the primary, e.g. to fill a cache.
+    """
+
+    primary_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(self, "action", None) not in self.primary_actions
+        ):
+            self._read_token = _read_database.set(
+                read_database(request.COOKIES, request.user.pk)
+            )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = self.__dict__.pop("_read_token", None)
+        if token is not None:
+            _read_database.reset(token)
+        return super().finalize_response(request, response, *args, **kwargs)
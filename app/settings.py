@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import copy
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -40,17 +41,23 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_spectacular",
     "station",
     "user",
-
+    "monitoring",
+    "taskqueue",
 ]
 
 AUTH_USER_MODEL = "user.User"
 
 MIDDLEWARE = [
+    # Outermost, so its own queries stay out of the timing and budgets
+    "monitoring.middleware.RequestProfilingMiddleware",
+    "monitoring.middleware.ServerTimingMiddleware",
+    "monitoring.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,9 +99,72 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Connection reuse: a psycopg pool per process when POSTGRES_POOL_MAX_SIZE
+# is set, otherwise persistent connections kept for CONN_MAX_AGE seconds.
+# Django does not allow both at once.
+if os.environ.get("POSTGRES_POOL_MAX_SIZE"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ["POSTGRES_POOL_MAX_SIZE"]),
+            "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.environ.get("POSTGRES_POOL_MAX_IDLE", 300)),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("POSTGRES_CONN_MAX_AGE", 60)
+    )
+
+# Read replicas: comma-separated host[:port] of hot standbys of the
+# primary, aliased replica1, replica2... (app.replicas). Tests read the
+# primary through them.
+REPLICA_DATABASES = []
+for number, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")),
+    start=1,
+):
+    host, _, port = address.strip().partition(":")
+    replica = copy.deepcopy(DATABASES["default"])
+    replica.update(
+        HOST=host,
+        PORT=port or DATABASES["default"]["PORT"],
+        TEST={"MIRROR": "default"},
+    )
+    # A replica that is down costs requests no more than this to skip
+    replica.setdefault("OPTIONS", {})["connect_timeout"] = int(
+        os.environ.get("POSTGRES_REPLICA_CONNECT_TIMEOUT", 2)
+    )
+    DATABASES[f"replica{number}"] = replica
+    REPLICA_DATABASES.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["app.replicas.ReplicaRouter"]
+# Replicas further behind the primary are skipped, their reads go to it
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", 5))
+# Seconds a worker process trusts the lag it last measured on a replica
+REPLICA_LAG_CHECK_SECONDS = 2
+# After ordering, a user reads from the primary for this long
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 15))
+REPLICA_PIN_COOKIE = "primary_reads"
+
+# Cache shared by every app server process and container, so that the
+# entries dropped by a write (station.signals, user.authentication) are
+# gone for all of them: Redis at CACHE_REDIS_URL. Without it, each process
+# has its own memory cache, which only a single process may serve from
+# (see app.warmup.check_cache).
+if os.environ.get("CACHE_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["CACHE_REDIS_URL"],
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,6 +209,23 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/files/media"
 
+# Internal location the front proxy serves MEDIA_ROOT from; when set,
+# media responses carry X-Accel-Redirect instead of the file body.
+MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT", "")
+
+STORAGES = {
+    "default": {
+        "BACKEND": "station.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Downscaled WebP copies of uploaded train images: name -> max side in px
+TRAIN_IMAGE_VARIANTS = {"thumbnail": 320, "medium": 1024}
+IMAGE_VARIANT_QUALITY = 80
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -146,13 +233,21 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Filters declared in a view's query_filters (station.filters)
+    "DEFAULT_FILTER_BACKENDS": ["station.filters.DeclaredFilterBackend"],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "station.throttling.AnonSlidingWindowThrottle",
+        "station.throttling.ScopedUserSlidingWindowThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "1000/day", "user": "100/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "1000/day",
+        "user": "100/day",
+        "browsing": "2000/day",
+        "booking": "100/day",
+        "export": "50/day",
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
 }
 
@@ -173,4 +268,135 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+}
+
+# Seconds a cached (is_active, is_staff) of a token user is trusted
+AUTH_USER_STATE_TTL = 30
+
+# Live seat availability stream (station.events)
+JOURNEY_FEED_POLL_SECONDS = 1.0
+JOURNEY_FEED_HEARTBEAT_SECONDS = 15
+
+# Cached /journeys/calendar/ months, dropped early when their journeys or
+# tickets change
+JOURNEY_CALENDAR_CACHE_SECONDS = 3600
+
+# Cached /journeys/search/ results, dropped early when their journeys or
+# tickets change (station.searches)
+JOURNEY_SEARCH_CACHE_SECONDS = 600
+# Longest a miss waits for the same search running in another thread
+# before querying itself
+JOURNEY_SEARCH_WAIT_SECONDS = 5
+
+# Cache warm-up (station.warming, manage.py warm_caches): the searches and
+# calendar months of the WARM_CACHES_LIMIT hottest station pairs for the
+# next 24 hours, WARM_CACHES_WORKERS at a time. Hot pairs are listed in
+# WARM_SEARCHES_FILE, else are the ones with the most departures. With
+# WARM_CACHES_ON_START the app server master fills them before forking.
+WARM_CACHES_ON_START = bool(int(os.environ.get("WARM_CACHES_ON_START", 0)))
+WARM_SEARCHES_FILE = os.environ.get("WARM_SEARCHES_FILE", "")
+WARM_CACHES_LIMIT = int(os.environ.get("WARM_CACHES_LIMIT", 50))
+WARM_CACHES_WORKERS = int(os.environ.get("WARM_CACHES_WORKERS", 4))
+
+# Paginated querysets the planner estimates at this many rows or more are
+# counted from the estimate instead of SELECT COUNT(*) (station.pagination)
+ESTIMATED_COUNT_THRESHOLD = int(
+    os.environ.get("ESTIMATED_COUNT_THRESHOLD", 100_000)
+)
+# Seconds an estimated count is reused for the same query, so paging
+# through a big listing counts it once
+ESTIMATED_COUNT_CACHE_SECONDS = int(
+    os.environ.get("ESTIMATED_COUNT_CACHE_SECONDS", 300)
+)
+
+# Fraction of requests timed by monitoring.middleware.ServerTimingMiddleware
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_TIMING_SAMPLE_RATE", 1.0)
+)
+# Sampled requests slower than this are logged as warnings
+REQUEST_TIMING_SLOW_MS = 500
+
+# monitoring.middleware.RequestProfilingMiddleware: off, it is not loaded
+REQUEST_PROFILING = bool(int(os.environ.get("REQUEST_PROFILING", 0)))
+# Fraction of all requests profiled without being asked to
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", 0.0)
+)
+REQUEST_PROFILING_TOP_ALLOCATIONS = 25
+# Stored profiles older than this are pruned
+REQUEST_PROFILING_RETENTION_DAYS = 7
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "monitoring.formatters.JSONFormatter"},
+    },
+    "handlers": {
+        "json_console": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+        },
+    },
+    "loggers": {
+        "monitoring.requests": {
+            "handlers": ["json_console"],
+            # INFO logs every sampled request, WARNING only slow ones
+            "level": os.environ.get("REQUEST_TIMING_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
+# monitoring.metrics: with a directory, /metrics aggregates the values of
+# every app server process; without one, of the answering process only
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = 1.0
+# /metrics answers staff users and scrapers sending this bearer token
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Production app server (app/gunicorn.conf.py)
+APP_SERVER_BIND = os.environ.get("APP_SERVER_BIND", "0.0.0.0:8000")
+# Several workers need the shared cache (CACHE_REDIS_URL), one without it
+APP_SERVER_WORKERS = int(
+    os.environ.get(
+        "APP_SERVER_WORKERS",
+        2 * (os.cpu_count() or 1) + 1
+        if os.environ.get("CACHE_REDIS_URL")
+        else 1,
+    )
+)
+# "sync" serves app.wsgi; "uvicorn.workers.UvicornWorker" serves app.asgi
+APP_SERVER_WORKER_CLASS = os.environ.get("APP_SERVER_WORKER_CLASS", "sync")
+APP_SERVER_TIMEOUT = int(os.environ.get("APP_SERVER_TIMEOUT", 30))
+APP_SERVER_GRACEFUL_TIMEOUT = int(
+    os.environ.get("APP_SERVER_GRACEFUL_TIMEOUT", 30)
+)
+APP_SERVER_KEEPALIVE = int(os.environ.get("APP_SERVER_KEEPALIVE", 5))
+APP_SERVER_MAX_REQUESTS = int(
+    os.environ.get("APP_SERVER_MAX_REQUESTS", 1000)
+)
+
+# Outgoing mail, printed to the console unless a backend is configured
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DEFAULT_FROM_EMAIL", "noreply@trainstation.local"
+)
+
+# Database task queue (taskqueue app, `manage.py run_workers`)
+TASK_QUEUE_WORKERS = int(os.environ.get("TASK_QUEUE_WORKERS", 2))
+TASK_QUEUE_BATCH_SIZE = 10
+TASK_QUEUE_POLL_SECONDS = 1.0
+# A running task not finished within this is handed to another worker
+TASK_QUEUE_LEASE_SECONDS = 300
+TASK_QUEUE_MAX_ATTEMPTS = 3
+# Doubled after every failed attempt
+TASK_QUEUE_RETRY_DELAY_SECONDS = 10
+# Task name -> interval in seconds
+TASK_QUEUE_PERIODIC = {
+    "station.tasks.prune_throttle_counters": 3600,
+    "monitoring.tasks.prune_request_profiles": 86400,
 }
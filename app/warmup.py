@@ -0,0 +1,144 @@
+"""
+Warm-up of lazily built state, run in the app server master before it
+forks workers so that every worker inherits it copy-on-write instead of
+building it on its first request.
+"""
+import gc
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import SystemCheckError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+
+def warm_url_resolvers():
+    """Populate the reverse/namespace caches of every included URLconf"""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for _, namespace_resolver in resolver.namespace_dict.values():
+        namespace_resolver.reverse_dict
+
+
+def warm_serializers():
+    """Build the fields of every serializer the API viewsets can return"""
+    from station.urls import router
+
+    for _, viewset, _ in router.registry:
+        serializer_classes = {viewset.serializer_class}
+        actions = ["list", "retrieve", "create", "update"] + [
+            extra_action.__name__
+            for extra_action in viewset.get_extra_actions()
+        ]
+        for action in actions:
+            view = viewset(action=action, format_kwarg=None)
+            serializer_classes.add(view.get_serializer_class())
+
+        for serializer_class in serializer_classes:
+            serializer_class().fields
+
+
+def process_local_cache():
+    """Whether the default cache lives in this process only"""
+    return isinstance(caches["default"], LocMemCache)
+
+
+def check_cache():
+    """
+    Refuse to fork workers over a per-process cache: the entries a write
+    drops would stay cached in every other worker
+    """
+    if settings.APP_SERVER_WORKERS > 1 and process_local_cache():
+        raise ImproperlyConfigured(
+            "Several app server workers need a shared cache, "
+            "set CACHE_REDIS_URL."
+        )
+
+
+def check_filters():
+    """
+    Refuse to serve API filters no index serves: the app server runs no
+    system checks of its own
+    """
+    from station.filters import check_filter_indexes
+
+    if errors := check_filter_indexes():
+        raise SystemCheckError(
+            "\n".join(f"{error.id}: {error.msg}" for error in errors)
+        )
+
+
+def warm_caches():
+    """
+    Fill the journey caches with WARM_CACHES_ON_START, before the workers
+    serve their first search
+    """
+    from station import warming
+
+    if settings.WARM_CACHES_ON_START:
+        warming.warm_caches(
+            settings.WARM_CACHES_LIMIT, settings.WARM_CACHES_WORKERS
+        )
+
+
+def check_databases():
+    """
+    Fail fast on a bad primary database config, then drop the connections
+    and pools: sockets and pool threads must not be shared with forks.
+    A replica down is only reported: reads skip it while it fails its
+    lag checks (see app.replicas).
+    """
+    for db_conn in connections.all():
+        try:
+            with db_conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            if db_conn.alias == DEFAULT_DB_ALIAS:
+                raise
+            logger.warning(
+                "Database %s is not answering, reads go elsewhere",
+                db_conn.alias,
+                exc_info=True,
+            )
+        finally:
+            db_conn.close()
+            if hasattr(db_conn, "close_pool"):
+                db_conn.close_pool()
+
+
+def warm_up():
+    check_cache()
+    translation.activate(settings.LANGUAGE_CODE)
+    warm_url_resolvers()
+    warm_serializers()
+    check_filters()
+    warm_caches()
+    check_databases()
+
+
+def freeze_heap():
+    """
+    Move everything allocated so far out of the GC generations, so
+    collections in the workers don't write to (and copy) shared pages.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def warm_worker():
+    """
+    Fill this worker's own connection pools up front. Without a pool
+    there is nothing to keep: closing would drop the connection opened.
+    """
+    for db_conn in connections.all():
+        if not db_conn.settings_dict.get("OPTIONS", {}).get("pool"):
+            continue
+        db_conn.ensure_connection()
+        # Back to the pool, which keeps it open
+        db_conn.close()
@@ -0,0 +1,91 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from monitoring.models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "status",
+        "duration_ms",
+        "peak_kib",
+        "sampled",
+        "user",
+    )
+    list_filter = ("sampled", "view")
+    search_fields = ("path",)
+    list_select_related = ("user",)
+    exclude = ("stats",)
+    readonly_fields = ("downloads",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Download")
+    def downloads(self, profile):
+        return format_html(
+            '<a href="{}">pstats</a> | <a href="{}">allocations</a>',
+            reverse(
+                "admin:monitoring_requestprofile_stats", args=[profile.pk]
+            ),
+            reverse(
+                "admin:monitoring_requestprofile_allocations",
+                args=[profile.pk],
+            ),
+        )
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/stats/",
+                self.admin_site.admin_view(self.download_stats),
+                name="monitoring_requestprofile_stats",
+            ),
+            path(
+                "<int:pk>/allocations/",
+                self.admin_site.admin_view(self.download_allocations),
+                name="monitoring_requestprofile_allocations",
+            ),
+        ] + super().get_urls()
+
+    def get_profile(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, profile):
+            raise PermissionDenied
+        return profile
+
+    def download_stats(self, request, pk):
+        """The profile as a .prof file for pstats or snakeviz"""
+        profile = self.get_profile(request, pk)
+        return HttpResponse(
+            bytes(profile.stats),
+            content_type="application/octet-stream",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="profile-{profile.pk}.prof"'
+                )
+            },
+        )
+
+    def download_allocations(self, request, pk):
+        profile = self.get_profile(request, pk)
+        return JsonResponse(
+            profile.allocations,
+            safe=False,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="allocations-{profile.pk}.json"'
+                )
+            },
+        )
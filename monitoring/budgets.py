@@ -0,0 +1,62 @@
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def query_budget(budget):
+    """Declare the most queries a function view may issue per request"""
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+
+    return decorator
+
+
+def view_action(view, method):
+    """The viewset action a method is routed to, else the method"""
+    actions = getattr(view, "actions", None) or {}
+    return actions.get(method.lower(), method.lower())
+
+
+def view_query_budget(view, method):
+    """
+    Query budget of a resolved view for an HTTP method, or None.
+
+    Function views carry it from @query_budget, class-based views in a
+    query_budgets mapping keyed by viewset action or, for plain API
+    views, by lowercase method name.
+    """
+    budget = getattr(view, "query_budget", None)
+    if budget is not None:
+        return budget
+
+    budgets = getattr(getattr(view, "cls", None), "query_budgets", None)
+    if not budgets:
+        return None
+
+    return budgets.get(view_action(view, method))
+
+
+def _patterns(resolver, namespace=""):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = namespace
+            if pattern.namespace:
+                prefix = f"{namespace}{pattern.namespace}:"
+            yield from _patterns(pattern, prefix)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}{pattern.name}", pattern.callback
+
+
+def registered_budgets(methods=("GET",)):
+    """{(url name, method): budget or None} of every named URL"""
+    budgets = {}
+    for name, view in _patterns(get_resolver()):
+        actions = getattr(view, "actions", None)
+        for method in methods:
+            if actions is not None and method.lower() not in actions:
+                continue
+            cls = getattr(view, "cls", None)
+            if cls is not None and not hasattr(cls, method.lower()):
+                continue
+            budgets[name, method] = view_query_budget(view, method)
+    return budgets
@@ -0,0 +1,74 @@
+import time
+
+from django.db import connections
+
+POOL_STATS = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+    "requests_num",
+    "requests_queued",
+    "requests_errors",
+    "connections_num",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+def pool_stats(alias="default"):
+    """Connection reuse statistics of a database alias in this process"""
+    db_conn = connections[alias]
+    pool = getattr(db_conn, "pool", None)
+
+    if pool is None:
+        return {
+            "pooled": False,
+            "conn_max_age": db_conn.settings_dict["CONN_MAX_AGE"],
+            "connected": db_conn.connection is not None,
+        }
+
+    stats = pool.get_stats()
+    return {
+        "pooled": True,
+        **{name: stats.get(name, 0) for name in POOL_STATS},
+    }
+
+
+def check_database(alias="default"):
+    """Run a trivial query and return its round-trip time in seconds"""
+    started = time.perf_counter()
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+    return time.perf_counter() - started
+
+
+# Seconds the replica trails the primary. 0 when it streams from its
+# upstream and has replayed all the WAL received (an idle primary sends
+# none), or is not a standby. Otherwise the age of the last transaction
+# replayed: a replica that lost its upstream also has nothing left to
+# replay. NULL, unhealthy, without a WAL receiver (or without the
+# pg_read_all_stats role that shows it) or before any replay.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN receiver.status IS NULL THEN NULL
+        WHEN receiver.status = 'streaming'
+            AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    FROM (SELECT 1) AS one
+    LEFT JOIN pg_stat_wal_receiver AS receiver ON true
+"""
+
+
+def replica_lag(alias):
+    """Replication lag of a database alias in seconds, None if unknown"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(REPLICA_LAG_SQL)
+        lag = cursor.fetchone()[0]
+
+    return None if lag is None else float(lag)
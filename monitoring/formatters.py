@@ -0,0 +1,18 @@
+import json
+import logging
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, merged with the record's `fields`"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
@@ -0,0 +1,376 @@
+"""
+In-process metrics, exposed in the Prometheus text format at /metrics.
+
+Every process keeps its own values. With METRICS_DIR set, a process
+writes them to <METRICS_DIR>/<pid>.json at most every
+METRICS_FLUSH_SECONDS, a timer writing the last changes before an idle
+spell, and once more on exit. /metrics merges the files of all processes:
+any app server worker answers a scrape for the whole server. Counters
+and histograms are summed over every process that ran since the server
+started, gauges over the live ones (see mark_process_dead).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from monitoring.db import pool_stats
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get(self, **labels):
+        """This process's value for the labels"""
+        return self.values.get(self.key(labels))
+
+    def dump(self):
+        return [[list(key), value] for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.changed()
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self.key(labels)] = value
+        self.registry.changed()
+
+
+class Histogram(Metric):
+    """Observation counts per bucket upper bound, and their sum"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Counts per bucket, the last one for +Inf; then the sum
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+        self.registry.changed()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def dump(self):
+        return [
+            [list(key), [list(counts), total]]
+            for key, (counts, total) in self.values.items()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+        self.flushed = 0.0
+        self.pid = os.getpid()
+        # Timer that writes changes made since the last flush
+        self.pending = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def collector(self, func):
+        """Register a function that sets gauges right before a snapshot"""
+        self.collectors.append(func)
+        return func
+
+    def reset(self):
+        """Forget values inherited from the parent in a forked child"""
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values = {}
+        self.pid = os.getpid()
+        self.flushed = 0.0
+        self.pending = None
+
+    def snapshot(self):
+        for collect in self.collectors:
+            collect()
+        with self.lock:
+            return {
+                name: {
+                    "kind": metric.kind,
+                    "help": metric.documentation,
+                    "labels": metric.label_names,
+                    "buckets": getattr(metric, "buckets", None),
+                    "values": metric.dump(),
+                }
+                for name, metric in self.metrics.items()
+            }
+
+    def changed(self):
+        if not settings.METRICS_DIR:
+            return
+
+        wait = settings.METRICS_FLUSH_SECONDS - (
+            time.monotonic() - self.flushed
+        )
+        if wait <= 0:
+            self.flush()
+            return
+
+        with self.lock:
+            if self.pending is None:
+                # Written even if no other change follows
+                self.pending = threading.Timer(wait, self.flush)
+                self.pending.daemon = True
+                self.pending.start()
+
+    def flush(self):
+        """Write this process's snapshot to its file in METRICS_DIR"""
+        with self.lock:
+            if self.pending is not None:
+                self.pending.cancel()
+                self.pending = None
+        if not settings.METRICS_DIR:
+            return  # unset since the timer started
+        self.flushed = time.monotonic()
+        _write(_process_file(self.pid), self.snapshot())
+
+    def close(self):
+        """Write the changes not flushed yet, as the process exits"""
+        if self.pending is not None:
+            self.flush()
+
+    def collect(self):
+        """Snapshots of this process and, in METRICS_DIR, of the others"""
+        if not settings.METRICS_DIR:
+            return [self.snapshot()]
+
+        self.flush()
+        snapshots = []
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # removed or replaced meanwhile
+        return snapshots
+
+    def render(self):
+        return render(merge(self.collect()))
+
+
+def _process_file(pid):
+    return Path(settings.METRICS_DIR) / f"{pid}.json"
+
+
+def _write(path, snapshot):
+    """Replace the file atomically, readers never see a partial one"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+def merge(snapshots):
+    """Sum the values of every metric over the snapshots"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "values": {}})
+            values = target["values"]
+            for key, value in metric["values"]:
+                key = tuple(key)
+                if metric["kind"] != "histogram":
+                    values[key] = values.get(key, 0) + value
+                    continue
+                counts, total = values.get(
+                    key, ([0] * len(value[0]), 0)
+                )
+                values[key] = (
+                    [a + b for a, b in zip(counts, value[0])],
+                    total + value[1],
+                )
+    return merged
+
+
+def _escape(value):
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _labels(names, values, extra=()):
+    pairs = [
+        f'{name}="{_escape(value)}"'
+        for name, value in (*zip(names, values), *extra)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value))
+
+
+def render(metrics):
+    """The merged metrics in the Prometheus text exposition format"""
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric["values"].items()):
+            labels = metric["labels"]
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_labels(labels, key)} {_number(value)}")
+                continue
+
+            counts, total = value
+            cumulative = 0
+            bounds = [*map(_number, metric["buckets"]), "+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{_labels(labels, key, [('le', bound)])} "
+                    f"{_number(cumulative)}"
+                )
+            lines.append(f"{name}_sum{_labels(labels, key)} {_number(total)}")
+            lines.append(
+                f"{name}_count{_labels(labels, key)} {_number(cumulative)}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def mark_process_dead(pid):
+    """Drop the gauges of an exited process, keep its counted totals"""
+    if not settings.METRICS_DIR:
+        return
+
+    path = _process_file(pid)
+    try:
+        snapshot = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return
+    for metric in snapshot.values():
+        if metric["kind"] == "gauge":
+            metric["values"] = []
+    _write(path, snapshot)
+
+
+def clear_directory():
+    """Remove the files of a previous server run"""
+    if not settings.METRICS_DIR:
+        return
+
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in (*directory.glob("*.json"), *directory.glob("*.tmp")):
+        path.unlink(missing_ok=True)
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.reset)
+atexit.register(REGISTRY.close)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by view and viewset action",
+    ["view", "action", "status"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_connections",
+    "Connections open in the database pools",
+    ["database"],
+)
+DB_POOL_AVAILABLE = Gauge(
+    "db_pool_available_connections",
+    "Idle connections in the database pools",
+    ["database"],
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting_requests",
+    "Requests waiting for a pooled connection",
+    ["database"],
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the read replicas when last checked, -1 unknown",
+    ["database"],
+)
+DB_PRIMARY_READS = Counter(
+    "db_primary_fallback_reads_total",
+    "Replica-routed requests read from the primary instead, by reason",
+    ["reason"],
+)
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@REGISTRY.collector
+def collect_pool_stats():
+    for alias in connections:
+        stats = pool_stats(alias)
+        if not stats["pooled"]:
+            continue
+        # Set directly: a collector must not trigger a flush
+        with REGISTRY.lock:
+            DB_POOL_SIZE.values[(alias,)] = stats["pool_size"]
+            DB_POOL_AVAILABLE.values[(alias,)] = stats["pool_available"]
+            DB_POOL_WAITING.values[(alias,)] = stats["requests_waiting"]
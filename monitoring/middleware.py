@@ -0,0 +1,312 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from monitoring.budgets import view_action, view_query_budget
+from monitoring.metrics import REQUEST_DURATION
+from monitoring.models import RequestProfile
+from monitoring.profiling import RequestProfiler, profiling_lock
+from user.authentication import jwt_staff_user
+
+logger = logging.getLogger("monitoring.requests")
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and sums their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+# Timer of the request timed in this context. The ORM calls of async
+# views run in another thread, with their own connections: sync_to_async
+# carries the context there.
+_query_timer = ContextVar("query_timer", default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timer = _query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Report the queries of every connection to the context's timer"""
+    if _timed_execute not in connection.execute_wrappers:
+        # First, as execute_wrapper() blocks pop theirs off the end
+        connection.execute_wrappers.insert(0, _timed_execute)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.queries = QueryTimer()
+        self.started = time.perf_counter()
+        self.render_started = None
+        self.render_duration = 0.0
+
+    @contextmanager
+    def instrument(self):
+        token = _query_timer.set(self.queries)
+        try:
+            yield
+        finally:
+            _query_timer.reset(token)
+
+    def rendered(self, response):
+        self.render_duration = time.perf_counter() - self.render_started
+
+    def fields(self, request, response):
+        match = request.resolver_match
+        return {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": self.queries.count,
+            "query_budget": (
+                view_query_budget(match.func, request.method)
+                if match
+                else None
+            ),
+            "db_ms": round(self.queries.duration * 1000, 3),
+            "render_ms": round(self.render_duration * 1000, 3),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+        }
+
+    def finish(self, request, response):
+        fields = self.fields(request, response)
+        response["Server-Timing"] = ", ".join(
+            (
+                f'db;dur={fields["db_ms"]};desc="{fields["queries"]} queries"',
+                f'render;dur={fields["render_ms"]}',
+                f'total;dur={fields["total_ms"]}',
+            )
+        )
+        slow = fields["total_ms"] >= settings.REQUEST_TIMING_SLOW_MS
+        over_budget = (
+            fields["query_budget"] is not None
+            and fields["queries"] > fields["query_budget"]
+        )
+        if over_budget:
+            message = "query budget exceeded"
+        else:
+            message = "slow request" if slow else "request"
+        logger.log(
+            logging.WARNING if slow or over_budget else logging.INFO,
+            message,
+            extra={"fields": fields},
+        )
+
+
+class ServerTimingMiddleware:
+    """
+    Time a sample of requests: query count and time of all databases,
+    response rendering (serialization) and the total. The numbers are
+    sent as a Server-Timing header and logged to "monitoring.requests",
+    as a warning above REQUEST_TIMING_SLOW_MS or when the view issued
+    more queries than its budget (see monitoring.budgets).
+
+    REQUEST_TIMING_SAMPLE_RATE is the sampled fraction of requests; at 0
+    the middleware removes itself.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if not self.sample_rate:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.sampled():
+            return self.get_response(request)
+
+        request.timing = timing = RequestTiming()
+        with timing.instrument():
+            response = self.get_response(request)
+        timing.finish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        request.timing = timing = RequestTiming()
+        with timing.instrument():
+            response = await self.get_response(request)
+        timing.finish(request, response)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, "timing", None)
+        if timing is not None:
+            timing.render_started = time.perf_counter()
+            response.add_post_render_callback(timing.rendered)
+        return response
+
+
+class MetricsMiddleware:
+    """Observe the latency of every request in REQUEST_DURATION"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    def observe(self, request, response, started):
+        match = request.resolver_match
+        REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            view=match.view_name if match else "",
+            action=(
+                view_action(match.func, request.method)
+                if match
+                else request.method.lower()
+            ),
+            status=f"{response.status_code // 100}xx",
+        )
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+
+
+class RequestProfilingMiddleware:
+    """
+    Run a request under cProfile and tracemalloc and store the stats
+    and top allocations as a RequestProfile, downloadable in the admin.
+
+    Staff users ask for it with an "X-Profile: 1" header or ?profile=1
+    on a JWT authenticated request;
+    REQUEST_PROFILING_SAMPLE_RATE profiles a random fraction of all
+    requests unattended. One request is profiled at a time, others run
+    normally meanwhile. For async views only the event loop thread is
+    profiled. Without REQUEST_PROFILING the middleware removes itself.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def requested(self, request):
+        return (
+            request.headers.get(PROFILE_HEADER) == "1"
+            or request.GET.get(PROFILE_PARAM) == "1"
+        )
+
+    def sampled(self):
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        sampled = self.sampled()
+        user = jwt_staff_user(request) if self.requested(request) else None
+        if not (user or sampled) or not profiling_lock.acquire(False):
+            return self.get_response(request)
+
+        try:
+            with RequestProfiler() as profiler:
+                response = self.get_response(request)
+        finally:
+            profiling_lock.release()
+        self.save(request, response, profiler, user, sampled)
+        return response
+
+    async def __acall__(self, request):
+        sampled = self.sampled()
+        user = None
+        if self.requested(request):
+            user = await sync_to_async(jwt_staff_user)(request)
+        if not (user or sampled) or not profiling_lock.acquire(False):
+            return await self.get_response(request)
+
+        try:
+            with RequestProfiler() as profiler:
+                response = await self.get_response(request)
+        finally:
+            profiling_lock.release()
+        await sync_to_async(self.save)(
+            request, response, profiler, user, sampled
+        )
+        return response
+
+    def save(self, request, response, profiler, user, sampled):
+        match = request.resolver_match
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path(),
+            view=match.view_name if match else "",
+            status=response.status_code,
+            user_id=user.pk if user else None,
+            sampled=sampled and user is None,
+            duration_ms=round(profiler.duration * 1000, 3),
+            peak_kib=round(profiler.peak / 1024),
+            stats=profiler.stats(),
+            summary=profiler.summary(),
+            allocations=profiler.top_allocations(
+                settings.REQUEST_PROFILING_TOP_ALLOCATIONS
+            ),
+        )
+        response["X-Profile-Id"] = str(profile.pk)
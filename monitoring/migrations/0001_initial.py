@@ -0,0 +1,54 @@
+# Generated by Django 5.1 on 2026-10-19 10:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("method", models.CharField(max_length=16)),
+                ("path", models.TextField()),
+                ("view", models.CharField(blank=True, max_length=255)),
+                ("status", models.PositiveSmallIntegerField()),
+                ("sampled", models.BooleanField(default=False)),
+                ("duration_ms", models.FloatField()),
+                ("peak_kib", models.PositiveIntegerField()),
+                ("stats", models.BinaryField()),
+                ("summary", models.TextField()),
+                ("allocations", models.JSONField(default=list)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """cProfile stats and top allocations of one profiled request"""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=16)
+    path = models.TextField()
+    view = models.CharField(max_length=255, blank=True)
+    status = models.PositiveSmallIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    # Picked by REQUEST_PROFILING_SAMPLE_RATE rather than asked for
+    sampled = models.BooleanField(default=False)
+    duration_ms = models.FloatField()
+    peak_kib = models.PositiveIntegerField()
+    # marshal-ed pstats data, the format of cProfile's dump_stats()
+    stats = models.BinaryField()
+    summary = models.TextField()
+    allocations = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.created_at:%Y-%m-%d %H:%M})"
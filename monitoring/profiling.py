@@ -0,0 +1,70 @@
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+import tracemalloc
+
+# cProfile and tracemalloc are process wide: one profiled request at a time
+profiling_lock = threading.Lock()
+TRACEBACK_FRAMES = 10
+SUMMARY_FUNCTIONS = 40
+
+
+class RequestProfiler:
+    """
+    Context manager running the code inside under cProfile and
+    tracemalloc. cProfile only follows the thread that entered it.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.peak = 0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        if not self.was_tracing:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.duration = time.perf_counter() - self.started
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        _, self.peak = tracemalloc.get_traced_memory()
+        if not self.was_tracing:
+            tracemalloc.stop()
+
+    def stats(self):
+        """The profile in the pstats file format (snakeviz, pstats)"""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def summary(self, limit=SUMMARY_FUNCTIONS):
+        """The functions with the most cumulative time, as text"""
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(limit)
+        return stream.getvalue()
+
+    def top_allocations(self, limit):
+        """The call stacks holding the most memory at the end"""
+        return [
+            {
+                "file": stat.traceback[-1].filename,
+                "line": stat.traceback[-1].lineno,
+                "size_kib": round(stat.size / 1024, 1),
+                "count": stat.count,
+                "traceback": stat.traceback.format(),
+            }
+            for stat in self.snapshot.statistics("traceback")[:limit]
+        ]
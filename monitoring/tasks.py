@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from monitoring.models import RequestProfile
+from taskqueue.registry import task
+
+
+@task()
+def prune_request_profiles():
+    """Delete profiles older than REQUEST_PROFILING_RETENTION_DAYS"""
+    RequestProfile.objects.filter(
+        created_at__lt=timezone.now()
+        - timedelta(days=settings.REQUEST_PROFILING_RETENTION_DAYS)
+    ).delete()
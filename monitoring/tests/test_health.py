@@ -0,0 +1,141 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+
+from app import warmup
+
+LIVE_URL = reverse("monitoring:live")
+READY_URL = reverse("monitoring:ready")
+
+ensure_connection = BaseDatabaseWrapper.ensure_connection
+
+
+class HealthApiTests(TestCase):
+    def test_live(self):
+        res = self.client.get(LIVE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    def test_ready_reports_database_and_pool(self):
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["status"], "ok")
+        self.assertIn("latency_ms", res.json()["database"])
+        self.assertIn("pooled", res.json()["pool"])
+
+    @override_settings(REPLICA_DATABASES=["default"])
+    def test_ready_reports_replica_lag(self):
+        res = self.client.get(READY_URL)
+
+        # The primary is no standby: nothing to replay
+        self.assertEqual(res.json()["replicas"], {"default": 0.0})
+
+    def test_ready_unavailable_database(self):
+        with mock.patch(
+            "monitoring.views.check_database",
+            side_effect=OperationalError("connection refused"),
+        ):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(
+            res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(res.json()["status"], "unavailable")
+
+
+@mock.patch("station.management.commands.wait_for_db.time.sleep")
+class WaitForDbCommandTests(TransactionTestCase):
+    def test_database_ready(self, patched_sleep):
+        out = StringIO()
+        call_command("wait_for_db", stdout=out)
+
+        self.assertIn("Database available!", out.getvalue())
+        patched_sleep.assert_not_called()
+
+    def test_retries_with_backoff(self, patched_sleep):
+        attempts = []
+
+        def flaky_connect(db_conn):
+            attempts.append(db_conn)
+            if len(attempts) <= 3:
+                raise OperationalError("connection refused")
+            return ensure_connection(db_conn)
+
+        with mock.patch.object(
+            BaseDatabaseWrapper,
+            "ensure_connection",
+            autospec=True,
+            side_effect=flaky_connect,
+        ):
+            call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.1, 0.2, 0.4],
+        )
+
+    def test_gives_up_after_timeout(self, patched_sleep):
+        with mock.patch.object(
+            BaseDatabaseWrapper,
+            "ensure_connection",
+            side_effect=OperationalError,
+        ):
+            with self.assertRaises(CommandError):
+                call_command(
+                    "wait_for_db", "--timeout", "0", stdout=StringIO()
+                )
+
+
+class WorkerWarmupTests(SimpleTestCase):
+    def test_only_pools_are_warmed(self):
+        pooled = mock.Mock(settings_dict={"OPTIONS": {"pool": True}})
+        unpooled = mock.Mock(settings_dict={"OPTIONS": {}})
+        with mock.patch("app.warmup.connections") as connections:
+            connections.all.return_value = [pooled, unpooled]
+            warmup.warm_worker()
+
+        pooled.ensure_connection.assert_called_once_with()
+        unpooled.ensure_connection.assert_not_called()
+        unpooled.close.assert_not_called()
+
+
+class StartupDatabaseCheckTests(SimpleTestCase):
+    def connections(self, primary_error=None, replica_error=None):
+        primary = mock.MagicMock(alias="default")
+        primary.cursor.side_effect = primary_error
+        replica = mock.MagicMock(alias="replica1")
+        replica.cursor.side_effect = replica_error
+        patch = mock.patch("app.warmup.connections")
+        patch.start().all.return_value = [primary, replica]
+        self.addCleanup(patch.stop)
+        return primary, replica
+
+    def test_replica_down_is_reported(self):
+        _, replica = self.connections(
+            replica_error=OperationalError("connection refused")
+        )
+
+        with self.assertLogs("app.warmup", "WARNING"):
+            warmup.check_databases()
+
+        replica.close.assert_called_once_with()
+
+    def test_primary_down_stops_the_start(self):
+        self.connections(primary_error=OperationalError("connection refused"))
+
+        with self.assertRaises(OperationalError):
+            warmup.check_databases()
@@ -0,0 +1,181 @@
+import json
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.metrics import (
+    REQUEST_DURATION,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    mark_process_dead,
+)
+
+METRICS_URL = reverse("metrics")
+STATION_URL = reverse("station:station-list")
+
+
+def sample_registry():
+    registry = Registry()
+    return (
+        registry,
+        Counter("jobs_total", "Jobs", ["queue"], registry=registry),
+        Gauge("workers", "Workers", registry=registry),
+        Histogram(
+            "job_seconds", "Job time", buckets=(0.1, 1), registry=registry
+        ),
+    )
+
+
+@override_settings(METRICS_DIR="")
+class RegistryTests(SimpleTestCase):
+    def test_render(self):
+        registry, counter, gauge, histogram = sample_registry()
+        counter.inc(queue='say "hi"')
+        counter.inc(2, queue='say "hi"')
+        gauge.set(3)
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{queue="say \\"hi\\""} 3.0', text)
+        self.assertIn("workers 3.0", text)
+        self.assertIn('job_seconds_bucket{le="0.1"} 2.0', text)
+        self.assertIn('job_seconds_bucket{le="1.0"} 3.0', text)
+        self.assertIn('job_seconds_bucket{le="+Inf"} 4.0', text)
+        self.assertIn("job_seconds_sum 5.65", text)
+        self.assertIn("job_seconds_count 4.0", text)
+
+    def test_processes_aggregated_through_directory(self):
+        directory = tempfile.mkdtemp()
+        other, other_counter, other_gauge, other_histogram = (
+            sample_registry()
+        )
+        registry, counter, gauge, histogram = sample_registry()
+        other.pid = 1
+        self.addCleanup(registry.close)
+
+        with override_settings(METRICS_DIR=directory):
+            other_counter.inc(queue="a")
+            other_gauge.set(2)
+            other_histogram.observe(0.5)
+            other.flush()
+            counter.inc(queue="a")
+            gauge.set(1)
+            histogram.observe(5)
+
+            text = registry.render()
+            mark_process_dead(1)
+            after_exit = registry.render()
+
+        self.assertIn('jobs_total{queue="a"} 2.0', text)
+        self.assertIn("workers 3.0", text)
+        self.assertIn('job_seconds_bucket{le="1.0"} 1.0', text)
+        self.assertIn("job_seconds_count 2.0", text)
+        # Totals of exited processes are kept, their gauges are not
+        self.assertIn('jobs_total{queue="a"} 2.0', after_exit)
+        self.assertIn("workers 1.0", after_exit)
+
+    def test_flush_is_throttled(self):
+        directory = tempfile.mkdtemp()
+        registry, counter, _, _ = sample_registry()
+        self.addCleanup(registry.close)
+
+        with override_settings(METRICS_DIR=directory):
+            counter.inc(queue="a")
+            counter.inc(queue="a")
+            with open(f"{directory}/{registry.pid}.json") as file:
+                flushed = json.load(file)
+
+        self.assertEqual(flushed["jobs_total"]["values"], [[["a"], 1]])
+
+    def test_last_changes_flushed_by_timer(self):
+        directory = tempfile.mkdtemp()
+        registry, counter, _, _ = sample_registry()
+        self.addCleanup(registry.close)
+
+        with override_settings(
+            METRICS_DIR=directory, METRICS_FLUSH_SECONDS=0.05
+        ):
+            counter.inc(queue="a")
+            counter.inc(queue="a")
+            time.sleep(0.2)
+            with open(f"{directory}/{registry.pid}.json") as file:
+                flushed = json.load(file)
+
+        self.assertEqual(flushed["jobs_total"]["values"], [[["a"], 2]])
+
+    def test_last_changes_flushed_on_close(self):
+        directory = tempfile.mkdtemp()
+        registry, counter, _, _ = sample_registry()
+        self.addCleanup(registry.close)
+
+        with override_settings(METRICS_DIR=directory):
+            counter.inc(queue="a")
+            counter.inc(queue="a")
+            registry.close()
+            with open(f"{directory}/{registry.pid}.json") as file:
+                flushed = json.load(file)
+
+        self.assertEqual(flushed["jobs_total"]["values"], [[["a"], 2]])
+        self.assertIsNone(registry.pending)
+
+
+@override_settings(METRICS_DIR="", METRICS_TOKEN="scrape-secret")
+class MetricsApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_metrics(self, authorization):
+        return self.client.get(
+            METRICS_URL, headers={"Authorization": authorization}
+        )
+
+    def test_request_latency_recorded_per_action(self):
+        labels = {"view": "station:station-list", "action": "list"}
+        before = REQUEST_DURATION.get(**labels, status="2xx")
+        before = sum(before[0]) if before else 0
+
+        self.client.get(STATION_URL)
+        res = self.get_metrics("Bearer scrape-secret")
+
+        after = REQUEST_DURATION.get(**labels, status="2xx")
+        self.assertEqual(sum(after[0]), before + 1)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            'http_request_duration_seconds_count{view="station:station-list",'
+            'action="list",status="2xx"}',
+            res.content.decode(),
+        )
+
+    def test_restricted_to_scraper_and_staff(self):
+        user_token = AccessToken.for_user(self.user)
+        self.assertEqual(
+            self.get_metrics(f"Bearer {user_token}").status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        self.assertEqual(
+            self.get_metrics("Bearer wrong").status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(
+            self.get_metrics(f"Bearer {user_token}").status_code,
+            status.HTTP_200_OK,
+        )
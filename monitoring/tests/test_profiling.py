@@ -0,0 +1,138 @@
+import marshal
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.middleware import RequestProfilingMiddleware
+from monitoring.models import RequestProfile
+from monitoring.tasks import prune_request_profiles
+
+STATION_URL = reverse("station:station-list")
+
+
+def stats_url(profile):
+    return reverse("admin:monitoring_requestprofile_stats", args=[profile.pk])
+
+
+def allocations_url(profile):
+    return reverse(
+        "admin:monitoring_requestprofile_allocations", args=[profile.pk]
+    )
+
+
+@override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0)
+class RequestProfilingTests(TestCase):
+    def setUp(self) -> None:
+        self.staff = get_user_model().objects.create_user(
+            "staff@test.com", "testpass", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client = APIClient()
+
+    def get_as(self, user, url=STATION_URL, **headers):
+        headers["Authorization"] = f"Bearer {AccessToken.for_user(user)}"
+        return self.client.get(url, headers=headers)
+
+    def test_staff_request_profiled_with_header(self):
+        res = self.get_as(self.staff, **{"X-Profile": "1"})
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["X-Profile-Id"], str(profile.pk))
+        self.assertEqual(profile.view, "station:station-list")
+        self.assertEqual(profile.user, self.staff)
+        self.assertFalse(profile.sampled)
+        self.assertTrue(marshal.loads(profile.stats))
+        self.assertIn("cumulative", profile.summary)
+        self.assertTrue(profile.allocations)
+
+    def test_staff_request_profiled_with_query_flag(self):
+        res = self.get_as(self.staff, f"{STATION_URL}?profile=1")
+
+        self.assertIn("X-Profile-Id", res)
+
+    def test_other_users_cannot_ask_for_profiles(self):
+        res = self.get_as(self.user, **{"X-Profile": "1"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", res)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_requests_not_profiled_without_flag(self):
+        self.get_as(self.staff)
+
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_profiled(self):
+        self.get_as(self.user)
+
+        profile = RequestProfile.objects.get()
+        self.assertTrue(profile.sampled)
+        self.assertIsNone(profile.user)
+
+    async def test_async_view_profiled(self):
+        token = AccessToken.for_user(self.staff)
+
+        res = await self.async_client.get(
+            reverse("station:journey-list-async"),
+            headers={"Authorization": f"Bearer {token}", "X-Profile": "1"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("X-Profile-Id", res)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(lambda request: None)
+
+    def test_admin_downloads(self):
+        self.get_as(self.staff, **{"X-Profile": "1"})
+        profile = RequestProfile.objects.get()
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "testpass"
+            )
+        )
+
+        stats = self.client.get(stats_url(profile))
+        allocations = self.client.get(allocations_url(profile))
+
+        self.assertEqual(stats.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            marshal.loads(stats.content), marshal.loads(profile.stats)
+        )
+        self.assertIn("attachment", stats["Content-Disposition"])
+        self.assertEqual(allocations.json(), profile.allocations)
+
+    def test_downloads_require_admin(self):
+        self.get_as(self.staff, **{"X-Profile": "1"})
+        profile = RequestProfile.objects.get()
+        self.client.force_login(self.user)
+
+        res = self.client.get(stats_url(profile))
+
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+
+    def test_prune_old_profiles(self):
+        self.get_as(self.staff, **{"X-Profile": "1"})
+        self.get_as(self.staff, **{"X-Profile": "1"})
+        old = RequestProfile.objects.first()
+        RequestProfile.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+
+        prune_request_profiles()
+
+        self.assertEqual(RequestProfile.objects.count(), 1)
+        self.assertFalse(RequestProfile.objects.filter(pk=old.pk).exists())
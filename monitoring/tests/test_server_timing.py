@@ -0,0 +1,127 @@
+import json
+import logging
+import re
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.formatters import JSONFormatter
+from monitoring.middleware import ServerTimingMiddleware
+from station.async_views import journey_list
+from station.models import Station
+from station.views import StationViewSet
+
+STATION_URL = reverse("station:station-list")
+ASYNC_JOURNEY_URL = reverse("station:journey-list-async")
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", '
+    r"render;dur=([\d.]+), total;dur=[\d.]+$"
+)
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+class ServerTimingTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Station.objects.create(name="Kyiv", latitude=50.45, longitude=30.52)
+
+    def test_header_reports_queries_and_render(self):
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        match = SERVER_TIMING.match(res["Server-Timing"])
+        self.assertIsNotNone(match, res["Server-Timing"])
+        self.assertGreaterEqual(int(match[1]), 1)
+        self.assertGreater(float(match[2]), 0)
+
+    def test_sampled_request_logged(self):
+        with self.assertLogs("monitoring.requests", logging.INFO) as logs:
+            self.client.get(STATION_URL)
+
+        fields = logs.records[0].fields
+        self.assertEqual(fields["view"], "station:station-list")
+        self.assertEqual(fields["status"], status.HTTP_200_OK)
+        self.assertGreaterEqual(fields["queries"], 1)
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0)
+    def test_slow_request_logged_as_warning(self):
+        with self.assertLogs("monitoring.requests", logging.WARNING) as logs:
+            self.client.get(STATION_URL)
+
+        self.assertEqual(logs.records[0].getMessage(), "slow request")
+
+    def test_query_budget_overrun_logged_as_warning(self):
+        with mock.patch.object(StationViewSet, "query_budgets", {"list": 0}):
+            with self.assertLogs(
+                "monitoring.requests", logging.WARNING
+            ) as logs:
+                self.client.get(STATION_URL)
+
+        self.assertEqual(
+            logs.records[0].getMessage(), "query budget exceeded"
+        )
+        self.assertEqual(logs.records[0].fields["query_budget"], 0)
+
+    async def test_async_view_timed(self):
+        res = await self.async_client.get(
+            ASYNC_JOURNEY_URL,
+            headers={
+                "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        match = SERVER_TIMING.match(res["Server-Timing"])
+        self.assertIsNotNone(match, res["Server-Timing"])
+        # Counted though the ORM ran them in sync_to_async's thread
+        self.assertGreaterEqual(int(match[1]), 1)
+
+    async def test_async_query_budget_overrun_logged_as_warning(self):
+        with mock.patch.object(journey_list, "query_budget", 0):
+            with self.assertLogs(
+                "monitoring.requests", logging.WARNING
+            ) as logs:
+                await self.async_client.get(
+                    ASYNC_JOURNEY_URL,
+                    headers={
+                        "Authorization": "Bearer "
+                        f"{AccessToken.for_user(self.user)}"
+                    },
+                )
+
+        self.assertEqual(
+            logs.records[0].getMessage(), "query budget exceeded"
+        )
+        self.assertGreater(logs.records[0].fields["queries"], 0)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_disabled_without_sampling(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: None)
+
+        res = self.client.get(STATION_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+
+class JSONFormatterTests(TestCase):
+    def test_fields_merged_into_entry(self):
+        record = logging.makeLogRecord(
+            {"name": "monitoring.requests", "msg": "request",
+             "levelname": "INFO", "fields": {"queries": 3}}
+        )
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry["message"], "request")
+        self.assertEqual(entry["queries"], 3)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from monitoring.views import live, ready
+
+urlpatterns = [
+    path("live", live, name="live"),
+    path("ready", ready, name="ready"),
+]
+
+app_name = "monitoring"
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from monitoring.db import check_database, pool_stats, replica_lag
+from monitoring.metrics import REGISTRY
+from user.authentication import jwt_staff_user
+
+
+@never_cache
+@require_GET
+def live(request):
+    """Liveness probe: the process serves requests, no dependencies"""
+    return JsonResponse({"status": "ok"})
+
+
+def replica_lags():
+    """Lag of every read replica in seconds, None when it does not answer"""
+    lags = {}
+    for alias in settings.REPLICA_DATABASES:
+        try:
+            lags[alias] = replica_lag(alias)
+        except DatabaseError:
+            lags[alias] = None
+    return lags
+
+
+@never_cache
+@require_GET
+def ready(request):
+    """
+    Readiness probe: the database answers a query through the pool.
+    Replicas are reported only, their reads fall back to the primary.
+    """
+    try:
+        latency = check_database()
+    except DatabaseError as error:
+        return JsonResponse(
+            {
+                "status": "unavailable",
+                "database": error.__class__.__name__,
+                "pool": pool_stats(),
+            },
+            status=503,
+        )
+
+    return JsonResponse(
+        {
+            "status": "ok",
+            "database": {"latency_ms": round(latency * 1000, 3)},
+            "pool": pool_stats(),
+            "replicas": replica_lags(),
+        }
+    )
+
+
+def metrics_allowed(request):
+    """A scraper sending "Bearer <METRICS_TOKEN>", or a staff user"""
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return True
+
+    return jwt_staff_user(request) is not None
+
+
+@never_cache
+@require_GET
+def metrics(request):
+    """All app server processes' metrics in the Prometheus text format"""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        REGISTRY.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
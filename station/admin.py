@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db.models import Q
 
+from station.pagination import EstimatedCountPaginator
 from .models import (
     Crew,
     TrainType,
@@ -9,13 +11,152 @@ from .models import (
     Journey,
     Order,
     Ticket,
+    OccupancyRollup,
+    ServiceDay,
 )
 
-admin.site.register(Crew)
-admin.site.register(Train)
-admin.site.register(TrainType)
-admin.site.register(Station)
-admin.site.register(Route)
-admin.site.register(Journey)
-admin.site.register(Order)
-admin.site.register(Ticket)
+
+class BigTableAdmin(admin.ModelAdmin):
+    """
+    Changelist of a table with millions of rows: counted from the
+    planner's estimate, without the extra count of the whole table
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ("first_name", "last_name")
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(TrainType)
+class TrainTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Train)
+class TrainAdmin(admin.ModelAdmin):
+    list_display = ("name", "train_type", "cargo_num", "places_in_cargo")
+    list_select_related = ("train_type",)
+    search_fields = ("name",)
+    autocomplete_fields = ("train_type",)
+
+
+@admin.register(Station)
+class StationAdmin(admin.ModelAdmin):
+    list_display = ("name", "latitude", "longitude")
+    search_fields = ("name",)
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    search_fields = ("^source__name", "^destination__name")
+    autocomplete_fields = ("source", "destination")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Route.__str__ of the autocomplete results reads both stations
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        return (
+            queryset.select_related("source", "destination"),
+            may_have_duplicates,
+        )
+
+
+@admin.register(Journey)
+class JourneyAdmin(BigTableAdmin):
+    list_display = ("id", "route", "train", "departure_time", "arrival_time")
+    list_select_related = ("route__source", "route__destination", "train")
+    date_hierarchy = "departure_time"
+    ordering = ("-departure_time",)
+    search_fields = ("=id",)
+    autocomplete_fields = ("route", "train", "crew")
+
+
+class TicketInline(admin.TabularInline):
+    model = Ticket
+    extra = 0
+    raw_id_fields = ("journey",)
+
+
+@admin.register(Order)
+class OrderAdmin(BigTableAdmin):
+    list_display = ("id", "created_at", "user")
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+    search_fields = ("=id", "=user__email")
+    search_help_text = "Order id or user email"
+    raw_id_fields = ("user",)
+    inlines = (TicketInline,)
+
+    def get_search_results(self, request, queryset, search_term):
+        # One indexed lookup instead of an OR across the user join
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(pk=search_term), False
+        return queryset.filter(user__email=search_term), False
+
+
+@admin.register(Ticket)
+class TicketAdmin(BigTableAdmin):
+    list_display = ("id", "journey", "cargo", "seat", "order")
+    list_select_related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "journey__train",
+        "order",
+    )
+    ordering = ("-id",)
+    search_fields = ("=id", "=order__id")
+    search_help_text = "Ticket or order id"
+    raw_id_fields = ("journey", "order")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Both ids are indexed columns of the ticket table, no join
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if not search_term.isdigit():
+            return queryset.none(), False
+        return (
+            queryset.filter(Q(pk=search_term) | Q(order_id=search_term)),
+            False,
+        )
+
+
+@admin.register(OccupancyRollup)
+class OccupancyRollupAdmin(BigTableAdmin):
+    list_display = ("day", "route", "train", "journeys", "tickets_sold")
+    list_select_related = ("route__source", "route__destination", "train")
+    date_hierarchy = "day"
+    raw_id_fields = ("route", "train")
+
+    # Maintained by station.occupancy, rebuilt by rebuild_occupancy
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ServiceDay)
+class ServiceDayAdmin(BigTableAdmin):
+    list_display = ("day", "source", "destination", "journey_ids")
+    list_select_related = ("source", "destination")
+    date_hierarchy = "day"
+    raw_id_fields = ("source", "destination")
+
+    # Maintained by station.service_days, rebuilt by rebuild_service_days
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
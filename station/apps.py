@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "station"
+
+    def ready(self):
+        import station.filters  # noqa: F401 (system check)
+        import station.signals  # noqa: F401
@@ -0,0 +1,161 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.renderers import JSONRenderer
+
+from app.replicas import read_database, reads_from
+from monitoring.budgets import query_budget
+from station.events import journey_feed, journey_event_stream
+from station.filters import apply_filters
+from station.models import Journey
+from station.serializers import (
+    JourneyListSerializer,
+    JourneyDetailSerializer,
+    JourneySeatsSerializer,
+)
+from station.throttling import ScopedUserSlidingWindowThrottle
+from station.views import JourneyViewSet
+from user.authentication import StatelessJWTAuthentication
+
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+
+
+async def _authenticate(request):
+    """Resolve the JWT user of a plain Django request, or None"""
+    authenticate = sync_to_async(StatelessJWTAuthentication().authenticate)
+    try:
+        result = await authenticate(request)
+    except AuthenticationFailed:
+        return None
+
+    return result[0] if result else None
+
+
+def _throttle_wait(request):
+    """Seconds to wait if the user is over the journey endpoints' rate"""
+    throttle = ScopedUserSlidingWindowThrottle()
+    if throttle.allow_request(request, JourneyViewSet):
+        return None
+
+    return throttle.wait()
+
+
+def _require_user(view):
+    """
+    Async counterpart of IsAdminOrIfAuthenticatedReadOnly for reads,
+    throttled in the scope of the regular journey endpoints
+    """
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return _json_response(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+
+        user = await _authenticate(request)
+        if not (user and user.is_authenticated):
+            return _json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+        request.user = user
+        wait = await sync_to_async(_throttle_wait)(request)
+        if wait is not None:
+            throttled = Throttled(wait)
+            response = _json_response(
+                {"detail": throttled.detail}, throttled.status_code
+            )
+            response["Retry-After"] = str(throttled.wait)
+            return response
+
+        alias = await sync_to_async(read_database)(request.COOKIES, user.pk)
+        try:
+            with reads_from(alias):
+                return await view(request, *args, **kwargs)
+        except ValidationError as error:
+            return _json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+
+    return wrapper
+
+
+def _journey_queryset(request, action):
+    queryset = JourneyViewSet.load_related_for_action(
+        JourneyViewSet.queryset.all(), action
+    )
+
+    return apply_filters(queryset, JourneyViewSet.query_filters, request.GET)
+
+
+@query_budget(3)
+@_require_user
+async def journey_list(request):
+    journeys = [
+        journey async for journey in _journey_queryset(request, "list")
+    ]
+    serializer = JourneyListSerializer(journeys, many=True)
+
+    return _json_response(serializer.data)
+
+
+async def _get_journey(request, pk, action):
+    try:
+        return await _journey_queryset(request, action).aget(pk=pk)
+    except Journey.DoesNotExist:
+        return None
+
+
+@query_budget(4)
+@_require_user
+async def journey_detail(request, pk):
+    journey = await _get_journey(request, pk, "retrieve")
+    if journey is None:
+        return _json_response(
+            {"detail": "No Journey matches the given query."},
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    return _json_response(JourneyDetailSerializer(journey).data)
+
+
+@query_budget(4)
+@_require_user
+async def journey_seats(request, pk):
+    journey = await _get_journey(request, pk, "seats")
+    if journey is None:
+        return _json_response(
+            {"detail": "No Journey matches the given query."},
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    return _json_response(JourneySeatsSerializer(journey).data)
+
+
+@_require_user
+async def journey_seats_stream(request, pk):
+    """Server-Sent Events stream of seat availability for one journey"""
+    subscription = await journey_feed.subscribe(pk)
+    if subscription is None:
+        return _json_response(
+            {"detail": "No Journey matches the given query."},
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    response = StreamingHttpResponse(
+        journey_event_stream(pk, *subscription),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
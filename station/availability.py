@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from monitoring.metrics import record_cache_lookup
+from station.models import Journey, Ticket
+
+
+def _cache_key(source_id, destination_id, month):
+    return f"journey-calendar:{source_id}:{destination_id}:{month}"
+
+
+def month_bounds(month):
+    """Aware start of a "YYYY-MM" month and of the next one"""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(
+        year=start.year + start.month // 12, month=start.month % 12 + 1
+    )
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def journey_calendar(source_id, destination_id, month):
+    """
+    [{"date", "journeys", "seats_available"}] for every day of the month
+    with departures between the stations, in one grouped query.
+
+    Cached per station pair and month until a journey or ticket of the
+    route changes (see station.signals).
+    """
+    key = _cache_key(source_id, destination_id, month)
+    days = cache.get(key)
+    record_cache_lookup("journey_calendar", days is not None)
+    if days is not None:
+        return days
+
+    start, end = month_bounds(month)
+    sold = (
+        Ticket.objects.filter(journey=OuterRef("pk"))
+        .order_by()
+        .values("journey")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    days = list(
+        Journey.objects.filter(
+            route__source_id=source_id,
+            route__destination_id=destination_id,
+            departure_time__gte=start,
+            departure_time__lt=end,
+        )
+        .annotate(date=TruncDate("departure_time"))
+        .values("date")
+        .annotate(
+            journeys=Count("id"),
+            seats_available=Sum(
+                F("train__cargo_num") * F("train__places_in_cargo")
+                - Coalesce(Subquery(sold), 0)
+            ),
+        )
+        .order_by("date")
+    )
+    cache.set(key, days, settings.JOURNEY_CALENDAR_CACHE_SECONDS)
+    return days
+
+
+def forget_calendar(source_id, destination_id, departure_time):
+    """Drop the cached calendar month a departure falls in"""
+    month = timezone.localtime(departure_time).strftime("%Y-%m")
+    cache.delete(_cache_key(source_id, destination_id, month))
@@ -0,0 +1,561 @@
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from station.datagen import ADMIN_EMAIL, PASSWORD
+from station.models import Journey, Order, Route, Station, Ticket, Train
+from user.serializers import TokenObtainPairSerializer
+
+# Latency changes below this are noise, whatever the ratio
+MIN_SLOWDOWN_MS = 5
+# Sequential scans of smaller tables are cheaper than an index lookup
+SEQ_SCAN_MIN_ROWS = 10_000
+# Access tokens outlive a run: the large scale takes longer than their
+# ACCESS_TOKEN_LIFETIME
+TOKEN_LIFETIME = timedelta(hours=12)
+# Emptied before every request, so cached endpoints are timed cold. A
+# process-local cache: a shared one would be emptied for every server.
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmarks",
+    }
+}
+
+
+def endpoint_fixture():
+    """Users, tokens and representative ids the endpoints are called with"""
+    user = (
+        get_user_model()
+        .objects.filter(is_staff=False)
+        .annotate(orders=Count("order"))
+        .order_by("-orders", "id")
+        .first()
+    )
+    admin = get_user_model().objects.filter(email=ADMIN_EMAIL).first()
+    journey = (
+        Journey.objects.annotate(sold=Count("tickets"))
+        .order_by("-sold", "id")
+        .select_related("route", "train")
+        .first()
+    )
+    if user is None or admin is None or journey is None:
+        return None
+
+    taken = set(journey.tickets.values_list("cargo", "seat"))
+    free_seat = next(
+        (cargo, seat)
+        for cargo in range(1, journey.train.cargo_num + 1)
+        for seat in range(1, journey.train.places_in_cargo + 1)
+        if (cargo, seat) not in taken
+    )
+    refresh = TokenObtainPairSerializer.get_token(user)
+    access = refresh.access_token
+    admin_access = TokenObtainPairSerializer.get_token(admin).access_token
+    for token in (access, admin_access):
+        token.set_exp(lifetime=TOKEN_LIFETIME)
+
+    return {
+        "user": user,
+        "access": str(access),
+        "refresh": str(refresh),
+        "admin_access": str(admin_access),
+        "journey": journey,
+        "crew": list(journey.crew.values_list("id", flat=True)),
+        "free_seat": free_seat,
+    }
+
+
+def train_image_form():
+    """A fresh multipart form with a small JPEG: files are read once"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "red").save(buffer, "JPEG")
+    return {
+        "image": SimpleUploadedFile(
+            "train.jpg", buffer.getvalue(), content_type="image/jpeg"
+        )
+    }
+
+
+def endpoints(fixture):
+    """
+    (name, method, path, body, token) of every benchmarked endpoint. A
+    callable body builds a multipart form per call, others are JSON.
+    """
+    journey = fixture["journey"]
+    route = journey.route
+    train = journey.train
+    user = fixture["user"]
+    user_token = fixture["access"]
+    admin_token = fixture["admin_access"]
+    date = journey.departure_time.date().isoformat()
+    # Orders are placed up to weeks before departure
+    ordered = (journey.departure_time - timedelta(days=1)).date().isoformat()
+    cargo, seat = fixture["free_seat"]
+
+    def url(name, *args):
+        return reverse(name, args=args)
+
+    return [
+        ("crew-list", "GET", url("station:crew-list"), None, user_token),
+        (
+            "train-type-list",
+            "GET",
+            url("station:traintype-list"),
+            None,
+            user_token,
+        ),
+        ("train-list", "GET", url("station:train-list"), None, user_token),
+        (
+            "train-detail",
+            "GET",
+            url("station:train-detail", journey.train_id),
+            None,
+            user_token,
+        ),
+        (
+            "station-list",
+            "GET",
+            url("station:station-list"),
+            None,
+            user_token,
+        ),
+        (
+            "station-create",
+            "POST",
+            url("station:station-list"),
+            {"name": "Benchmark", "latitude": 50.0, "longitude": 30.0},
+            admin_token,
+        ),
+        (
+            "train-update",
+            "PUT",
+            url("station:train-detail", train.id),
+            {
+                "name": train.name,
+                "cargo_num": train.cargo_num,
+                "places_in_cargo": train.places_in_cargo,
+                "train_type": train.train_type_id,
+            },
+            admin_token,
+        ),
+        (
+            "train-partial-update",
+            "PATCH",
+            url("station:train-detail", train.id),
+            {"name": train.name},
+            admin_token,
+        ),
+        (
+            "train-upload-image",
+            "POST",
+            url("station:train-upload-image", journey.train_id),
+            train_image_form,
+            admin_token,
+        ),
+        ("route-list", "GET", url("station:route-list"), None, user_token),
+        (
+            "route-list-filtered",
+            "GET",
+            f"{url('station:route-list')}?source={route.source_id}",
+            None,
+            user_token,
+        ),
+        (
+            "route-detail",
+            "GET",
+            url("station:route-detail", route.id),
+            None,
+            user_token,
+        ),
+        (
+            "journey-list",
+            "GET",
+            url("station:journey-list"),
+            None,
+            user_token,
+        ),
+        (
+            "journey-list-filtered",
+            "GET",
+            f"{url('station:journey-list')}?departure_date={date}",
+            None,
+            user_token,
+        ),
+        (
+            "journey-create",
+            "POST",
+            url("station:journey-list"),
+            {
+                "route": route.id,
+                "train": journey.train_id,
+                "departure_time": journey.departure_time.isoformat(),
+                "arrival_time": journey.arrival_time.isoformat(),
+                "crew": fixture["crew"],
+            },
+            admin_token,
+        ),
+        (
+            "journey-detail",
+            "GET",
+            url("station:journey-detail", journey.id),
+            None,
+            user_token,
+        ),
+        (
+            "journey-update",
+            "PUT",
+            url("station:journey-detail", journey.id),
+            {
+                "route": route.id,
+                "train": journey.train_id,
+                "departure_time": journey.departure_time.isoformat(),
+                "arrival_time": journey.arrival_time.isoformat(),
+                "crew": fixture["crew"],
+            },
+            admin_token,
+        ),
+        (
+            "journey-partial-update",
+            "PATCH",
+            url("station:journey-detail", journey.id),
+            {"arrival_time": journey.arrival_time.isoformat()},
+            admin_token,
+        ),
+        (
+            # The journey with the most tickets, deleted with them
+            "journey-delete",
+            "DELETE",
+            url("station:journey-detail", journey.id),
+            None,
+            admin_token,
+        ),
+        (
+            "journey-seats",
+            "GET",
+            url("station:journey-seats", journey.id),
+            None,
+            user_token,
+        ),
+        (
+            "journey-calendar",
+            "GET",
+            f"{url('station:journey-calendar')}?from={route.source_id}"
+            f"&to={route.destination_id}"
+            f"&month={journey.departure_time:%Y-%m}",
+            None,
+            user_token,
+        ),
+        (
+            "journey-search",
+            "GET",
+            f"{url('station:journey-search')}?from={route.source_id}"
+            f"&to={route.destination_id}&date={date}",
+            None,
+            user_token,
+        ),
+        (
+            "journey-list-async",
+            "GET",
+            f"{url('station:journey-list-async')}?departure_date={date}",
+            None,
+            user_token,
+        ),
+        (
+            "journey-detail-async",
+            "GET",
+            url("station:journey-detail-async", journey.id),
+            None,
+            user_token,
+        ),
+        (
+            "journey-seats-async",
+            "GET",
+            url("station:journey-seats-async", journey.id),
+            None,
+            user_token,
+        ),
+        ("order-list", "GET", url("station:order-list"), None, user_token),
+        (
+            "order-create",
+            "POST",
+            url("station:order-list"),
+            {
+                "tickets": [
+                    {"journey": journey.id, "cargo": cargo, "seat": seat}
+                ]
+            },
+            user_token,
+        ),
+        (
+            "occupancy-report",
+            "GET",
+            f"{url('station:occupancy-list')}?date_from={date}&date_to={date}",
+            None,
+            admin_token,
+        ),
+        (
+            "occupancy-routes",
+            "GET",
+            f"{url('station:occupancy-routes')}?date_from={date}",
+            None,
+            admin_token,
+        ),
+        (
+            "occupancy-trains",
+            "GET",
+            f"{url('station:occupancy-trains')}?date_from={date}",
+            None,
+            admin_token,
+        ),
+        (
+            "sales-export",
+            "GET",
+            f"{url('station:sales-export')}"
+            f"?date_from={ordered}&date_to={ordered}",
+            None,
+            admin_token,
+        ),
+        (
+            "user-register",
+            "POST",
+            url("user:create"),
+            {"email": "bench-new@example.com", "password": PASSWORD},
+            None,
+        ),
+        (
+            "user-token",
+            "POST",
+            url("user:token_obtain_pair"),
+            {"email": fixture["user"].email, "password": PASSWORD},
+            None,
+        ),
+        (
+            "user-token-refresh",
+            "POST",
+            url("user:token_refresh"),
+            {"refresh": fixture["refresh"]},
+            None,
+        ),
+        ("user-me", "GET", url("user:manage"), None, user_token),
+        (
+            "user-update",
+            "PUT",
+            url("user:manage"),
+            {"email": user.email, "password": PASSWORD},
+            user_token,
+        ),
+        (
+            "user-partial-update",
+            "PATCH",
+            url("user:manage"),
+            {"email": user.email},
+            user_token,
+        ),
+    ]
+
+
+def _allowed_host():
+    """A host name the requests pass ALLOWED_HOSTS validation with"""
+    return next(
+        (
+            host
+            for host in settings.ALLOWED_HOSTS
+            if host != "*" and not host.startswith(".")
+        ),
+        "localhost",
+    )
+
+
+def _request(client, method, path, body, token):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    if method == "GET":
+        response = client.get(path, headers=headers)
+        if response.streaming:
+            # Streamed bodies are queried and built as they are read
+            b"".join(response.streaming_content)
+        return response
+    if callable(body):
+        return client.post(path, body(), headers=headers)
+    return client.generic(
+        method,
+        path,
+        data="" if body is None else json.dumps(body),
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def _call(client, endpoint):
+    """
+    One rolled-back request on an empty cache: (response, seconds,
+    captured queries)
+    """
+    _, method, path, body, token = endpoint
+    cache.clear()
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = _request(client, method, path, body, token)
+            elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+
+    return response, elapsed, queries.captured_queries
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def query_plans(queries):
+    """[{"sql", "plan"}] of the SELECT statements among the queries"""
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query["sql"].lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query['sql']}")
+            plans.append(
+                {"sql": query["sql"], "plan": cursor.fetchone()[0][0]["Plan"]}
+            )
+    return plans
+
+
+def sequential_scans(plans):
+    """Tables of SEQ_SCAN_MIN_ROWS rows or more the plans scan in full"""
+    tables = {
+        node["Relation Name"]
+        for plan in plans
+        for node in _plan_nodes(plan["plan"])
+        if node["Node Type"] == "Seq Scan"
+    }
+    if not tables:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT relname FROM pg_class
+            WHERE relname = ANY(%s) AND relkind = 'r' AND reltuples >= %s
+            """,
+            [list(tables), SEQ_SCAN_MIN_ROWS],
+        )
+        return sorted(table for table, in cursor.fetchall())
+
+
+def benchmark_endpoint(client, endpoint, iterations):
+    """
+    Latency percentiles, query count, peak memory and large-table
+    sequential scans of one endpoint, with the EXPLAIN plans of its
+    queries: (result, plans).
+    """
+    _call(client, endpoint)  # warm-up
+
+    # Only the last response is kept: a big list's would add up
+    latencies = []
+    for _ in range(iterations):
+        response, elapsed, queries = _call(client, endpoint)
+        latencies.append(elapsed)
+    latencies.sort()
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    tracemalloc.start()
+    try:
+        _call(client, endpoint)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    plans = query_plans(queries)
+    result = {
+        "status": response.status_code,
+        "queries": len(queries),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2),
+        "peak_kib": round(peak / 1024),
+        "seq_scans": sequential_scans(plans),
+    }
+    return result, plans
+
+
+def run_benchmarks(iterations=20, only=None, log=print, plans_dir=None):
+    """
+    Benchmark every endpoint, or those whose name contains one of only;
+    with plans_dir, the EXPLAIN plans are written there per endpoint.
+    """
+    fixture = endpoint_fixture()
+    if fixture is None:
+        return None
+
+    client = Client(SERVER_NAME=_allowed_host())
+    results = {}
+    with override_settings(CACHES=BENCH_CACHES):
+        for endpoint in endpoints(fixture):
+            name = endpoint[0]
+            if only and not any(part in name for part in only):
+                continue
+            results[name], plans = benchmark_endpoint(
+                client, endpoint, iterations
+            )
+            log(f"{name}: {results[name]}")
+            if plans_dir is not None:
+                (plans_dir / f"{name}.json").write_text(
+                    json.dumps(plans, indent=2) + "\n"
+                )
+
+    return {
+        "iterations": iterations,
+        "rows": {
+            model._meta.model_name: model.objects.count()
+            for model in (Station, Route, Train, Journey, Order, Ticket)
+        },
+        "endpoints": results,
+    }
+
+
+def compare(baseline, results, tolerance):
+    """
+    Describe endpoints that got slower, issue more queries or scan a
+    large table the baseline reached through an index
+    """
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append(
+                f"{name}: {previous['queries']} -> "
+                f"{current['queries']} queries"
+            )
+        slowdown = current["p50_ms"] - previous["p50_ms"]
+        if (
+            current["p50_ms"] > previous["p50_ms"] * tolerance
+            and slowdown > MIN_SLOWDOWN_MS
+        ):
+            regressions.append(
+                f"{name}: p50 {previous['p50_ms']} -> "
+                f"{current['p50_ms']} ms"
+            )
+        for table in sorted(
+            set(current.get("seq_scans", ()))
+            - set(previous.get("seq_scans", ()))
+        ):
+            regressions.append(f"{name}: new sequential scan on {table}")
+    return regressions
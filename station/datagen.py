@@ -0,0 +1,423 @@
+import math
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from station import occupancy, service_days
+from station.models import (
+    Crew,
+    Journey,
+    OccupancyRollup,
+    Order,
+    Route,
+    ServiceDay,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+SCALES = {
+    "small": {
+        "stations": 50,
+        "routes": 200,
+        "trains": 20,
+        "crews": 50,
+        "journeys": 1_000,
+        "users": 100,
+        "tickets": 10_000,
+    },
+    "medium": {
+        "stations": 500,
+        "routes": 2_500,
+        "trains": 200,
+        "crews": 500,
+        "journeys": 10_000,
+        "users": 2_000,
+        "tickets": 200_000,
+    },
+    "large": {
+        "stations": 3_000,
+        "routes": 20_000,
+        "trains": 1_000,
+        "crews": 3_000,
+        "journeys": 100_000,
+        "users": 50_000,
+        "tickets": 2_000_000,
+    },
+    "huge": {
+        "stations": 10_000,
+        "routes": 100_000,
+        "trains": 5_000,
+        "crews": 10_000,
+        "journeys": 1_000_000,
+        "users": 500_000,
+        "tickets": 20_000_000,
+    },
+}
+
+TRAIN_TYPES = ("Intercity", "Regional", "Night", "Express", "Sleeper")
+# Every generated user, and the admin, can log in with this password
+PASSWORD = "trainstation"
+ADMIN_EMAIL = "admin@example.com"
+BATCH_SIZE = 5_000
+# Journeys copied together with their orders and tickets
+JOURNEY_CHUNK = 10_000
+MAX_TICKETS_PER_ORDER = 4
+TRAIN_SPEED_KMH = 90
+SCHEDULE_START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+SCHEDULE_DAYS = 365
+
+
+def distance_km(source, destination):
+    """Great-circle distance between two stations"""
+    lat1, lon1, lat2, lon2 = map(
+        math.radians,
+        (
+            source.latitude,
+            source.longitude,
+            destination.latitude,
+            destination.longitude,
+        ),
+    )
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return max(int(6371 * 2 * math.asin(math.sqrt(a))), 1)
+
+
+def copy_rows(model, field_names, rows):
+    """Stream rows into the model's table with a binary COPY"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(
+            f"COPY {model._meta.db_table} ({columns}) "
+            f"FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            copy.set_types(
+                [field.db_type(connection).split("(")[0] for field in fields]
+            )
+            for row in rows:
+                copy.write_row(row)
+
+
+@contextmanager
+def constraints_dropped(models):
+    """
+    Drop the foreign keys, unique constraints and secondary indexes of
+    the models' tables and recreate them on exit: one set-based check
+    and index build per table is much faster than maintaining them row
+    by row during COPY.
+    """
+    definitions = []
+    with connection.cursor() as cursor:
+        # Run pending deferred checks, tables with them cannot be altered
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for model in models:
+            table = model._meta.db_table
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('f', 'u')
+                """,
+                [table],
+            )
+            for name, definition in cursor.fetchall():
+                definitions.append(
+                    f"ALTER TABLE {table} ADD CONSTRAINT "
+                    f"{connection.ops.quote_name(name)} {definition}"
+                )
+                cursor.execute(
+                    f"ALTER TABLE {table} DROP CONSTRAINT "
+                    f"{connection.ops.quote_name(name)}"
+                )
+
+            cursor.execute(
+                """
+                SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+                FROM pg_index
+                WHERE indrelid = %s::regclass AND NOT indisprimary
+                    AND NOT EXISTS (
+                        SELECT 1 FROM pg_constraint
+                        WHERE conindid = indexrelid
+                    )
+                """,
+                [table],
+            )
+            for name, definition in cursor.fetchall():
+                definitions.append(definition)
+                cursor.execute(f"DROP INDEX {name}")
+
+    yield
+
+    with connection.cursor() as cursor:
+        for definition in definitions:
+            cursor.execute(definition)
+        cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+class NetworkGenerator:
+    """
+    Builds a consistent synthetic network: stations on a map, routes
+    between them with great-circle distances, a year of journeys and
+    orders whose tickets never exceed a train's capacity.
+
+    Reference tables go through bulk_create; users, journeys, orders
+    and tickets are streamed with COPY, the latter three with their
+    constraints and indexes dropped. The same seed and sizes produce the
+    same rows in an empty database.
+    """
+
+    def __init__(self, sizes, seed=0, log=print):
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.log = log
+
+    def generate(self):
+        schedule = [Journey, Journey.crew.through, Order, Ticket]
+        with transaction.atomic():
+            self.generate_reference_data()
+            self.generate_users()
+            with constraints_dropped(schedule):
+                self.generate_schedule()
+            self.reset_sequences(*schedule)
+            # COPY skips the signals that keep the rollups up to date
+            occupancy.rebuild()
+            service_days.rebuild()
+            self.analyze(
+                Station,
+                Route,
+                Train,
+                Crew,
+                get_user_model(),
+                OccupancyRollup,
+                ServiceDay,
+                *schedule,
+            )
+
+    def generate_reference_data(self):
+        rng = self.rng
+        train_types = TrainType.objects.bulk_create(
+            TrainType(name=name) for name in TRAIN_TYPES
+        )
+        stations = Station.objects.bulk_create(
+            (
+                Station(
+                    name=f"Station {number}",
+                    latitude=round(rng.uniform(44.0, 52.0), 6),
+                    longitude=round(rng.uniform(22.0, 40.0), 6),
+                )
+                for number in range(self.sizes["stations"])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        pairs = {}
+        while len(pairs) < self.sizes["routes"]:
+            source, destination = rng.sample(stations, 2)
+            pairs[source.id, destination.id] = Route(
+                source=source,
+                destination=destination,
+                distance=distance_km(source, destination),
+            )
+        self.routes = Route.objects.bulk_create(
+            pairs.values(), batch_size=BATCH_SIZE
+        )
+
+        self.trains = Train.objects.bulk_create(
+            (
+                Train(
+                    name=f"Train {number}",
+                    cargo_num=rng.randint(4, 12),
+                    places_in_cargo=rng.randint(20, 60),
+                    train_type=rng.choice(train_types),
+                )
+                for number in range(self.sizes["trains"])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        self.crew_ids = [
+            crew.id
+            for crew in Crew.objects.bulk_create(
+                (
+                    Crew(
+                        first_name=f"First{number}",
+                        last_name=f"Last{number}",
+                    )
+                    for number in range(self.sizes["crews"])
+                ),
+                batch_size=BATCH_SIZE,
+            )
+        ]
+        self.log(
+            f"{len(stations)} stations, {len(self.routes)} routes, "
+            f"{len(self.trains)} trains, {len(self.crew_ids)} crews"
+        )
+
+    def generate_users(self):
+        User = get_user_model()
+        password = make_password(PASSWORD)
+        joined = timezone.now()
+        first_id = next_id(User)
+        self.user_ids = range(first_id, first_id + self.sizes["users"])
+
+        copy_rows(
+            User,
+            (
+                "id",
+                "email",
+                "password",
+                "first_name",
+                "last_name",
+                "is_superuser",
+                "is_staff",
+                "is_active",
+                "date_joined",
+            ),
+            (
+                (
+                    user_id,
+                    f"user{number}@example.com",
+                    password,
+                    "",
+                    "",
+                    False,
+                    False,
+                    True,
+                    joined,
+                )
+                for number, user_id in enumerate(self.user_ids)
+            ),
+        )
+        self.reset_sequences(User)
+        if not User.objects.filter(email=ADMIN_EMAIL).exists():
+            User.objects.create_superuser(ADMIN_EMAIL, PASSWORD)
+        self.log(f"{len(self.user_ids)} users, admin {ADMIN_EMAIL}")
+
+    def generate_schedule(self):
+        """Journeys with their crews, orders and tickets, chunk by chunk"""
+        total = self.sizes["journeys"]
+        mean_sold = self.sizes["tickets"] / max(total, 1)
+        self.journey_id = next_id(Journey)
+        self.order_id = next_id(Order)
+        self.ticket_id = next_id(Ticket)
+        tickets = 0
+
+        for start in range(0, total, JOURNEY_CHUNK):
+            journeys = self.plan_journeys(min(JOURNEY_CHUNK, total - start))
+            orders, chunk_tickets = self.sell_tickets(journeys, mean_sold)
+
+            copy_rows(
+                Journey,
+                ("id", "route", "train", "departure_time", "arrival_time"),
+                (journey[:5] for journey in journeys),
+            )
+            copy_rows(
+                Journey.crew.through,
+                ("journey", "crew"),
+                (
+                    (journey[0], crew_id)
+                    for journey in journeys
+                    for crew_id in self.rng.sample(self.crew_ids, 2)
+                ),
+            )
+            copy_rows(Order, ("id", "created_at", "user"), orders)
+            copy_rows(
+                Ticket,
+                ("id", "cargo", "seat", "journey", "order"),
+                chunk_tickets,
+            )
+            tickets += len(chunk_tickets)
+            self.log(f"{start + len(journeys)} journeys, {tickets} tickets")
+
+    def plan_journeys(self, count):
+        """(id, route, train, departure, arrival, train) tuples"""
+        rng = self.rng
+        slots = SCHEDULE_DAYS * 24 * 4
+        journeys = []
+
+        for _ in range(count):
+            route = rng.choice(self.routes)
+            train = rng.choice(self.trains)
+            departure = SCHEDULE_START + timedelta(
+                minutes=15 * rng.randrange(slots)
+            )
+            journeys.append(
+                (
+                    self.journey_id,
+                    route.id,
+                    train.id,
+                    departure,
+                    departure
+                    + timedelta(hours=route.distance / TRAIN_SPEED_KMH),
+                    train,
+                )
+            )
+            self.journey_id += 1
+
+        return journeys
+
+    def sell_tickets(self, journeys, mean_sold):
+        rng = self.rng
+        orders = []
+        tickets = []
+
+        for journey_id, _, _, departure, _, train in journeys:
+            capacity = train.cargo_num * train.places_in_cargo
+            sold = min(capacity, int(rng.expovariate(1 / mean_sold)))
+            seats = rng.sample(range(capacity), sold)
+            position = 0
+            while position < sold:
+                size = rng.randint(1, MAX_TICKETS_PER_ORDER)
+                orders.append(
+                    (
+                        self.order_id,
+                        departure - timedelta(minutes=rng.randint(30, 60_000)),
+                        rng.choice(self.user_ids),
+                    )
+                )
+                for seat in seats[position:position + size]:
+                    tickets.append(
+                        (
+                            self.ticket_id,
+                            seat // train.places_in_cargo + 1,
+                            seat % train.places_in_cargo + 1,
+                            journey_id,
+                            self.order_id,
+                        )
+                    )
+                    self.ticket_id += 1
+                self.order_id += 1
+                position += size
+
+        return orders, tickets
+
+    def analyze(self, *models):
+        """Collect planner statistics, autovacuum lags behind bulk loads"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ANALYZE "
+                + ", ".join(model._meta.db_table for model in models)
+            )
+
+    def reset_sequences(self, *models):
+        """Point the id sequences past the explicitly copied ids"""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
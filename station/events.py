@@ -0,0 +1,234 @@
+import asyncio
+import contextvars
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Sum
+
+from station.models import Journey, Ticket
+
+
+def seat_list(seats):
+    return [{"cargo": cargo, "seat": seat} for cargo, seat in sorted(seats)]
+
+
+class JourneySeatState:
+    """
+    Seat map of one watched journey, kept up to date by the feed.
+    `tickets` is the (count, sum of ids) of the tickets it was read from.
+    """
+
+    def __init__(self, journey_id, capacity, taken_seats, tickets=(0, 0)):
+        self.journey_id = journey_id
+        self.capacity = capacity
+        self.taken_seats = set(taken_seats)
+        self.tickets = tickets
+
+    @property
+    def tickets_available(self):
+        return self.capacity - len(self.taken_seats)
+
+    def snapshot(self):
+        return {
+            "journey": self.journey_id,
+            "tickets_available": self.tickets_available,
+            "taken_seats": seat_list(self.taken_seats),
+        }
+
+    def apply(self, seats, tickets):
+        """
+        Replace the taken seats with `seats`, read from `tickets`;
+        return the newly taken and freed seats if any
+        """
+        self.tickets = tickets
+        seats = set(seats)
+        if seats == self.taken_seats:
+            return None
+
+        taken = seats - self.taken_seats
+        freed = self.taken_seats - seats
+        self.taken_seats = seats
+        return {
+            "journey": self.journey_id,
+            "tickets_available": self.tickets_available,
+            "taken": seat_list(taken),
+            "freed": seat_list(freed),
+        }
+
+
+class JourneyFeed:
+    """
+    One ticket change feed per process, fanned out to journey watchers.
+
+    A single poller counts and sums the ticket ids of all watched
+    journeys at once, so N watchers cost one query per poll instead of
+    N, and reloads the seats of the journeys where either changed. Not a
+    ticket id watermark: tickets sold concurrently commit out of id
+    order. Not the count alone: a seat sold as another is freed leaves
+    it unchanged. Ticket commits in this process wake the poller early.
+    """
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or getattr(
+            settings, "JOURNEY_FEED_POLL_SECONDS", 1.0
+        )
+        self._watchers = defaultdict(set)
+        self._states = {}
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+    async def subscribe(self, journey_id):
+        """Start watching a journey; returns (queue, snapshot) or None"""
+        self._bind_loop()
+
+        state = self._states.get(journey_id)
+        if state is None:
+            state = await self._load_state(journey_id)
+            if state is None:
+                return None
+            self._states[journey_id] = state
+
+        queue = asyncio.Queue()
+        self._watchers[journey_id].add(queue)
+        if self._task is None or self._task.done():
+            # Shared by every watcher: not bound to the context, e.g. the
+            # replica, of the request that happened to start it
+            self._task = contextvars.Context().run(
+                self._loop.create_task, self._run()
+            )
+
+        return queue, state.snapshot()
+
+    def unsubscribe(self, journey_id, queue):
+        watchers = self._watchers.get(journey_id)
+        if watchers is None:
+            return
+
+        watchers.discard(queue)
+        if not watchers:
+            del self._watchers[journey_id]
+            self._states.pop(journey_id, None)
+
+    def notify(self):
+        """Thread-safe hint that tickets were committed in this process"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def poll(self):
+        """Reload the seats of watched journeys that sold or freed any"""
+        if not self._watchers:
+            return
+
+        sold = (
+            Ticket.objects.filter(journey_id__in=list(self._watchers))
+            .order_by()
+            .values("journey_id")
+            .annotate(count=Count("id"), id_sum=Sum("id"))
+            .values_list("journey_id", "count", "id_sum")
+        )
+        tickets = {
+            journey_id: (count, id_sum)
+            async for journey_id, count, id_sum in sold
+        }
+        changed = [
+            journey_id
+            for journey_id, state in self._states.items()
+            if tickets.get(journey_id, (0, 0)) != state.tickets
+        ]
+        if not changed:
+            return
+
+        seats_by_journey = {journey_id: [] for journey_id in changed}
+        seats = Ticket.objects.filter(journey_id__in=changed).values_list(
+            "journey_id", "cargo", "seat"
+        )
+        async for journey_id, cargo, seat in seats:
+            seats_by_journey[journey_id].append((cargo, seat))
+
+        for journey_id, seats in seats_by_journey.items():
+            state = self._states.get(journey_id)
+            delta = (
+                state.apply(seats, tickets.get(journey_id, (0, 0)))
+                if state
+                else None
+            )
+            if delta is None:
+                continue
+
+            for queue in self._watchers.get(journey_id, ()):
+                queue.put_nowait(delta)
+
+    async def _load_state(self, journey_id):
+        journey = await Journey.objects.select_related("train").filter(
+            id=journey_id
+        ).afirst()
+        if journey is None:
+            return None
+
+        ids, taken_seats = [], []
+        async for ticket_id, cargo, seat in Ticket.objects.filter(
+            journey_id=journey_id
+        ).values_list("id", "cargo", "seat"):
+            ids.append(ticket_id)
+            taken_seats.append((cargo, seat))
+        return JourneySeatState(
+            journey_id,
+            journey.train.capacity,
+            taken_seats,
+            (len(ids), sum(ids)),
+        )
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._watchers.clear()
+        self._states.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._watchers:
+                return
+
+            try:
+                await self.poll()
+            except DatabaseError:
+                continue
+
+
+journey_feed = JourneyFeed()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def journey_event_stream(journey_id, queue, snapshot):
+    """Server-Sent Events body for one journey watcher"""
+    heartbeat = getattr(settings, "JOURNEY_FEED_HEARTBEAT_SECONDS", 15)
+    try:
+        yield format_event("snapshot", snapshot)
+        while True:
+            try:
+                delta = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event("seats", delta)
+    finally:
+        journey_feed.unsubscribe(journey_id, queue)
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from station.models import Ticket
+
+# Rows fetched per round trip of the server-side cursor
+CHUNK_ROWS = 2000
+# Text encoded before each compression step
+FLUSH_BYTES = 64 * 1024
+# Tells the app server that a worker still streaming is alive. Set to
+# gunicorn's worker.notify for sync workers, which otherwise only report
+# between requests and would be killed after APP_SERVER_TIMEOUT
+# (see post_worker_init in app/gunicorn.conf.py).
+worker_heartbeat = None
+
+# Column: Ticket lookup
+SALES_COLUMNS = {
+    "ticket": "id",
+    "cargo": "cargo",
+    "seat": "seat",
+    "order": "order_id",
+    "ordered_at": "order__created_at",
+    "user": "order__user_id",
+    "email": "order__user__email",
+    "journey": "journey_id",
+    "departure_time": "journey__departure_time",
+    "arrival_time": "journey__arrival_time",
+    "route": "journey__route_id",
+    "source": "journey__route__source__name",
+    "destination": "journey__route__destination__name",
+    "distance": "journey__route__distance",
+    "train": "journey__train_id",
+    "train_name": "journey__train__name",
+    "train_type": "journey__train__train_type__name",
+}
+
+
+def sales_rows(ordered_from=None, ordered_to=None):
+    """
+    Tuples of SALES_COLUMNS for every ticket ordered in [from, to), from
+    one join read through a server-side cursor
+    """
+    tickets = Ticket.objects.all()
+    if ordered_from is not None:
+        tickets = tickets.filter(order__created_at__gte=ordered_from)
+    if ordered_to is not None:
+        tickets = tickets.filter(order__created_at__lt=ordered_to)
+
+    return (
+        tickets.order_by("id")
+        .values_list(*SALES_COLUMNS.values())
+        .iterator(chunk_size=CHUNK_ROWS)
+    )
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SALES_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in row
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(SALES_COLUMNS, row))) + "\n"
+
+
+def gzipped(lines):
+    """Gzip member of the lines, compressed a block at a time"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    block = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            if data := compressor.compress("".join(block).encode()):
+                yield data
+            block = []
+            size = 0
+    yield compressor.compress("".join(block).encode()) + compressor.flush()
+
+
+def with_heartbeat(chunks):
+    """The chunks, reporting the worker alive as each one is sent"""
+    for chunk in chunks:
+        worker_heartbeat()
+        yield chunk
+
+
+async def iterate_in_thread(chunks):
+    """
+    Async iterator over a blocking one for ASGI servers, which would read
+    a sync one into memory first. Every step runs in the thread of the
+    request's database connection, which holds the cursor.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await step(chunks, None)) is not None:
+        yield chunk
@@ -0,0 +1,246 @@
+"""
+Declarative query-string filters. A view lists them in a `query_filters`
+mapping of parameter name to Filter; DeclaredFilterBackend applies them,
+documents them in the OpenAPI schema, and the "station.E001" system
+check refuses filters that no index serves.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.postgres.indexes import OpClass
+from django.core import checks
+from django.db.models import F, Index, UniqueConstraint
+from django.db.models.functions import Upper
+from django.utils import timezone
+from drf_spectacular.plumbing import build_basic_type, build_parameter_type
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+# Lookups comparing UPPER(column), which only an UPPER() index serves
+CASE_INSENSITIVE_LOOKUPS = {"iexact", "istartswith"}
+# LIKE 'prefix%' uses a btree index in a non-C collation only with these
+PATTERN_LOOKUPS = {"startswith", "istartswith"}
+
+
+class Filter:
+    """
+    One query parameter filtering `field` with `lookup`. The field is
+    served by its own index (primary key, foreign key, unique, db_index
+    or leading an index of its model), or by the index of its model
+    named `index`. A deprecated filter is still applied, and flagged
+    as such in the schema.
+    """
+
+    type = OpenApiTypes.STR
+    error = "An invalid value."
+
+    def __init__(
+        self,
+        field,
+        lookup="exact",
+        *,
+        description,
+        index=None,
+        deprecated=False,
+    ):
+        self.field = field
+        self.lookup = lookup
+        self.description = description
+        self.index = index
+        self.deprecated = deprecated
+
+    def parse(self, value):
+        """The value to filter on; raises ValueError when malformed"""
+        return value
+
+    def apply(self, queryset, value):
+        return queryset.filter(**{f"{self.field}__{self.lookup}": value})
+
+    def parameter(self, name):
+        """OpenAPI description of the query parameter"""
+        return build_parameter_type(
+            name,
+            build_basic_type(self.type),
+            OpenApiParameter.QUERY,
+            description=self.description,
+            deprecated=self.deprecated,
+        )
+
+
+class IntegerFilter(Filter):
+    type = OpenApiTypes.INT
+    error = "An id is expected."
+
+    def parse(self, value):
+        return int(value)
+
+
+class IdListFilter(Filter):
+    error = "Comma-separated ids are expected (ex. 1,2)."
+
+    def __init__(self, field, **kwargs):
+        super().__init__(field, "in", **kwargs)
+
+    def parse(self, value):
+        return [int(item) for item in value.split(",")]
+
+
+class PrefixFilter(Filter):
+    """
+    Case-insensitive prefix match, served by an index of UPPER(field)
+    with text_pattern_ops: a substring match could use no btree index
+    """
+
+    def __init__(self, field, *, index, **kwargs):
+        super().__init__(field, "istartswith", index=index, **kwargs)
+
+
+class DateFilter(Filter):
+    type = OpenApiTypes.DATE
+    error = "A date formatted YYYY-MM-DD is expected."
+
+    def parse(self, value):
+        return date.fromisoformat(value)
+
+
+class DayFilter(DateFilter):
+    """
+    Datetimes on a local day, as a range the field's index can serve
+    (unlike the __date lookup, which casts every row)
+    """
+
+    def __init__(self, field, **kwargs):
+        super().__init__(field, "range", **kwargs)
+
+    def apply(self, queryset, value):
+        start = timezone.make_aware(datetime.combine(value, time.min))
+        return queryset.filter(
+            **{
+                f"{self.field}__gte": start,
+                f"{self.field}__lt": start + timedelta(days=1),
+            }
+        )
+
+
+def apply_filters(queryset, query_filters, query_params):
+    """Filter on the parameters given; 400 naming every bad one"""
+    errors = {}
+    for name, query_filter in query_filters.items():
+        value = query_params.get(name)
+        if not value:
+            continue
+        try:
+            queryset = query_filter.apply(
+                queryset, query_filter.parse(value)
+            )
+        except ValueError:
+            errors[name] = query_filter.error
+    if errors:
+        raise ValidationError(errors)
+
+    return queryset
+
+
+class DeclaredFilterBackend(BaseFilterBackend):
+    """Applies and documents the `query_filters` of a view"""
+
+    def filter_queryset(self, request, queryset, view):
+        return apply_filters(
+            queryset,
+            getattr(view, "query_filters", {}),
+            request.query_params,
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            query_filter.parameter(name)
+            for name, query_filter in getattr(
+                view, "query_filters", {}
+            ).items()
+        ]
+
+
+def target_field(model, path):
+    """The model field at the end of a lookup path"""
+    *relations, name = path.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _leads(index, field, lookup):
+    """Whether an index or constraint starts with the field"""
+    case_insensitive = lookup in CASE_INSENSITIVE_LOOKUPS
+    if index.fields:
+        return (
+            not case_insensitive
+            and lookup not in PATTERN_LOOKUPS
+            and index.fields[0] in (field.name, field.attname)
+        )
+    expressions = getattr(index, "expressions", ())
+    if not expressions:
+        return False
+    nodes = list(expressions[0].flatten())
+    if lookup in PATTERN_LOOKUPS and not any(
+        isinstance(node, OpClass)
+        and node.extra["name"].endswith("pattern_ops")
+        for node in nodes
+    ):
+        return False
+    return any(
+        isinstance(node, F) and node.name in (field.name, field.attname)
+        for node in nodes
+    ) and case_insensitive == any(isinstance(node, Upper) for node in nodes)
+
+
+def filter_index_errors(view, query_filters):
+    errors = []
+    model = view.queryset.model
+    for name, query_filter in query_filters.items():
+        field = target_field(model, query_filter.field)
+        meta = field.model._meta
+        indexes = [*meta.indexes, *meta.constraints]
+        if query_filter.index is not None:
+            indexes = [
+                index
+                for index in indexes
+                if index.name == query_filter.index
+            ]
+        elif query_filter.lookup not in (
+            CASE_INSENSITIVE_LOOKUPS | PATTERN_LOOKUPS
+        ) and (field.unique or field.db_index):
+            continue
+
+        if not any(
+            _leads(index, field, query_filter.lookup)
+            for index in indexes
+            if isinstance(index, (Index, UniqueConstraint))
+        ):
+            errors.append(
+                checks.Error(
+                    f"{view.__name__} filters {name!r} on "
+                    f"{meta.label}.{field.name} ({query_filter.lookup}) "
+                    f"without an index serving it.",
+                    hint=(
+                        f"Add {query_filter.index or 'an index'} to "
+                        f"{meta.label}, or filter another field."
+                    ),
+                    obj=view,
+                    id="station.E001",
+                )
+            )
+    return errors
+
+
+@checks.register(checks.Tags.models)
+def check_filter_indexes(app_configs=None, **kwargs):
+    """Every declared filter of the station API is served by an index"""
+    from station.urls import router
+
+    errors = []
+    for _, viewset, _ in router.registry:
+        query_filters = getattr(viewset, "query_filters", None)
+        if query_filters:
+            errors += filter_index_errors(viewset, query_filters)
+    return errors
@@ -0,0 +1,45 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from station.models import Train
+
+
+def render_variant(image, max_size):
+    """Downscaled WebP copy; nothing but pixels is carried over"""
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size))
+    if variant.mode not in ("RGB", "RGBA"):
+        variant = variant.convert("RGBA" if "A" in variant.mode else "RGB")
+
+    buffer = BytesIO()
+    variant.save(buffer, "WEBP", quality=settings.IMAGE_VARIANT_QUALITY)
+    return buffer.getvalue()
+
+
+def process_train_image(train_id):
+    """Render the TRAIN_IMAGE_VARIANTS of a train image and store URLs"""
+    train = Train.objects.filter(pk=train_id).only("image").first()
+    if train is None or not train.image:
+        return
+
+    source_name = train.image.name
+    variants = {}
+
+    with train.image.open("rb") as source, Image.open(source) as image:
+        # Bake the EXIF orientation into the pixels before it is dropped
+        image = ImageOps.exif_transpose(image)
+        for name, max_size in settings.TRAIN_IMAGE_VARIANTS.items():
+            path = default_storage.save(
+                f"uploads/train/variants/{name}.webp",
+                ContentFile(render_variant(image, max_size)),
+            )
+            variants[name] = default_storage.url(path)
+
+    # Skip the write if a newer image was uploaded in the meantime
+    Train.objects.filter(pk=train_id, image=source_name).update(
+        image_variants=variants
+    )
@@ -0,0 +1,89 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GET requests at one or more running servers and "
+        "report throughput, e.g. the WSGI runserver journey list against "
+        "the async journey list served by uvicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="+",
+            help="Absolute URLs to benchmark, one result line per URL",
+        )
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--token",
+            default="",
+            help="JWT access token sent as 'Authorization: Bearer ...'",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def _fetch(self, url, token, timeout):
+        request = Request(url)
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+
+        started = time.perf_counter()
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (URLError, TimeoutError, ConnectionError):
+            ok = False
+
+        return time.perf_counter() - started, ok
+
+    def _run(self, url, options):
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            started = time.perf_counter()
+            results = list(
+                pool.map(
+                    lambda _: self._fetch(
+                        url, options["token"], options["timeout"]
+                    ),
+                    range(options["requests"]),
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        percentiles = statistics.quantiles(latencies, n=100)
+
+        return {
+            "rps": len(results) / elapsed,
+            "p50": percentiles[49] * 1000,
+            "p95": percentiles[94] * 1000,
+            "errors": errors,
+        }
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2 or options["concurrency"] < 1:
+            raise CommandError("Need at least 2 requests and 1 worker")
+
+        self.stdout.write(
+            f"{options['requests']} requests, "
+            f"concurrency {options['concurrency']}"
+        )
+        for url in options["urls"]:
+            result = self._run(url, options)
+            line = (
+                f"{url}: {result['rps']:.1f} req/s, "
+                f"p50 {result['p50']:.1f} ms, p95 {result['p95']:.1f} ms, "
+                f"{result['errors']} errors"
+            )
+            if result["errors"]:
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,99 @@
+import json
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from station.benchmarks import compare, run_benchmarks
+from station.datagen import SCALES, NetworkGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every station and user endpoint in-process against the "
+        "configured database and write p50/p95 latency, query counts and "
+        "peak memory to a JSON baseline, with the large tables their "
+        "query plans scan sequentially. Requests are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-data",
+            choices=SCALES,
+            help="Generate a synthetic network of this scale first "
+            "(see generate_data)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Only endpoints whose name contains one of these",
+        )
+        parser.add_argument(
+            "--output",
+            default=settings.BASE_DIR / "benchmarks" / "baseline.json",
+            type=Path,
+        )
+        parser.add_argument(
+            "--plans",
+            type=Path,
+            help="Write the EXPLAIN plans of each endpoint's queries "
+            "to this directory",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="Fail if results regressed against this baseline",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=1.5,
+            help="Allowed p50 slowdown factor when comparing",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("Need at least 2 iterations")
+
+        if options["seed_data"]:
+            NetworkGenerator(
+                SCALES[options["seed_data"]],
+                options["seed"],
+                log=self.stdout.write,
+            ).generate()
+
+        if options["plans"]:
+            options["plans"].mkdir(parents=True, exist_ok=True)
+
+        # Every journey-list call would be logged as a slow request
+        request_logger = logging.getLogger("monitoring.requests")
+        request_logger.disabled = True
+        try:
+            results = run_benchmarks(
+                options["iterations"],
+                options["only"],
+                log=self.stdout.write,
+                plans_dir=options["plans"],
+            )
+        finally:
+            request_logger.disabled = False
+        if results is None:
+            raise CommandError("No data to benchmark, use --seed-data")
+
+        options["output"].parent.mkdir(parents=True, exist_ok=True)
+        options["output"].write_text(
+            json.dumps(results, indent=2, sort_keys=True) + "\n"
+        )
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options["compare"]:
+            baseline = json.loads(options["compare"].read_text())
+            regressions = compare(baseline, results, options["tolerance"])
+            if regressions:
+                raise CommandError(
+                    "Regressions:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from station.datagen import ADMIN_EMAIL, PASSWORD, SCALES, NetworkGenerator
+from station.models import Journey
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a consistent synthetic train network (stations, routes, "
+        "trains, crews, journeys, users, orders and tickets) into an empty "
+        "database. The same --seed reproduces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        for name in SCALES["small"]:
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                help=f"Override the number of {name} of the scale",
+            )
+
+    def handle(self, *args, **options):
+        if Journey.objects.exists():
+            raise CommandError(
+                "The database already has journeys, "
+                "generate into an empty database"
+            )
+
+        sizes = {
+            name: size if options[name] is None else options[name]
+            for name, size in SCALES[options["scale"]].items()
+        }
+        if min(sizes.values()) < 0 or sizes["stations"] < 2:
+            raise CommandError("Need at least 2 stations and no negatives")
+        if sizes["routes"] > sizes["stations"] * (sizes["stations"] - 1):
+            raise CommandError("More routes than station pairs")
+        if sizes["crews"] < 2 or not sizes["trains"] or not sizes["users"]:
+            raise CommandError("Need at least 2 crews, 1 train and 1 user")
+
+        started = time.perf_counter()
+        NetworkGenerator(
+            sizes, options["seed"], log=self.stdout.write
+        ).generate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated in {time.perf_counter() - started:.1f} s. "
+                f"Log in as {ADMIN_EMAIL} / {PASSWORD}"
+            )
+        )
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from station import occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the occupancy rollups from the journeys and tickets, "
+        "after writes that bypass the ORM (COPY, raw SQL) or to check drift"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = occupancy.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} occupancy rows in "
+                f"{time.perf_counter() - started:.1f} s"
+            )
+        )
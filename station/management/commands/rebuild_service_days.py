@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from station import service_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the journey ids of every service day, after writes "
+        "that bypass the ORM (COPY, raw SQL) or cascaded deletes"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = service_days.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} service days in "
+                f"{time.perf_counter() - started:.1f} s"
+            )
+        )
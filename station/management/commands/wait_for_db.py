@@ -1,17 +1,50 @@
 import time
 from django.core.management.base import BaseCommand, CommandError
-from django.db import connections
+from django.db import connections, OperationalError
 
 
 class Command(BaseCommand):
+    help = "Block until the database accepts connections and queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60.0,
+            help="Give up after this many seconds",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=5.0,
+            help="Upper bound for the exponential backoff between attempts",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        db_conn = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        delay = 0.1
+
+        while True:
             try:
-                db_conn = connections["default"]
-            except CommandError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                db_conn.ensure_connection()
+                with db_conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                break
+            except OperationalError as error:
+                db_conn.close()
+                if time.monotonic() + delay > deadline:
+                    raise CommandError(
+                        f"Database unavailable after "
+                        f"{options['timeout']:.0f} seconds: {error}"
+                    )
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.1f} seconds..."
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, options["max_delay"])
+
+        db_conn.close()
         self.stdout.write(self.style.SUCCESS("Database available!"))
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.warmup import process_local_cache
+from station import warming
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the journey search and calendar caches of the hot station "
+        "pairs for the next 24 hours"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=settings.WARM_CACHES_LIMIT,
+            help="Number of hottest station pairs to warm",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.WARM_CACHES_WORKERS,
+            help="Searches filled at a time",
+        )
+
+    def handle(self, *args, **options):
+        if process_local_cache():
+            raise CommandError(
+                "The cache lives in this process only, nothing would be "
+                "warmed for the app servers: set CACHE_REDIS_URL."
+            )
+
+        started = time.perf_counter()
+        searches, months = warming.warm_caches(
+            options["limit"], options["workers"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {searches} searches and {months} calendar months "
+                f"in {time.perf_counter() - started:.1f} s"
+            )
+        )
@@ -0,0 +1,155 @@
+import io
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_safe
+
+from station.storage import is_content_addressed
+
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class FileRange(io.RawIOBase):
+    """
+    Read-only view of bytes [start, end) of an open file.
+
+    Keeps the real file offset and fileno, so servers that send files
+    with sendfile(2) (gunicorn's wsgi.file_wrapper) stay zero-copy,
+    while plain iteration stops at the end of the range.
+    """
+
+    def __init__(self, file, start, end):
+        self.file = file
+        self.name = file.name
+        self.start = start
+        self.end = end
+        self.file.seek(start)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            position = self.end + offset
+        elif whence == io.SEEK_CUR:
+            position = self.file.tell() + offset
+        else:
+            position = offset
+        return self.file.seek(min(max(position, self.start), self.end))
+
+    def read(self, size=-1):
+        remaining = self.end - self.file.tell()
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self.file.read(max(size, 0))
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def parse_range(header, size):
+    """(start, end) of a single 'bytes=' range, None to ignore, or False"""
+    match = RANGE_HEADER.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return False
+    if not first:
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+
+    if start >= size or start >= end:
+        return False
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve MEDIA_ROOT files with validators, Range support and far-future
+    caching of content-addressed names. With MEDIA_ACCEL_REDIRECT set,
+    the body is handed to the front proxy (nginx X-Accel-Redirect).
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    if is_content_addressed(path):
+        etag = quote_etag(os.path.splitext(os.path.basename(path))[0])
+        cache_control = IMMUTABLE
+    else:
+        etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        cache_control = "public, max-age=3600"
+
+    # Weak comparison: W/"x" matches "x"
+    if_none_match = {
+        tag.removeprefix("W/")
+        for tag in parse_etags(request.headers.get("If-None-Match", ""))
+    }
+    if etag in if_none_match or "*" in if_none_match:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        return response
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse()
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT + path
+        response["Content-Type"] = (
+            mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        )
+    else:
+        response = _file_response(request, full_path, stat.st_size, etag)
+
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _file_response(request, full_path, size, etag):
+    byte_range = None
+    if "Range" in request.headers and (
+        request.headers.get("If-Range", etag) == etag
+    ):
+        byte_range = parse_range(request.headers["Range"], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = open(full_path, "rb")
+    if byte_range is None:
+        return FileResponse(file)
+
+    start, end = byte_range
+    response = FileResponse(FileRange(file, start, end), status=206)
+    response["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return response
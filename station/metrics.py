@@ -0,0 +1,20 @@
+from monitoring.metrics import Counter, Histogram
+
+ORDER_CREATE_DURATION = Histogram(
+    "order_create_duration_seconds",
+    "Latency of order creation requests, failed ones included",
+)
+SEAT_CONFLICTS = Counter(
+    "seat_conflicts_total",
+    "Orders rejected by the unique seat constraint, per journey",
+    ["journey"],
+)
+TICKETS_SOLD = Counter(
+    "tickets_sold_total",
+    "Tickets of committed orders",
+)
+SEARCHES_COALESCED = Counter(
+    "journey_searches_coalesced_total",
+    "Journey search cache misses served by the same search running in "
+    "another thread",
+)
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-19 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0004_train_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("window_index", models.BigIntegerField()),
+                ("current", models.PositiveIntegerField()),
+                ("previous", models.PositiveIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-19 14:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0006_train_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="throttlecounter",
+            name="expires_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.1 on 2026-10-19 10:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+POPULATE_SQL = """
+    INSERT INTO station_occupancyrollup
+        (route_id, train_id, day, journeys, tickets_sold)
+    SELECT journey.route_id, journey.train_id,
+        (journey.departure_time AT TIME ZONE %s)::date,
+        count(*), coalesce(sum(sold.count), 0)
+    FROM station_journey journey
+    LEFT JOIN (
+        SELECT journey_id, count(*) AS count
+        FROM station_ticket
+        GROUP BY journey_id
+    ) sold ON sold.journey_id = journey.id
+    GROUP BY 1, 2, 3
+"""
+
+
+def populate(apps, schema_editor):
+    schema_editor.execute(POPULATE_SQL, [settings.TIME_ZONE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0007_throttlecounter_expires_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("journeys", models.IntegerField(default=0)),
+                ("tickets_sold", models.IntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="station.route",
+                    ),
+                ),
+                (
+                    "train",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="station.train",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "route", "train"],
+                "indexes": [
+                    models.Index(fields=["day"], name="station_occ_day_a4aeda_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("route", "train", "day"),
+                        name="unique_occupancy_route_train_day",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-19 10:59
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Big tables: build the indexes without blocking writes
+    atomic = False
+
+    dependencies = [
+        ("station", "0008_occupancyrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="journey",
+            index=models.Index(
+                fields=["departure_time"], name="station_jou_departu_f114b4_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="order",
+            index=models.Index(
+                fields=["created_at"], name="station_ord_created_51ec24_idx"
+            ),
+        ),
+    ]
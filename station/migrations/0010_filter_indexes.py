@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-19 11:08
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Big tables: build the indexes without blocking writes
+    atomic = False
+
+    dependencies = [
+        ("station", "0009_journey_departure_time_order_created_at"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="journey",
+            index=models.Index(
+                fields=["arrival_time"], name="station_jou_arrival_8b4a61_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="station",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="station_station_name_upper_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="train",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="station_train_name_upper_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1 on 2026-10-19 11:22
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+POPULATE_SQL = """
+    INSERT INTO station_serviceday
+        (source_id, destination_id, day, journey_ids)
+    SELECT route.source_id, route.destination_id,
+        (journey.departure_time AT TIME ZONE %s)::date,
+        array_agg(journey.id ORDER BY journey.departure_time, journey.id)
+    FROM station_journey journey
+    JOIN station_route route ON route.id = journey.route_id
+    GROUP BY 1, 2, 3
+"""
+
+
+def populate(apps, schema_editor):
+    schema_editor.execute(POPULATE_SQL, [settings.TIME_ZONE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0010_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "journey_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(), size=None
+                    ),
+                ),
+                (
+                    "destination",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="station.station",
+                    ),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="station.station",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "source", "destination"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "destination", "day"),
+                        name="unique_service_day",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
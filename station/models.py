@@ -1,8 +1,9 @@
 import os
-import uuid
-from django.utils.text import slugify
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import OpClass
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Upper
 from django.conf import settings
 
 
@@ -26,10 +27,10 @@ class TrainType(models.Model):
 
 
 def train_image_file_path(instance, filename):
+    # The storage replaces the base name with the content hash
     _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.title)}-{uuid.uuid4()}{extension}"
 
-    return os.path.join("uploads/train/", filename)
+    return os.path.join("uploads/train/", f"train{extension}")
 
 
 class Train(models.Model):
@@ -37,6 +38,7 @@ class Train(models.Model):
     cargo_num = models.PositiveIntegerField()
     places_in_cargo = models.PositiveIntegerField()
     image = models.ImageField(null=True, upload_to=train_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True)
     train_type = models.ForeignKey(
         TrainType,
         related_name="trains",
@@ -52,6 +54,13 @@ class Train(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Case-insensitive name prefix search (station.filters)
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="station_train_name_upper_idx",
+            )
+        ]
 
 
 class Station(models.Model):
@@ -59,6 +68,15 @@ class Station(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
 
+    class Meta:
+        indexes = [
+            # Case-insensitive name prefix search (station.filters)
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="station_station_name_upper_idx",
+            )
+        ]
+
     def __str__(self):
         return self.name
 
@@ -99,6 +117,10 @@ class Journey(models.Model):
 
     class Meta:
         ordering = ["train"]
+        indexes = [
+            models.Index(fields=["departure_time"]),
+            models.Index(fields=["arrival_time"]),
+        ]
 
     def __str__(self):
         return f"Route {self.route} by {self.train.name}"
@@ -116,6 +138,18 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at"])]
+
+
+class TicketQuerySet(models.QuerySet):
+    def delete(self):
+        # Uncounted in bulk: Ticket has no delete receivers (see
+        # station.signals.uncount_tickets)
+        from station.signals import uncount_tickets
+
+        with transaction.atomic(using=self.db):
+            uncount_tickets(self)
+            return super().delete()
 
 
 class Ticket(models.Model):
@@ -139,6 +173,8 @@ class Ticket(models.Model):
         )]
         ordering = ["cargo", "seat"]
 
+    objects = TicketQuerySet.as_manager()
+
     @staticmethod
     def validate_ticket(cargo, seat, train, error_to_raise):
         for ticket_attr_value, ticket_attr_name, train_attr_name in [
@@ -176,7 +212,90 @@ class Ticket(models.Model):
             force_insert, force_update, using, update_fields
         )
 
+    def delete(self, using=None, keep_parents=False):
+        from station.signals import uncount_tickets
+
+        with transaction.atomic(using=using):
+            uncount_tickets(Ticket.objects.filter(pk=self.pk))
+            return super().delete(using, keep_parents)
+
     def __str__(self) -> str:
         return (
             f"{self.journey} (cargo: {self.cargo}, seat: {self.seat})"
         )
+
+
+class ThrottleCounter(models.Model):
+    """Sliding-window request counters of one throttle key"""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    window_index = models.BigIntegerField()
+    current = models.PositiveIntegerField()
+    previous = models.PositiveIntegerField()
+    # Both counted windows are over, the row no longer limits anything
+    expires_at = models.DateTimeField(db_index=True)
+
+
+class OccupancyRollup(models.Model):
+    """
+    Journeys and tickets sold per route, train and departure day, kept
+    up to date as journeys and tickets are written (station.occupancy)
+    """
+
+    route = models.ForeignKey(
+        Route, related_name="occupancy", on_delete=models.CASCADE
+    )
+    train = models.ForeignKey(
+        Train, related_name="occupancy", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    journeys = models.IntegerField(default=0)
+    tickets_sold = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["route", "train", "day"],
+                name="unique_occupancy_route_train_day",
+            )
+        ]
+        indexes = [models.Index(fields=["day"])]
+        ordering = ["day", "route", "train"]
+
+    @property
+    def capacity(self):
+        return self.journeys * self.train.capacity
+
+    @property
+    def load_factor(self):
+        """Tickets sold per seat, None without any journey"""
+        if not self.capacity:
+            return None
+        return round(self.tickets_sold / self.capacity, 4)
+
+
+class ServiceDay(models.Model):
+    """
+    Ids of the journeys between two stations departing on a day, by
+    departure time: journey searches read one row by its key and fetch
+    the journeys by primary key (station.service_days)
+    """
+
+    # Served by the unique constraint it leads
+    source = models.ForeignKey(
+        Station, related_name="+", on_delete=models.CASCADE, db_index=False
+    )
+    destination = models.ForeignKey(
+        Station, related_name="+", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    journey_ids = ArrayField(models.BigIntegerField())
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "destination", "day"],
+                name="unique_service_day",
+            )
+        ]
+        ordering = ["day", "source", "destination"]
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from station.models import OccupancyRollup
+
+ROLLUP_TABLE = OccupancyRollup._meta.db_table
+
+# Add (journeys, tickets) to the rollup rows of (route, train, day) groups
+UPSERT_SQL = f"""
+    INSERT INTO {ROLLUP_TABLE} AS rollup
+        (route_id, train_id, day, journeys, tickets_sold)
+    {{rows}}
+    ON CONFLICT (route_id, train_id, day) DO UPDATE SET
+        journeys = rollup.journeys + excluded.journeys,
+        tickets_sold = rollup.tickets_sold + excluded.tickets_sold
+"""
+
+# One row per group however many journeys of it sold tickets (a row
+# may not be updated twice by one statement), locked in a fixed order
+TICKETS_SQL = UPSERT_SQL.format(
+    rows="""
+    SELECT journey.route_id, journey.train_id,
+        (journey.departure_time AT TIME ZONE %s)::date, 0, sum(sold.count)
+    FROM unnest(%s::bigint[], %s::integer[]) AS sold (journey_id, count)
+    JOIN station_journey journey ON journey.id = sold.journey_id
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    """
+)
+
+REBUILD_SQL = f"""
+    INSERT INTO {ROLLUP_TABLE}
+        (route_id, train_id, day, journeys, tickets_sold)
+    SELECT journey.route_id, journey.train_id,
+        (journey.departure_time AT TIME ZONE %s)::date,
+        count(*), coalesce(sum(sold.count), 0)
+    FROM station_journey journey
+    LEFT JOIN (
+        SELECT journey_id, count(*) AS count
+        FROM station_ticket
+        GROUP BY journey_id
+    ) sold ON sold.journey_id = journey.id
+    GROUP BY 1, 2, 3
+"""
+
+
+def departure_day(departure_time):
+    # Naive like DateTimeField reads them, in the default time zone
+    if timezone.is_naive(departure_time):
+        departure_time = timezone.make_aware(departure_time)
+    return timezone.localtime(departure_time).date()
+
+
+def add_tickets(sold):
+    """
+    Count tickets sold (or, negative, refunded), given per journey id,
+    in one statement
+    """
+    sold = {journey_id: count for journey_id, count in sold.items() if count}
+    if not sold:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TICKETS_SQL,
+            [settings.TIME_ZONE, list(sold), list(sold.values())],
+        )
+
+
+def add_journey(route_id, train_id, departure_time, journeys, tickets):
+    """Count a journey, and the tickets it has, in or out of its group"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_SQL.format(rows="VALUES (%s, %s, %s, %s, %s)"),
+            [
+                route_id,
+                train_id,
+                departure_day(departure_time),
+                journeys,
+                tickets,
+            ],
+        )
+
+
+def rebuild():
+    """
+    Recompute every rollup row from the journeys and tickets. Holds off
+    incremental updates meanwhile, so none is lost or counted twice.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {ROLLUP_TABLE} IN EXCLUSIVE MODE")
+        cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        cursor.execute(REBUILD_SQL, [settings.TIME_ZONE])
+        return cursor.rowcount
@@ -0,0 +1,163 @@
+"""
+Row counts for paginating big tables: above ESTIMATED_COUNT_THRESHOLD
+rows the Postgres planner's estimate stands in for SELECT COUNT(*),
+which reads every matching row. Counts below it stay exact. Estimated
+counts are cached per query, so only the first page pays for them.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimated_count(queryset):
+    """
+    The planner's row estimate for a queryset, None when it has none:
+    the table's reltuples when unfiltered, else the EXPLAIN estimate
+    """
+    query = queryset.query
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not (
+            query.has_filters()
+            or query.distinct
+            or query.group_by
+            or query.combinator
+        ):
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 until the table is first vacuumed or analyzed
+            if row is None or row[0] < 0:
+                return None
+            return int(row[0])
+
+        try:
+            sql, params = (
+                queryset.order_by().query.get_compiler(queryset.db).as_sql()
+            )
+        except EmptyResultSet:
+            return 0
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return int(cursor.fetchone()[0][0]["Plan"]["Plan Rows"])
+
+
+def _count_cache_key(queryset, threshold):
+    """Cache key of the estimated count of a query, None if it has none"""
+    try:
+        sql, params = (
+            queryset.order_by().query.get_compiler(queryset.db).as_sql()
+        )
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha256(
+        f"{queryset.db}:{threshold}:{sql}:{params!r}".encode()
+    ).hexdigest()
+    return f"estimated-count:{digest}"
+
+
+def approximate_count(queryset, threshold=None):
+    """
+    (count, is_estimate): exact below the threshold, else the planner's
+    estimate. Rows are counted up to the threshold only, so a small
+    result costs one query and a big one reads no more than that, once
+    per ESTIMATED_COUNT_CACHE_SECONDS for the same filters.
+    """
+    if threshold is None:
+        threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    key = _count_cache_key(queryset, threshold)
+    if key is not None:
+        estimate = cache.get(key)
+        if estimate is not None:
+            return estimate, True
+
+    capped = queryset.order_by()[:threshold].count()
+    if capped < threshold:
+        return capped, False
+
+    # The planner may guess fewer rows than were just counted
+    estimate = max(estimated_count(queryset) or 0, capped)
+    cache.set(key, estimate, settings.ESTIMATED_COUNT_CACHE_SECONDS)
+    return estimate, True
+
+
+class EstimatedPage(Page):
+    def has_next(self):
+        if self.paginator.count_is_estimate:
+            # The estimate can fall short of the rows: full pages go on
+            return len(self) == self.paginator.per_page
+        return super().has_next()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting big querysets from the planner's estimate. Its
+    pages run on past an estimate that falls short of the rows.
+    """
+
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.count_is_estimate = approximate_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page-number pagination for any viewset over a big table. Responses
+    say whether "count" is the planner's estimate.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_estimate": self.page.paginator.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count_is_estimate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        schema["required"].append("count_is_estimate")
+        return schema
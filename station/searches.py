@@ -0,0 +1,94 @@
+"""
+Cached journey searches (journeys/search/), keyed by the parsed station
+ids and day. Each key also carries a version of its station pair and
+day, replaced when one of their journeys or tickets changes (see
+station.signals): a search still running meanwhile stores its result
+under the old version, where nothing reads it.
+
+Concurrent misses of the same search in a process run one query, the
+others wait for its result. The cache itself, versions included, is
+shared by every process (CACHE_REDIS_URL), so a version replaced by a
+write in one worker is replaced for all of them.
+"""
+import threading
+import uuid
+from concurrent import futures
+
+from django.conf import settings
+from django.core.cache import cache
+
+from monitoring.metrics import record_cache_lookup
+from station.metrics import SEARCHES_COALESCED
+from station.occupancy import departure_day
+
+# Cache key: future of the search running for it in this process
+_running = {}
+_running_lock = threading.Lock()
+
+
+def _version_key(source_id, destination_id, day):
+    return f"journey-search-version:{source_id}:{destination_id}:{day}"
+
+
+def _new_version():
+    # Random, so a version lost to eviction never comes back
+    return uuid.uuid4().hex
+
+
+def _cache_key(source_id, destination_id, day):
+    version = cache.get_or_set(
+        _version_key(source_id, destination_id, day),
+        _new_version,
+        settings.JOURNEY_SEARCH_CACHE_SECONDS,
+    )
+    return f"journey-search:{source_id}:{destination_id}:{day}:{version}"
+
+
+def cached_search(source_id, destination_id, day, search):
+    """
+    The result of search() for the stations and day: cached, from the
+    same search running in another thread, or computed and cached
+    """
+    key = _cache_key(source_id, destination_id, day)
+    result = cache.get(key)
+    record_cache_lookup("journey_search", result is not None)
+    if result is not None:
+        return result
+
+    with _running_lock:
+        running = _running.get(key)
+        if running is None:
+            future = _running[key] = futures.Future()
+    if running is not None:
+        SEARCHES_COALESCED.inc()
+        try:
+            return running.result(
+                timeout=settings.JOURNEY_SEARCH_WAIT_SECONDS
+            )
+        except futures.TimeoutError:
+            return search()
+
+    try:
+        result = search()
+    except BaseException as error:
+        future.set_exception(error)
+        raise
+    else:
+        cache.set(key, result, settings.JOURNEY_SEARCH_CACHE_SECONDS)
+        future.set_result(result)
+    finally:
+        with _running_lock:
+            del _running[key]
+
+    return result
+
+
+def forget_search(source_id, destination_id, departure_time):
+    """Drop the cached search a departure shows in"""
+    cache.set(
+        _version_key(
+            source_id, destination_id, departure_day(departure_time)
+        ),
+        _new_version(),
+        settings.JOURNEY_SEARCH_CACHE_SECONDS,
+    )
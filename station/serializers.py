@@ -1,3 +1,5 @@
+from collections import Counter
+
 from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -11,7 +13,9 @@ from station.models import (
     Journey,
     Ticket,
     Order,
+    OccupancyRollup,
 )
+from station.signals import tickets_changed
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -40,8 +44,18 @@ class TrainSerializer(serializers.ModelSerializer):
         )
 
 
-class TrainListSerializer(TrainSerializer):
+class TrainImageVariantsMixin:
+    def _variant_url(self, obj, name):
+        url = obj.image_variants.get(name)
+        request = self.context.get("request")
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class TrainListSerializer(TrainImageVariantsMixin, TrainSerializer):
     train_capacity = serializers.SerializerMethodField()
+    image_thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Train
@@ -50,17 +64,22 @@ class TrainListSerializer(TrainSerializer):
             "name",
             "train_type",
             "train_capacity",
+            "image_thumbnail",
         )
 
     def get_train_capacity(self, obj) -> int:
         return obj.capacity
 
+    def get_image_thumbnail(self, obj) -> str | None:
+        return self._variant_url(obj, "thumbnail")
 
-class TrainDetailSerializer(TrainSerializer):
+
+class TrainDetailSerializer(TrainImageVariantsMixin, TrainSerializer):
     train_type = serializers.SlugRelatedField(
         read_only=True, slug_field="name"
     )
     train_capacity = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Train
@@ -69,16 +88,24 @@ class TrainDetailSerializer(TrainSerializer):
             "name",
             "train_type",
             "train_capacity",
+            "image",
+            "image_variants",
         )
 
     def get_train_capacity(self, obj) -> int:
         return obj.capacity
 
+    def get_image_variants(self, obj) -> dict:
+        return {
+            name: self._variant_url(obj, name) for name in obj.image_variants
+        }
+
 
 class TrainImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
-        fields = ("id", "image")
+        fields = ("id", "image", "image_variants")
+        read_only_fields = ("image_variants",)
 
 
 class StationSerializer(serializers.ModelSerializer):
@@ -174,7 +201,66 @@ class JourneyDetailSerializer(JourneySerializer):
         )
 
 
+class JourneyCalendarSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    journeys = serializers.IntegerField()
+    seats_available = serializers.IntegerField()
+
+
+class OccupancyRollupSerializer(serializers.ModelSerializer):
+    source = serializers.CharField(source="route.source.name", read_only=True)
+    destination = serializers.CharField(
+        source="route.destination.name", read_only=True
+    )
+    train_name = serializers.CharField(source="train.name", read_only=True)
+    capacity = serializers.IntegerField(read_only=True)
+    load_factor = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = OccupancyRollup
+        fields = (
+            "day",
+            "route",
+            "source",
+            "destination",
+            "train",
+            "train_name",
+            "journeys",
+            "tickets_sold",
+            "capacity",
+            "load_factor",
+        )
+
+
+class OccupancyTotalsSerializer(serializers.Serializer):
+    journeys = serializers.IntegerField()
+    tickets_sold = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    load_factor = serializers.SerializerMethodField()
+
+    def get_load_factor(self, obj) -> float | None:
+        if not obj["capacity"]:
+            return None
+        return round(obj["tickets_sold"] / obj["capacity"], 4)
+
+
+class RouteOccupancySerializer(OccupancyTotalsSerializer):
+    route = serializers.IntegerField()
+    source = serializers.CharField(source="route__source__name")
+    destination = serializers.CharField(source="route__destination__name")
+
+
+class TrainOccupancySerializer(OccupancyTotalsSerializer):
+    train = serializers.IntegerField()
+    train_name = serializers.CharField(source="train__name")
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    # Its train is read by the seat range check
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -200,6 +286,29 @@ class TicketSeatSerializer(serializers.ModelSerializer):
         fields = ("cargo", "seat")
 
 
+class JourneySeatsSerializer(serializers.ModelSerializer):
+    cargo_num = serializers.IntegerField(
+        source="train.cargo_num", read_only=True
+    )
+    places_in_cargo = serializers.IntegerField(
+        source="train.places_in_cargo", read_only=True
+    )
+    tickets_available = serializers.IntegerField(read_only=True)
+    taken_seats = TicketSeatSerializer(
+        source="tickets", many=True, read_only=True
+    )
+
+    class Meta:
+        model = Journey
+        fields = (
+            "id",
+            "cargo_num",
+            "places_in_cargo",
+            "tickets_available",
+            "taken_seats",
+        )
+
+
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
 
@@ -211,8 +320,13 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            # Validated above, the seats are unique in the table: one
+            # insert, and one rollup update for every journey
+            tickets = Ticket.objects.bulk_create(
+                Ticket(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            )
+            tickets_changed(Counter(ticket.journey_id for ticket in tickets))
             return order
 
 
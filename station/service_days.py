@@ -0,0 +1,88 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from station.models import ServiceDay
+from station.occupancy import departure_day
+
+SERVICE_DAY_TABLE = ServiceDay._meta.db_table
+
+JOURNEY_IDS = """
+    array_agg(journey.id ORDER BY journey.departure_time, journey.id)
+"""
+
+# Serializes refreshes of one entry: each reads the journeys committed
+# by the one before it
+LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))"
+
+REFRESH_SQL = f"""
+    INSERT INTO {SERVICE_DAY_TABLE} AS service_day
+        (source_id, destination_id, day, journey_ids)
+    SELECT route.source_id, route.destination_id, %s, {JOURNEY_IDS}
+    FROM station_journey journey
+    JOIN station_route route ON route.id = journey.route_id
+    WHERE route.source_id = %s AND route.destination_id = %s
+        AND journey.departure_time >= %s AND journey.departure_time < %s
+    GROUP BY route.source_id, route.destination_id
+    ON CONFLICT (source_id, destination_id, day) DO UPDATE SET
+        journey_ids = excluded.journey_ids
+"""
+
+DELETE_SQL = f"""
+    DELETE FROM {SERVICE_DAY_TABLE}
+    WHERE source_id = %s AND destination_id = %s AND day = %s
+"""
+
+REBUILD_SQL = f"""
+    INSERT INTO {SERVICE_DAY_TABLE}
+        (source_id, destination_id, day, journey_ids)
+    SELECT route.source_id, route.destination_id,
+        (journey.departure_time AT TIME ZONE %s)::date, {JOURNEY_IDS}
+    FROM station_journey journey
+    JOIN station_route route ON route.id = journey.route_id
+    GROUP BY 1, 2, 3
+"""
+
+
+def day_bounds(day):
+    """Aware start of a day and of the next one"""
+    next_day = day + timedelta(days=1)
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(datetime.combine(next_day, time.min)),
+    )
+
+
+def journey_ids(source_id, destination_id, day):
+    """Ids of the journeys between the stations on a day, by departure"""
+    try:
+        return ServiceDay.objects.values_list("journey_ids", flat=True).get(
+            source_id=source_id, destination_id=destination_id, day=day
+        )
+    except ServiceDay.DoesNotExist:
+        return []
+
+
+def refresh(source_id, destination_id, departure_time):
+    """Recompute the entry of the stations and the departure's day"""
+    day = departure_day(departure_time)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            LOCK_SQL, [f"service-day:{source_id}:{destination_id}:{day}"]
+        )
+        cursor.execute(
+            REFRESH_SQL, [day, source_id, destination_id, *day_bounds(day)]
+        )
+        if not cursor.rowcount:
+            cursor.execute(DELETE_SQL, [source_id, destination_id, day])
+
+
+def rebuild():
+    """Recompute every entry from the journeys"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {SERVICE_DAY_TABLE} IN EXCLUSIVE MODE")
+        cursor.execute(f"DELETE FROM {SERVICE_DAY_TABLE}")
+        cursor.execute(REBUILD_SQL, [settings.TIME_ZONE])
+        return cursor.rowcount
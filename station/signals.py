@@ -0,0 +1,284 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from station import occupancy, service_days
+from station.availability import forget_calendar
+from station.events import journey_feed
+from station.models import Journey, Order, Route, Station, Ticket, Train
+from station.searches import forget_search
+
+
+def _rollups_cascaded(origin):
+    """Whether the delete removes the rollup rows themselves"""
+    model = getattr(origin, "model", type(origin))
+    return model in (Station, Route, Train)
+
+
+def forget_departure(source_id, destination_id, departure_time):
+    """Drop the cached calendar month and search a departure shows in"""
+    forget_calendar(source_id, destination_id, departure_time)
+    forget_search(source_id, destination_id, departure_time)
+
+
+def forget_journeys(journey_ids):
+    # Journeys of a station pair and day share a search version to bump
+    departures = {
+        (source_id, destination_id, occupancy.departure_day(departure)): (
+            source_id,
+            destination_id,
+            departure,
+        )
+        for source_id, destination_id, departure in Journey.objects.filter(
+            id__in=journey_ids
+        ).values_list(
+            "route__source_id", "route__destination_id", "departure_time"
+        )
+    }
+    for departure in departures.values():
+        forget_departure(*departure)
+
+
+class _ForgottenJourneys(set):
+    """Journey ids changed in a transaction, forgotten once it commits"""
+
+    done = False
+
+    def __call__(self):
+        self.done = True
+        forget_journeys(self)
+
+
+def forget_journeys_on_commit(journey_ids):
+    """
+    Forget the journeys once the transaction commits. Its changes share
+    one callback, which forgets every journey once however many of its
+    tickets changed.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, "forgotten_journeys", None)
+    # Not if run, or discarded with a rolled back savepoint
+    if (
+        pending is not None
+        and not pending.done
+        and any(
+            callback is pending
+            for _, callback, _ in connection.run_on_commit
+        )
+    ):
+        pending.update(journey_ids)
+        return
+
+    pending = connection.forgotten_journeys = _ForgottenJourneys(journey_ids)
+    transaction.on_commit(pending)
+
+
+def tickets_changed(sold):
+    """
+    Tickets created (or, negative, deleted) per journey id in bulk, which
+    sends no signals: counted in this transaction's rollups, then shown
+    to seat watchers and dropped from the caches once it commits
+    """
+    if not sold:
+        return
+    occupancy.add_tickets(sold)
+    transaction.on_commit(journey_feed.notify)
+    forget_journeys_on_commit(sold)
+
+
+def uncount_tickets(tickets):
+    """
+    Take the tickets of a queryset about to be deleted out of the
+    rollups, grouped per journey. Ticket has no delete receivers, which
+    would load every ticket and stop the fast delete of cascades.
+    """
+    tickets_changed(
+        {
+            journey_id: -count
+            for journey_id, count in tickets.order_by()
+            .values("journey_id")
+            .annotate(count=Count("id"))
+            .values_list("journey_id", "count")
+        }
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def wake_journey_feed(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(journey_feed.notify)
+
+
+@receiver(pre_save, sender=Journey)
+def remember_journey(sender, instance, **kwargs):
+    """
+    Where the journey was: its old calendar month, rollup and service day
+    change
+    """
+    instance._before = None
+    if instance.pk is not None:
+        instance._before = (
+            Journey.objects.filter(pk=instance.pk)
+            .values(
+                "route_id",
+                "train_id",
+                "departure_time",
+                "route__source_id",
+                "route__destination_id",
+            )
+            .first()
+        )
+
+
+@receiver(post_save, sender=Journey)
+def forget_saved_journey(sender, instance, **kwargs):
+    before = getattr(instance, "_before", None)
+    if before and (before["route_id"], before["departure_time"]) != (
+        instance.route_id,
+        instance.departure_time,
+    ):
+        transaction.on_commit(
+            partial(
+                forget_departure,
+                before["route__source_id"],
+                before["route__destination_id"],
+                before["departure_time"],
+            )
+        )
+    forget_journeys_on_commit([instance.pk])
+
+
+@receiver(post_save, sender=Journey)
+def count_saved_journey(sender, instance, created, **kwargs):
+    if created:
+        occupancy.add_journey(
+            instance.route_id, instance.train_id, instance.departure_time, 1, 0
+        )
+        return
+
+    before = getattr(instance, "_before", None)
+    if before is None or (
+        before["route_id"],
+        before["train_id"],
+        occupancy.departure_day(before["departure_time"]),
+    ) == (
+        instance.route_id,
+        instance.train_id,
+        occupancy.departure_day(instance.departure_time),
+    ):
+        return
+
+    sold = instance.tickets.count()
+    occupancy.add_journey(
+        before["route_id"],
+        before["train_id"],
+        before["departure_time"],
+        -1,
+        -sold,
+    )
+    occupancy.add_journey(
+        instance.route_id, instance.train_id, instance.departure_time, 1, sold
+    )
+
+
+@receiver(post_save, sender=Journey)
+def list_saved_journey(sender, instance, created, **kwargs):
+    before = getattr(instance, "_before", None)
+    if before and (before["route_id"], before["departure_time"]) == (
+        instance.route_id,
+        instance.departure_time,
+    ):
+        return
+
+    route = instance.route
+    service_days.refresh(
+        route.source_id, route.destination_id, instance.departure_time
+    )
+    if before and (
+        before["route__source_id"],
+        before["route__destination_id"],
+        occupancy.departure_day(before["departure_time"]),
+    ) != (
+        route.source_id,
+        route.destination_id,
+        occupancy.departure_day(instance.departure_time),
+    ):
+        service_days.refresh(
+            before["route__source_id"],
+            before["route__destination_id"],
+            before["departure_time"],
+        )
+
+
+@receiver(pre_delete, sender=Journey)
+def remember_journey_tickets(sender, instance, origin=None, **kwargs):
+    """The tickets the journey takes out of its rollup as they cascade"""
+    if not _rollups_cascaded(origin):
+        instance._sold = instance.tickets.count()
+
+
+@receiver(post_delete, sender=Journey)
+def forget_deleted_journey(sender, instance, origin=None, **kwargs):
+    route = instance.route
+    transaction.on_commit(
+        partial(
+            forget_departure,
+            route.source_id,
+            route.destination_id,
+            instance.departure_time,
+        )
+    )
+    # Service days may keep the ids of cascaded deletes: searches fetch
+    # journeys by id
+    if not _rollups_cascaded(origin):
+        occupancy.add_journey(
+            instance.route_id,
+            instance.train_id,
+            instance.departure_time,
+            -1,
+            -getattr(instance, "_sold", 0),
+        )
+        service_days.refresh(
+            route.source_id, route.destination_id, instance.departure_time
+        )
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_journey(sender, instance, **kwargs):
+    instance._journey_before = None
+    if instance.pk is not None:
+        instance._journey_before = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("journey_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, **kwargs):
+    before = getattr(instance, "_journey_before", None)
+    if created:
+        occupancy.add_tickets({instance.journey_id: 1})
+    elif before is not None and before != instance.journey_id:
+        occupancy.add_tickets({before: -1, instance.journey_id: 1})
+
+
+@receiver(post_save, sender=Ticket)
+def forget_ticket_journey(sender, instance, **kwargs):
+    journey_ids = {instance.journey_id}
+    if getattr(instance, "_journey_before", None) is not None:
+        journey_ids.add(instance._journey_before)
+    forget_journeys_on_commit(journey_ids)
+
+
+@receiver(pre_delete, sender=Order)
+def uncount_order_tickets(sender, instance, **kwargs):
+    uncount_tickets(instance.tickets.all())
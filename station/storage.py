@@ -0,0 +1,59 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(\.\w+)?$")
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_NAME.match(os.path.basename(name)))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores files under the SHA-256 of their content, keeping only the
+    directory and extension of the requested name:
+    uploads/train/photo.jpg -> uploads/train/ab/ab12...ef.jpg
+
+    Identical uploads share one file, and since a name never changes
+    content, URLs can be cached forever. The file is written under a
+    temporary name and renamed onto its hash, so concurrent uploads of
+    the same bytes replace each other instead of being given suffixes.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+
+        digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        _, extension = os.path.splitext(name)
+        name = os.path.join(directory, digest[:2], digest + extension.lower())
+
+        validate_file_name(name, allow_relative_path=True)
+        if self.exists(name):
+            return name
+
+        temporary = self._save(
+            os.path.join(
+                os.path.dirname(name), f".{digest}.{uuid.uuid4().hex}.tmp"
+            ),
+            content,
+        )
+        os.replace(self.path(temporary), self.path(name))
+        return name
@@ -0,0 +1,46 @@
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from station import images
+from station.models import Order, ThrottleCounter
+from taskqueue.registry import task
+
+
+@task()
+def process_train_image(train_id):
+    images.process_train_image(train_id)
+
+
+@task(max_attempts=5)
+def send_order_confirmation(order_id):
+    order = (
+        Order.objects.select_related("user")
+        .prefetch_related(
+            "tickets__journey__route__source",
+            "tickets__journey__route__destination",
+            "tickets__journey__train",
+        )
+        .filter(pk=order_id)
+        .first()
+    )
+    if order is None:
+        return
+
+    lines = [
+        f"{ticket.journey.route}, departure "
+        f"{ticket.journey.departure_time:%Y-%m-%d %H:%M}, "
+        f"cargo {ticket.cargo}, seat {ticket.seat}"
+        for ticket in order.tickets.all()
+    ]
+    send_mail(
+        subject=f"Your order #{order.pk}",
+        message="Your tickets:\n" + "\n".join(lines),
+        from_email=None,
+        recipient_list=[order.user.email],
+    )
+
+
+@task()
+def prune_throttle_counters():
+    """Delete throttle counters whose windows are all over"""
+    ThrottleCounter.objects.filter(expires_at__lt=timezone.now()).delete()
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from station.tests.test_query_budgets import populate
+
+CHANGELISTS = [
+    "admin:station_journey_changelist",
+    "admin:station_order_changelist",
+    "admin:station_ticket_changelist",
+    "admin:station_route_changelist",
+    "admin:station_train_changelist",
+    "admin:station_occupancyrollup_changelist",
+]
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self) -> None:
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_login(self.admin)
+
+    def count_queries(self):
+        counts = {}
+        for name in CHANGELISTS:
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(reverse(name))
+            self.assertEqual(res.status_code, 200, name)
+            counts[name] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        journey = populate(1, self.admin)
+        one = self.count_queries()
+        populate(99, self.admin, first=1)
+        hundred = self.count_queries()
+
+        for name, count in one.items():
+            with self.subTest(name):
+                self.assertEqual(hundred[name], count)
+
+        res = self.client.get(
+            reverse("admin:station_journey_change", args=[journey.id])
+        )
+        self.assertEqual(res.status_code, 200)
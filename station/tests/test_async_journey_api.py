@@ -0,0 +1,170 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Count
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.serializers import (
+    JourneyDetailSerializer,
+    JourneyListSerializer,
+)
+
+JOURNEY_ASYNC_URL = reverse("station:journey-list-async")
+
+
+def detail_url(journey_id):
+    return reverse("station:journey-detail-async", args=[journey_id])
+
+
+def seats_url(journey_id):
+    return reverse("station:journey-seats-async", args=[journey_id])
+
+
+def sample_user(**params):
+    defaults = {
+        "email": "user@user.com",
+        "password": "test1234",
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+def sample_journey(**params):
+    source_station = Station.objects.create(
+        name="Station A",
+        latitude=50.4501,
+        longitude=30.5234
+    )
+    destination_station = Station.objects.create(
+        name="Station B",
+        latitude=49.8397,
+        longitude=24.0297
+    )
+    route = Route.objects.create(
+        source=source_station,
+        destination=destination_station,
+        distance=300
+    )
+    train = Train.objects.create(
+        name="Sample Train",
+        cargo_num=2,
+        places_in_cargo=5,
+        train_type=TrainType.objects.create(name="train_type_name")
+    )
+
+    defaults = {
+        "route": route,
+        "train": train,
+        "departure_time": datetime(year=2024, month=5, day=2, hour=13),
+        "arrival_time": datetime(year=2024, month=5, day=3, hour=15),
+    }
+    defaults.update(params)
+
+    return Journey.objects.create(**defaults)
+
+
+def annotated_journeys():
+    return Journey.objects.annotate(
+        tickets_available=(
+            F("train__cargo_num") * F("train__places_in_cargo")
+            - Count("tickets")
+        )
+    )
+
+
+class UnauthenticatedAsyncJourneyApiTests(TestCase):
+    def test_auth_required(self):
+        res = self.client.get(JOURNEY_ASYNC_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalid_token_rejected(self):
+        res = self.client.get(
+            JOURNEY_ASYNC_URL, HTTP_AUTHORIZATION="Bearer not-a-token"
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedAsyncJourneyApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = sample_user()
+        self.headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        self.journey = sample_journey()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            journey=self.journey, order=order, cargo=1, seat=3
+        )
+
+    def test_list_journey(self):
+        res = self.client.get(JOURNEY_ASYNC_URL, **self.headers)
+
+        serializer = JourneyListSerializer(annotated_journeys(), many=True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), serializer.data)
+
+    def test_list_matches_sync_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        sync_res = client.get(
+            reverse("station:journey-list"), {"from": "station a"}
+        )
+        async_res = self.client.get(
+            JOURNEY_ASYNC_URL, {"from": "station a"}, **self.headers
+        )
+
+        self.assertEqual(async_res.json(), sync_res.json())
+
+    def test_retrieve_journey(self):
+        res = self.client.get(detail_url(self.journey.id), **self.headers)
+
+        serializer = JourneyDetailSerializer(
+            annotated_journeys().get(id=self.journey.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), serializer.data)
+
+    def test_retrieve_missing_journey(self):
+        res = self.client.get(detail_url(self.journey.id + 1), **self.headers)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_journey_seats(self):
+        res = self.client.get(seats_url(self.journey.id), **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["tickets_available"], 9)
+        self.assertEqual(res.json()["taken_seats"], [{"cargo": 1, "seat": 3}])
+
+    def test_journey_seats_matches_sync_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        sync_res = client.get(
+            reverse("station:journey-seats", args=[self.journey.id])
+        )
+        async_res = self.client.get(seats_url(self.journey.id), **self.headers)
+
+        self.assertEqual(sync_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_res.json(), sync_res.json())
+
+    def test_write_not_allowed(self):
+        res = self.client.post(JOURNEY_ASYNC_URL, {}, **self.headers)
+        self.assertEqual(
+            res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
@@ -0,0 +1,151 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from station.benchmarks import compare
+from station.datagen import SCALES, NetworkGenerator
+from station.models import Order, Ticket
+
+TINY = {
+    "stations": 10,
+    "routes": 20,
+    "trains": 3,
+    "crews": 5,
+    "journeys": 30,
+    "users": 5,
+    "tickets": 300,
+}
+
+
+@mock.patch.dict(SCALES, {"tiny": TINY})
+class BenchEndpointsCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.output = Path(tempfile.mkdtemp()) / "baseline.json"
+        # Uploaded images are files, not rolled back with the requests
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def bench(self, *args):
+        call_command(
+            "bench_endpoints",
+            "--iterations", "2",
+            "--output", str(self.output),
+            *args,
+            stdout=StringIO(),
+        )
+        return json.loads(self.output.read_text())
+
+    def test_seed_and_benchmark(self):
+        results = self.bench("--seed-data", "tiny")
+
+        self.assertEqual(results["rows"]["journey"], 30)
+        for name in (
+            "journey-list",
+            "journey-create",
+            "journey-update",
+            "journey-partial-update",
+            "journey-delete",
+            "train-update",
+            "user-partial-update",
+            "train-upload-image",
+            "occupancy-report",
+            "sales-export",
+        ):
+            self.assertIn(name, results["endpoints"])
+        for name, result in results["endpoints"].items():
+            self.assertLess(result["status"], 400, name)
+            self.assertGreater(result["queries"], 0, name)
+            self.assertGreaterEqual(result["p95_ms"], result["p50_ms"])
+            # Nothing is large enough to be flagged at this scale
+            self.assertEqual(result["seq_scans"], [], name)
+
+    def test_plans_written(self):
+        plans = self.output.parent / "plans"
+
+        self.bench(
+            "--seed-data", "tiny",
+            "--only", "route-list",
+            "--plans", str(plans),
+        )
+
+        route_plans = json.loads((plans / "route-list.json").read_text())
+        self.assertTrue(route_plans)
+        self.assertIn("Node Type", route_plans[-1]["plan"])
+
+    def test_requests_are_rolled_back(self):
+        NetworkGenerator(TINY, log=lambda message: None).generate()
+        orders, tickets = Order.objects.count(), Ticket.objects.count()
+
+        results = self.bench("--only", "order-create")
+
+        self.assertEqual(
+            results["endpoints"]["order-create"]["status"],
+            status.HTTP_201_CREATED,
+        )
+        self.assertEqual(Order.objects.count(), orders)
+        self.assertEqual(Ticket.objects.count(), tickets)
+
+    def test_cached_endpoints_measured_cold(self):
+        NetworkGenerator(TINY, log=lambda message: None).generate()
+        names = ("journey-calendar", "journey-search")
+
+        cold = self.bench("--only", *names)["endpoints"]
+        with mock.patch("station.benchmarks.cache"):
+            warm = self.bench("--only", *names)["endpoints"]
+
+        for name in names:
+            self.assertGreater(
+                cold[name]["queries"], warm[name]["queries"], name
+            )
+
+    def test_no_data(self):
+        with self.assertRaises(CommandError):
+            self.bench()
+
+
+class CompareTests(TestCase):
+    def test_flags_query_and_latency_regressions(self):
+        baseline = {"endpoints": {"a": {"queries": 2, "p50_ms": 10}}}
+        results = {"endpoints": {"a": {"queries": 3, "p50_ms": 20}}}
+
+        self.assertEqual(len(compare(baseline, results, 1.5)), 2)
+        self.assertEqual(compare(baseline, baseline, 1.5), [])
+
+    def test_flags_new_sequential_scans(self):
+        baseline = {
+            "endpoints": {
+                "a": {"queries": 2, "p50_ms": 10, "seq_scans": ["route"]}
+            }
+        }
+        results = {
+            "endpoints": {
+                "a": {
+                    "queries": 2,
+                    "p50_ms": 10,
+                    "seq_scans": ["route", "station_ticket"],
+                }
+            }
+        }
+
+        self.assertEqual(
+            compare(baseline, results, 1.5),
+            ["a: new sequential scan on station_ticket"],
+        )
+        self.assertEqual(compare(results, baseline, 1.5), [])
+
+    def test_ignores_small_absolute_slowdowns(self):
+        baseline = {"endpoints": {"a": {"queries": 2, "p50_ms": 1}}}
+        results = {"endpoints": {"a": {"queries": 2, "p50_ms": 4}}}
+
+        self.assertEqual(compare(baseline, results, 1.5), [])
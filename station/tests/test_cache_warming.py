@@ -0,0 +1,170 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app import warmup
+from station import warming
+from station.models import Journey, Route, Station, Train, TrainType
+from station.occupancy import departure_day
+from station.tests.test_journey_calendar import CALENDAR_URL
+from station.tests.test_service_days import SEARCH_URL
+
+
+@override_settings(WARM_SEARCHES_FILE="")
+class CacheWarmingTests(TransactionTestCase):
+    def setUp(self) -> None:
+        # A cache other processes would share, as the command requires
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared_cache = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased."
+                    "FileBasedCache",
+                    "LOCATION": directory.name,
+                }
+            }
+        )
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        cache.clear()
+        kyiv, lviv, odesa = Station.objects.bulk_create(
+            [
+                Station(name="Kyiv", latitude=50.45, longitude=30.52),
+                Station(name="Lviv", latitude=49.84, longitude=24.03),
+                Station(name="Odesa", latitude=46.48, longitude=30.72),
+            ]
+        )
+        self.busy = Route.objects.create(
+            source=kyiv, destination=lviv, distance=540
+        )
+        self.quiet = Route.objects.create(
+            source=kyiv, destination=odesa, distance=475
+        )
+        self.later = Route.objects.create(
+            source=lviv, destination=odesa, distance=790
+        )
+        self.train = Train.objects.create(
+            name="Express",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Intercity"),
+        )
+        soon = timezone.now() + timedelta(hours=2)
+        self.create_journey(self.busy, soon)
+        self.create_journey(self.busy, soon + timedelta(hours=1))
+        self.create_journey(self.quiet, soon)
+        self.create_journey(self.later, soon + timedelta(days=3))
+        self.day = departure_day(soon)
+
+    def create_journey(self, route, departure):
+        return Journey.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=6),
+        )
+
+    def pairs(self, searches):
+        return list(
+            dict.fromkeys(
+                (source_id, destination_id)
+                for source_id, destination_id, _ in searches
+            )
+        )
+
+    def test_busiest_pairs_of_the_next_day(self):
+        searches = warming.hot_searches(limit=5)
+
+        self.assertEqual(
+            self.pairs(searches),
+            [
+                (self.busy.source_id, self.busy.destination_id),
+                (self.quiet.source_id, self.quiet.destination_id),
+            ],
+        )
+        self.assertIn(
+            (self.busy.source_id, self.busy.destination_id, self.day),
+            searches,
+        )
+
+    def test_listed_pairs(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as file:
+            json.dump(
+                [
+                    {
+                        "from": self.later.source_id,
+                        "to": self.later.destination_id,
+                    },
+                    {
+                        "from": self.busy.source_id,
+                        "to": self.busy.destination_id,
+                    },
+                ],
+                file,
+            )
+            file.flush()
+            with override_settings(WARM_SEARCHES_FILE=file.name):
+                searches = warming.hot_searches(limit=1)
+
+        self.assertEqual(
+            self.pairs(searches),
+            [(self.later.source_id, self.later.destination_id)],
+        )
+
+    def test_warmed_searches_and_calendars_are_cached(self):
+        out = StringIO()
+        call_command("warm_caches", "--limit=1", "--workers=2", stdout=out)
+        self.assertIn("Warmed", out.getvalue())
+
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        params = {
+            "from": self.busy.source_id,
+            "to": self.busy.destination_id,
+        }
+        # Only the throttle counter
+        with self.assertNumQueries(1):
+            res = client.get(
+                SEARCH_URL, {**params, "date": self.day.isoformat()}
+            )
+        self.assertEqual(len(res.data), 2)
+        with self.assertNumQueries(1):
+            client.get(
+                CALENDAR_URL, {**params, "month": self.day.strftime("%Y-%m")}
+            )
+
+    def test_command_needs_a_shared_cache(self):
+        with override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem."
+                    "LocMemCache"
+                }
+            }
+        ), self.assertRaises(CommandError):
+            call_command("warm_caches", stdout=StringIO())
+
+    def test_startup_hook_is_optional(self):
+        with mock.patch("station.warming.warm_caches") as warm_caches:
+            warmup.warm_caches()
+            warm_caches.assert_not_called()
+
+            with override_settings(
+                WARM_CACHES_ON_START=True,
+                WARM_CACHES_LIMIT=10,
+                WARM_CACHES_WORKERS=3,
+            ):
+                warmup.warm_caches()
+            warm_caches.assert_called_once_with(10, 3)
@@ -0,0 +1,156 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIClient
+
+from station.filters import (
+    Filter,
+    IntegerFilter,
+    PrefixFilter,
+    check_filter_indexes,
+    filter_index_errors,
+)
+from station.models import Train, TrainType
+from station.views import JourneyViewSet, TrainViewSet
+
+TRAIN_URL = reverse("station:train-list")
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class FilterIndexCheckTests(SimpleTestCase):
+    def test_station_api_passes(self):
+        self.assertEqual(check_filter_indexes(), [])
+
+    def test_unindexed_field(self):
+        errors = filter_index_errors(
+            TrainViewSet,
+            {"cargo": IntegerFilter("cargo_num", description="Cargos")},
+        )
+
+        self.assertEqual([error.id for error in errors], ["station.E001"])
+        self.assertIn("station.Train.cargo_num", errors[0].msg)
+
+    def test_foreign_key_is_indexed(self):
+        self.assertEqual(
+            filter_index_errors(
+                JourneyViewSet,
+                {"train": IntegerFilter("train", description="Train")},
+            ),
+            [],
+        )
+
+    def test_upper_index_does_not_serve_exact(self):
+        errors = filter_index_errors(
+            JourneyViewSet,
+            {"train": Filter("train__name", description="Train name")},
+        )
+
+        self.assertEqual(len(errors), 1)
+
+    def test_upper_index_serves_prefix_of_related_name(self):
+        self.assertEqual(
+            filter_index_errors(
+                JourneyViewSet,
+                {
+                    "train": PrefixFilter(
+                        "train__name",
+                        index="station_train_name_upper_idx",
+                        description="Train name",
+                    )
+                },
+            ),
+            [],
+        )
+
+    def test_missing_named_index(self):
+        errors = filter_index_errors(
+            TrainViewSet,
+            {
+                "name": PrefixFilter(
+                    "name", index="missing_idx", description="Name"
+                )
+            },
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("missing_idx", errors[0].hint)
+
+
+class DeclaredFilterApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(user)
+        passenger = TrainType.objects.create(name="passenger")
+        cargo = TrainType.objects.create(name="cargo")
+        self.express = Train.objects.create(
+            name="Express", cargo_num=5, places_in_cargo=10,
+            train_type=passenger,
+        )
+        self.freight = Train.objects.create(
+            name="Freight", cargo_num=5, places_in_cargo=10,
+            train_type=cargo,
+        )
+
+    def names(self, res):
+        return {train["name"] for train in res.data}
+
+    def test_prefix_is_case_insensitive(self):
+        res = self.client.get(TRAIN_URL, {"name": "exp"})
+
+        self.assertEqual(self.names(res), {"Express"})
+
+    def test_prefix_only(self):
+        res = self.client.get(TRAIN_URL, {"name": "press"})
+
+        self.assertEqual(self.names(res), set())
+
+    def test_id_list(self):
+        res = self.client.get(
+            TRAIN_URL, {"train_type": f"{self.freight.train_type_id}"}
+        )
+
+        self.assertEqual(self.names(res), {"Freight"})
+
+    def test_deprecated_alias(self):
+        res = self.client.get(
+            TRAIN_URL, {"trains": f"{self.freight.train_type_id}"}
+        )
+
+        self.assertEqual(self.names(res), {"Freight"})
+
+    def test_every_bad_parameter_is_reported(self):
+        res = self.client.get(
+            JOURNEY_URL, {"train_type": "1,a", "departure_date": "03.08.24"}
+        )
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(set(res.data), {"train_type", "departure_date"})
+
+    def test_blank_parameter_is_ignored(self):
+        res = self.client.get(TRAIN_URL, {"name": ""})
+
+        self.assertEqual(self.names(res), {"Express", "Freight"})
+
+
+class FilterSchemaTests(SimpleTestCase):
+    def test_filters_are_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        parameters = {
+            parameter["name"]: parameter
+            for parameter in schema["paths"]["/api/station/journeys/"]["get"][
+                "parameters"
+            ]
+        }
+
+        self.assertEqual(
+            parameters["departure_date"]["schema"],
+            {"type": "string", "format": "date"},
+        )
+        self.assertIn("from", parameters)
+        self.assertIn("train_type", parameters)
+        self.assertNotIn("deprecated", parameters["departure_date"])
+        self.assertTrue(parameters["departure_time"]["deprecated"])
@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F, Max, Sum
+from django.test import TestCase
+
+from station.models import (
+    Journey,
+    OccupancyRollup,
+    Order,
+    Route,
+    ServiceDay,
+    Station,
+    Ticket,
+)
+
+SIZES = [
+    "--stations", "12",
+    "--routes", "30",
+    "--trains", "4",
+    "--crews", "6",
+    "--journeys", "25",
+    "--users", "8",
+    "--tickets", "500",
+]
+
+
+def generate(*args):
+    call_command("generate_data", *SIZES, *args, stdout=StringIO())
+
+
+def snapshot():
+    return list(
+        Ticket.objects.order_by("id").values_list(
+            "journey__route__source__name",
+            "journey__departure_time",
+            "cargo",
+            "seat",
+            "order__user__email",
+        )
+    )
+
+
+class GenerateDataCommandTests(TestCase):
+    def test_generates_requested_sizes(self):
+        generate()
+
+        self.assertEqual(Station.objects.count(), 12)
+        self.assertEqual(Route.objects.count(), 30)
+        self.assertEqual(Journey.objects.count(), 25)
+        self.assertEqual(
+            get_user_model().objects.filter(is_staff=False).count(), 8
+        )
+        self.assertTrue(
+            get_user_model().objects.filter(is_superuser=True).exists()
+        )
+        self.assertGreater(Ticket.objects.count(), 0)
+
+    def test_data_is_consistent(self):
+        generate()
+
+        self.assertFalse(
+            Ticket.objects.filter(
+                cargo__gt=F("journey__train__cargo_num")
+            ).exists()
+        )
+        self.assertFalse(
+            Ticket.objects.filter(
+                seat__gt=F("journey__train__places_in_cargo")
+            ).exists()
+        )
+        self.assertEqual(
+            set(
+                Journey.objects.annotate(crews=Count("crew")).values_list(
+                    "crews", flat=True
+                )
+            ),
+            {2},
+        )
+        self.assertFalse(
+            Order.objects.filter(
+                created_at__gt=F("tickets__journey__departure_time")
+            ).exists()
+        )
+        self.assertEqual(
+            OccupancyRollup.objects.aggregate(
+                journeys=Sum("journeys"), tickets=Sum("tickets_sold")
+            ),
+            {
+                "journeys": Journey.objects.count(),
+                "tickets": Ticket.objects.count(),
+            },
+        )
+        self.assertEqual(
+            sum(
+                len(ids)
+                for ids in ServiceDay.objects.values_list(
+                    "journey_ids", flat=True
+                )
+            ),
+            Journey.objects.count(),
+        )
+
+    def test_sequences_continue_after_copied_ids(self):
+        generate()
+
+        last_id = Order.objects.aggregate(last=Max("id"))["last"]
+
+        order = Order.objects.create(user=get_user_model().objects.first())
+
+        self.assertEqual(order.id, last_id + 1)
+
+    def test_same_seed_same_data(self):
+        generate("--seed", "7")
+        first = snapshot()
+        for model in (Ticket, Order, Journey, Route, Station):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        generate("--seed", "7")
+
+        self.assertEqual(snapshot(), first)
+
+    def test_refuses_non_empty_database(self):
+        generate()
+
+        with self.assertRaises(CommandError):
+            generate()
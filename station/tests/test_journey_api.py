@@ -268,7 +268,7 @@ class AuthenticatedJourneyApiTests(TestCase):
         self.assertIn(new_journey_serializer.data, res.data)
 
     def test_filter_by_departure_date(self):
-        res = self.client.get(JOURNEY_URL, {"departure_date": "2024-05-01"})
+        res = self.client.get(JOURNEY_URL, {"departure_date": "2024-08-03"})
 
         default_journey_serializer = JourneyListSerializer(self.journey)
         new_journey_serializer = JourneyListSerializer(
@@ -279,7 +279,7 @@ class AuthenticatedJourneyApiTests(TestCase):
         self.assertIn(new_journey_serializer.data, res.data)
 
     def test_filter_by_arrival_date(self):
-        res = self.client.get(JOURNEY_URL, {"arrival_date": "2024-05-02"})
+        res = self.client.get(JOURNEY_URL, {"arrival_date": "2024-08-05"})
 
         default_journey_serializer = JourneyListSerializer(self.journey)
         new_journey_serializer = JourneyListSerializer(
@@ -289,6 +289,19 @@ class AuthenticatedJourneyApiTests(TestCase):
         self.assertNotIn(default_journey_serializer.data, res.data)
         self.assertIn(new_journey_serializer.data, res.data)
 
+    def test_filter_by_deprecated_date_params(self):
+        for params in (
+            {"departure_time": "2024-08-03"},
+            {"arrival_time": "2024-08-05"},
+        ):
+            res = self.client.get(JOURNEY_URL, params)
+
+            self.assertEqual(
+                [journey["id"] for journey in res.data],
+                [self.another_journey.id],
+                params,
+            )
+
 
 class AdminJourneyApiTest(TestCase):
     def setUp(self) -> None:
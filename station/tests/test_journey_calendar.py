@@ -0,0 +1,162 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app import warmup
+from station.models import Journey, Order, Route, Station, Train, TrainType
+
+CALENDAR_URL = reverse("station:journey-calendar")
+
+
+def at(day, hour=9):
+    return datetime(2024, 5, day, hour, tzinfo=timezone.utc)
+
+
+class JourneyCalendarTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        # Committed: tests see the callbacks of their own changes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = get_user_model().objects.create_user(
+                "test@test.com", "testpass"
+            )
+            self.client = APIClient()
+            self.client.force_authenticate(self.user)
+
+            kyiv, lviv = Station.objects.bulk_create(
+                [
+                    Station(name="Kyiv", latitude=50.45, longitude=30.52),
+                    Station(name="Lviv", latitude=49.84, longitude=24.03),
+                ]
+            )
+            self.route = Route.objects.create(
+                source=kyiv, destination=lviv, distance=540
+            )
+            self.reverse_route = Route.objects.create(
+                source=lviv, destination=kyiv, distance=540
+            )
+            self.train = Train.objects.create(
+                name="Express",
+                cargo_num=2,
+                places_in_cargo=10,
+                train_type=TrainType.objects.create(name="Intercity"),
+            )
+            self.journeys = [
+                self.journey(at(2)),
+                self.journey(at(2, 18)),
+                self.journey(at(20)),
+                self.journey(at(31, 23)),
+                self.journey(at(2), route=self.reverse_route),
+            ]
+            self.journey(datetime(2024, 6, 1, tzinfo=timezone.utc))
+            self.order = Order.objects.create(user=self.user)
+            self.order.tickets.create(journey=self.journeys[0], cargo=1, seat=1)
+            self.order.tickets.create(journey=self.journeys[0], cargo=1, seat=2)
+
+    def journey(self, departure, route=None):
+        return Journey.objects.create(
+            route=route or self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=6),
+        )
+
+    def calendar(self, month="2024-05", route=None):
+        route = route or self.route
+        return self.client.get(
+            CALENDAR_URL,
+            {
+                "from": route.source_id,
+                "to": route.destination_id,
+                "month": month,
+            },
+        )
+
+    def test_days_grouped(self):
+        res = self.calendar()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"date": "2024-05-02", "journeys": 2, "seats_available": 38},
+                {"date": "2024-05-20", "journeys": 1, "seats_available": 20},
+                {"date": "2024-05-31", "journeys": 1, "seats_available": 20},
+            ],
+        )
+
+    def test_invalid_params(self):
+        res = self.client.get(CALENDAR_URL, {"from": "x", "month": "May"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {"from", "to", "month"})
+
+    def test_cached_per_pair_and_month(self):
+        self.calendar()
+
+        # Only the throttle counter
+        with self.assertNumQueries(1):
+            res = self.calendar()
+        self.assertEqual(len(res.data), 3)
+
+        with self.assertNumQueries(2):
+            self.calendar(route=self.reverse_route)
+
+    def test_new_ticket_invalidates(self):
+        self.calendar()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.tickets.create(
+                journey=self.journeys[2], cargo=2, seat=1
+            )
+
+        self.assertEqual(self.calendar().data[1]["seats_available"], 19)
+
+    def test_moved_journey_invalidates_both_months(self):
+        self.calendar()
+        self.calendar(month="2024-06")
+
+        journey = self.journeys[2]
+        journey.departure_time = datetime(2024, 6, 3, tzinfo=timezone.utc)
+        with self.captureOnCommitCallbacks(execute=True):
+            journey.save()
+
+        self.assertEqual(len(self.calendar().data), 2)
+        self.assertEqual(len(self.calendar(month="2024-06").data), 2)
+
+    def test_deleted_journey_invalidates(self):
+        self.calendar()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journeys[3].delete()
+
+        self.assertEqual(len(self.calendar().data), 2)
+
+
+class SharedCacheTests(SimpleTestCase):
+    def test_workers_need_a_shared_cache(self):
+        with override_settings(APP_SERVER_WORKERS=1):
+            warmup.check_cache()
+
+        with override_settings(APP_SERVER_WORKERS=4):
+            with self.assertRaises(ImproperlyConfigured):
+                warmup.check_cache()
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            APP_SERVER_WORKERS=4,
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased."
+                    "FileBasedCache",
+                    "LOCATION": directory,
+                }
+            },
+        ):
+            warmup.check_cache()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+from datetime import datetime
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app.replicas import _read_database, reads_from
+from station.events import JourneyFeed
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+
+def stream_url(journey_id):
+    return reverse("station:journey-seats-stream", args=[journey_id])
+
+
+def sample_journey(**params):
+    route = Route.objects.create(
+        source=Station.objects.create(
+            name="Station A", latitude=50.4501, longitude=30.5234
+        ),
+        destination=Station.objects.create(
+            name="Station B", latitude=49.8397, longitude=24.0297
+        ),
+        distance=300
+    )
+    train = Train.objects.create(
+        name="Sample Train",
+        cargo_num=2,
+        places_in_cargo=5,
+        train_type=TrainType.objects.create(name="train_type_name")
+    )
+
+    defaults = {
+        "route": route,
+        "train": train,
+        "departure_time": datetime(year=2024, month=5, day=2, hour=13),
+        "arrival_time": datetime(year=2024, month=5, day=3, hour=15),
+    }
+    defaults.update(params)
+
+    return Journey.objects.create(**defaults)
+
+
+class JourneyFeedTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.order = Order.objects.create(user=self.user)
+        self.journey = sample_journey()
+        Ticket.objects.create(
+            journey=self.journey, order=self.order, cargo=1, seat=1
+        )
+        self.feed = JourneyFeed(poll_interval=60)
+
+    def tearDown(self) -> None:
+        if self.feed._task is not None:
+            self.feed._task.cancel()
+
+    def sell_seat(self, cargo, seat):
+        return sync_to_async(Ticket.objects.create)(
+            journey=self.journey, order=self.order, cargo=cargo, seat=seat
+        )
+
+    async def test_subscribe_returns_snapshot(self):
+        _, snapshot = await self.feed.subscribe(self.journey.id)
+
+        self.assertEqual(snapshot["tickets_available"], 9)
+        self.assertEqual(snapshot["taken_seats"], [{"cargo": 1, "seat": 1}])
+
+    async def test_subscribe_missing_journey(self):
+        self.assertIsNone(await self.feed.subscribe(self.journey.id + 1))
+
+    async def test_poll_fans_out_delta_to_all_watchers(self):
+        first, _ = await self.feed.subscribe(self.journey.id)
+        second, _ = await self.feed.subscribe(self.journey.id)
+
+        await self.sell_seat(2, 4)
+        await self.feed.poll()
+
+        expected = {
+            "journey": self.journey.id,
+            "tickets_available": 8,
+            "taken": [{"cargo": 2, "seat": 4}],
+            "freed": [],
+        }
+        self.assertEqual(first.get_nowait(), expected)
+        self.assertEqual(second.get_nowait(), expected)
+
+    async def test_poll_skips_seats_already_in_snapshot(self):
+        queue, _ = await self.feed.subscribe(self.journey.id)
+
+        await self.feed.poll()
+
+        self.assertTrue(queue.empty())
+
+    async def test_poll_finds_tickets_committed_out_of_id_order(self):
+        queue, _ = await self.feed.subscribe(self.journey.id)
+        later = await self.sell_seat(2, 4)
+        await sync_to_async(Ticket.objects.filter(pk=later.pk).update)(
+            id=later.id + 100
+        )
+        await self.feed.poll()
+        queue.get_nowait()
+
+        # A lower id than the ticket already seen
+        await self.sell_seat(2, 5)
+        await self.feed.poll()
+
+        self.assertEqual(
+            queue.get_nowait()["taken"], [{"cargo": 2, "seat": 5}]
+        )
+
+    async def test_poll_sends_freed_seats(self):
+        queue, _ = await self.feed.subscribe(self.journey.id)
+
+        await sync_to_async(Ticket.objects.filter(seat=1).delete)()
+        await self.feed.poll()
+
+        delta = queue.get_nowait()
+        self.assertEqual(delta["tickets_available"], 10)
+        self.assertEqual(delta["taken"], [])
+        self.assertEqual(delta["freed"], [{"cargo": 1, "seat": 1}])
+
+    async def test_poll_finds_seat_freed_and_sold_between_polls(self):
+        queue, _ = await self.feed.subscribe(self.journey.id)
+
+        await sync_to_async(Ticket.objects.filter(seat=1).delete)()
+        await self.sell_seat(2, 4)
+        await self.feed.poll()
+
+        delta = queue.get_nowait()
+        self.assertEqual(delta["taken"], [{"cargo": 2, "seat": 4}])
+        self.assertEqual(delta["freed"], [{"cargo": 1, "seat": 1}])
+
+    async def test_poller_ignores_subscriber_context(self):
+        read_databases = []
+
+        async def poll():
+            read_databases.append(_read_database.get())
+
+        with mock.patch.object(self.feed, "poll", poll):
+            with reads_from("replica1"):
+                await self.feed.subscribe(self.journey.id)
+            self.feed.notify()
+            while not read_databases:
+                await asyncio.sleep(0.01)
+
+        self.assertEqual(read_databases, [None])
+
+    async def test_unsubscribed_journey_is_not_polled(self):
+        queue, _ = await self.feed.subscribe(self.journey.id)
+        self.feed.unsubscribe(self.journey.id, queue)
+
+        await self.sell_seat(2, 4)
+        await self.feed.poll()
+
+        self.assertTrue(queue.empty())
+
+
+class JourneyStreamApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.journey = sample_journey()
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(stream_url(self.journey.id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_starts_with_snapshot(self):
+        res = await self.async_client.get(
+            stream_url(self.journey.id),
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+
+        stream = aiter(res.streaming_content)
+        event = await anext(stream)
+        await stream.aclose()
+
+        name, data = event.decode().strip().split("\n")
+        self.assertEqual(name, "event: snapshot")
+        self.assertEqual(
+            json.loads(data.removeprefix("data: ")),
+            {
+                "journey": self.journey.id,
+                "tickets_available": 10,
+                "taken_seats": [],
+            },
+        )
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from station.storage import ContentAddressedStorage
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_ACCEL_REDIRECT="")
+class MediaTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.name = default_storage.save(
+            "uploads/train/photo.JPG", ContentFile(CONTENT)
+        )
+        self.url = f"/media/{self.name}"
+        self.digest = hashlib.sha256(CONTENT).hexdigest()
+
+    def test_storage_names_by_content_hash(self):
+        self.assertEqual(
+            self.name, f"uploads/train/{self.digest[:2]}/{self.digest}.jpg"
+        )
+
+    def test_storage_deduplicates_identical_content(self):
+        again = default_storage.save(
+            "uploads/train/other.jpg", ContentFile(CONTENT)
+        )
+
+        self.assertEqual(again, self.name)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(default_storage.path(again)))), 1
+        )
+
+    def test_concurrent_identical_uploads_keep_the_hash_name(self):
+        # The other upload lands between this one's check and its write
+        with mock.patch.object(
+            ContentAddressedStorage, "exists", return_value=False
+        ):
+            again = default_storage.save(
+                "uploads/train/other.jpg", ContentFile(CONTENT)
+            )
+
+        self.assertEqual(again, self.name)
+        self.assertEqual(
+            os.listdir(os.path.dirname(default_storage.path(again))),
+            [os.path.basename(again)],
+        )
+
+    def test_serve_content_addressed_file(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["ETag"], f'"{self.digest}"')
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+
+    def test_not_modified(self):
+        res = self.client.get(
+            self.url, headers={"If-None-Match": f'"{self.digest}"'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_not_modified_weak_etag_in_list(self):
+        res = self.client.get(
+            self.url,
+            headers={"If-None-Match": f'"other", W/"{self.digest}"'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_modified_when_no_etag_matches(self):
+        res = self.client.get(
+            self.url, headers={"If-None-Match": '"other", W/"another"'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_range_request(self):
+        res = self.client.get(self.url, headers={"Range": "bytes=10-19"})
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(res["Content-Length"], "10")
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[10:20])
+
+    def test_suffix_range_request(self):
+        res = self.client.get(self.url, headers={"Range": "bytes=-4"})
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-4:])
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(self.url, headers={"Range": "bytes=5000-"})
+
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(res["Content-Range"], "bytes */1024")
+
+    def test_stale_if_range_returns_full_file(self):
+        res = self.client.get(
+            self.url, headers={"Range": "bytes=0-9", "If-Range": '"old"'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/")
+    def test_accel_redirect(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{self.name}"
+        )
+        self.assertEqual(res.content, b"")
+
+    def test_path_traversal_rejected(self):
+        res = self.client.get("/media/../../etc/passwd")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
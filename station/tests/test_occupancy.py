@@ -0,0 +1,297 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station import occupancy
+from station.models import (
+    Journey,
+    OccupancyRollup,
+    Order,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+ORDER_URL = reverse("station:order-list")
+OCCUPANCY_URL = reverse("station:occupancy-list")
+ROUTES_URL = reverse("station:occupancy-routes")
+TRAINS_URL = reverse("station:occupancy-trains")
+
+
+def at(day, hour=9):
+    return datetime(2024, 5, day, hour, tzinfo=timezone.utc)
+
+
+def rollups():
+    return sorted(
+        OccupancyRollup.objects.filter(journeys__gt=0).values_list(
+            "route_id", "train_id", "day", "journeys", "tickets_sold"
+        )
+    )
+
+
+class OccupancyTestCase(TestCase):
+    def setUp(self) -> None:
+        # Committed: tests see the callbacks of their own changes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = get_user_model().objects.create_user(
+                "test@test.com", "testpass"
+            )
+            kyiv, lviv, odesa = Station.objects.bulk_create(
+                [
+                    Station(name="Kyiv", latitude=50.45, longitude=30.52),
+                    Station(name="Lviv", latitude=49.84, longitude=24.03),
+                    Station(name="Odesa", latitude=46.48, longitude=30.72),
+                ]
+            )
+            self.route = Route.objects.create(
+                source=kyiv, destination=lviv, distance=540
+            )
+            self.other_route = Route.objects.create(
+                source=kyiv, destination=odesa, distance=475
+            )
+            train_type = TrainType.objects.create(name="Intercity")
+            self.train = Train.objects.create(
+                name="Express",
+                cargo_num=2,
+                places_in_cargo=10,
+                train_type=train_type,
+            )
+            self.other_train = Train.objects.create(
+                name="Regional",
+                cargo_num=1,
+                places_in_cargo=5,
+                train_type=train_type,
+            )
+            self.journey = self.create_journey(at(2))
+            self.order = Order.objects.create(user=self.user)
+
+    def create_journey(self, departure, route=None, train=None):
+        return Journey.objects.create(
+            route=route or self.route,
+            train=train or self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=6),
+        )
+
+    def sell(self, journey, *seats):
+        return [
+            self.order.tickets.create(journey=journey, cargo=1, seat=seat)
+            for seat in seats
+        ]
+
+
+
+class OccupancyTests(OccupancyTestCase):
+    def assertConsistent(self):
+        """The incremental rows equal the ones rebuilt from scratch"""
+        incremental = rollups()
+        occupancy.rebuild()
+        self.assertEqual(incremental, rollups())
+
+    def test_journeys_and_tickets_counted(self):
+        self.create_journey(at(2, 18))
+        self.sell(self.journey, 1, 2, 3)
+
+        self.assertEqual(
+            rollups(),
+            [(self.route.id, self.train.id, date(2024, 5, 2), 2, 3)],
+        )
+        self.assertConsistent()
+
+    def test_refund_and_journey_delete_uncounted(self):
+        tickets = self.sell(self.journey, 1, 2)
+        tickets[0].delete()
+        self.assertEqual(rollups()[0][-1], 1)
+
+        self.journey.delete()
+        self.assertEqual(rollups(), [])
+        self.assertConsistent()
+
+    def test_order_delete_uncounts_its_tickets(self):
+        self.sell(self.journey, 1, 2)
+        self.order.delete()
+
+        self.assertEqual(rollups()[0][-1], 0)
+        self.assertConsistent()
+
+    def test_order_counted_in_one_statement(self):
+        later = self.create_journey(at(2, 18))
+        other = self.create_journey(at(3), route=self.other_route)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        seats = [
+            (self.journey, 1),
+            (self.journey, 2),
+            (later, 1),
+            (other, 1),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"journey": journey.id, "cargo": 1, "seat": seat}
+                        for journey, seat in seats
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sum(
+                occupancy.ROLLUP_TABLE in query["sql"]
+                for query in queries.captured_queries
+            ),
+            1,
+        )
+        self.assertEqual([row[-1] for row in rollups()], [3, 1])
+        self.assertConsistent()
+
+    def test_order_delete_does_not_load_its_tickets(self):
+        self.sell(self.journey, *range(1, 6))
+
+        # Count per journey, rollup, tickets and order deletes
+        with self.assertNumQueries(4):
+            self.order.delete()
+
+        self.assertEqual(rollups()[0][-1], 0)
+        self.assertConsistent()
+
+    def test_tickets_queryset_delete_uncounted(self):
+        other = self.create_journey(at(4), route=self.other_route)
+        self.sell(self.journey, 1, 2, 3)
+        self.sell(other, 1)
+
+        self.order.tickets.filter(seat__lt=3).delete()
+
+        self.assertEqual([row[-1] for row in rollups()], [1, 0])
+        self.assertConsistent()
+
+    def test_journey_moved_to_another_group(self):
+        self.sell(self.journey, 1, 2)
+        self.journey.departure_time = at(3)
+        self.journey.train = self.other_train
+        self.journey.save()
+
+        self.assertEqual(
+            rollups(),
+            [(self.route.id, self.other_train.id, date(2024, 5, 3), 1, 2)],
+        )
+        self.assertConsistent()
+
+    def test_ticket_moved_to_another_journey(self):
+        other = self.create_journey(at(4), route=self.other_route)
+        ticket = self.sell(self.journey, 1)[0]
+        ticket.journey = other
+        ticket.save()
+
+        self.assertEqual([row[-1] for row in rollups()], [0, 1])
+        self.assertConsistent()
+
+    def test_route_delete_drops_its_rows(self):
+        self.sell(self.journey, 1)
+        self.create_journey(at(2), route=self.other_route)
+        self.route.delete()
+
+        self.assertEqual(
+            rollups(),
+            [(self.other_route.id, self.train.id, date(2024, 5, 2), 1, 0)],
+        )
+        self.assertConsistent()
+
+    def test_rebuild_command(self):
+        self.sell(self.journey, 1)
+        OccupancyRollup.objects.all().delete()
+
+        call_command("rebuild_occupancy", stdout=StringIO())
+
+        self.assertEqual(
+            rollups(),
+            [(self.route.id, self.train.id, date(2024, 5, 2), 1, 1)],
+        )
+
+
+class OccupancyReportTests(OccupancyTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.create_journey(at(2, 18))
+        self.create_journey(at(3), train=self.other_train)
+        self.create_journey(at(3), route=self.other_route)
+        self.sell(self.journey, 1, 2, 3, 4, 5)
+        self.user.is_staff = True
+        self.user.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_admin_only(self):
+        self.user.is_staff = False
+        self.client.force_authenticate(self.user)
+
+        for url in (OCCUPANCY_URL, ROUTES_URL, TRAINS_URL):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rows_per_route_train_and_day(self):
+        res = self.client.get(OCCUPANCY_URL, {"route": self.route.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        first = res.data["results"][0]
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(first["day"], "2024-05-02")
+        self.assertEqual(first["source"], "Kyiv")
+        self.assertEqual(first["journeys"], 2)
+        self.assertEqual(first["tickets_sold"], 5)
+        self.assertEqual(first["capacity"], 40)
+        self.assertEqual(first["load_factor"], 0.125)
+
+    def test_days_filtered(self):
+        res = self.client.get(
+            OCCUPANCY_URL, {"date_from": "2024-05-03", "date_to": "2024-05-03"}
+        )
+
+        self.assertEqual(
+            {row["day"] for row in res.data["results"]}, {"2024-05-03"}
+        )
+        self.assertEqual(res.data["count"], 2)
+
+    def test_bad_filters_rejected(self):
+        res = self.client.get(
+            OCCUPANCY_URL, {"date_from": "May", "train": "express"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {"date_from", "train"})
+
+    def test_totals_per_route(self):
+        res = self.client.get(ROUTES_URL)
+
+        totals = {row["route"]: row for row in res.data["results"]}
+        route = totals[self.route.id]
+        self.assertEqual(route["destination"], "Lviv")
+        self.assertEqual(route["journeys"], 3)
+        self.assertEqual(route["capacity"], 20 + 20 + 5)
+        self.assertEqual(route["load_factor"], round(5 / 45, 4))
+        self.assertEqual(totals[self.other_route.id]["tickets_sold"], 0)
+
+    def test_totals_per_train(self):
+        res = self.client.get(TRAINS_URL, {"route": self.route.id})
+
+        self.assertEqual(
+            [
+                (row["train_name"], row["journeys"], row["capacity"])
+                for row in res.data["results"]
+            ],
+            [("Express", 2, 40), ("Regional", 1, 5)],
+        )
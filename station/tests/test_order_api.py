@@ -1,14 +1,28 @@
 from datetime import datetime
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
-
-from station.models import Order, Journey, Route, Station, Train, TrainType
-from station.serializers import OrderListSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.metrics import SEAT_CONFLICTS, TICKETS_SOLD
+from station.models import (
+    Order,
+    Journey,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.serializers import OrderListSerializer, TicketSerializer
+from station.tasks import send_order_confirmation
+from taskqueue.models import Task
 
 ORDER_URL = reverse("station:order-list")
 
@@ -129,8 +143,87 @@ class AuthenticatedOrderApiTests(TestCase):
         res = self.client.post(ORDER_URL, data=data, format="json")
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
+        task = Task.objects.get()
+        self.assertEqual(task.name, "station.tasks.send_order_confirmation")
+        self.assertEqual(task.payload["args"], [res.data["id"]])
+
+    def test_send_order_confirmation(self):
+        order = sample_order(user=self.user)
+        order.tickets.create(journey=sample_journey(), cargo=1, seat=2)
+
+        send_order_confirmation(order.id)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["test@test.com"])
+        self.assertIn("cargo 1, seat 2", mail.outbox[0].body)
+
+    def test_tickets_sold_counted(self):
+        sold = TICKETS_SOLD.get() or 0
+        journey = sample_journey()
+        data = {
+            "tickets": [
+                {"cargo": 1, "seat": 1, "journey": journey.id},
+                {"cargo": 1, "seat": 2, "journey": journey.id},
+            ]
+        }
+
+        self.client.post(ORDER_URL, data=data, format="json")
+
+        self.assertEqual(TICKETS_SOLD.get(), sold + 2)
+
+    def test_seat_taken_concurrently(self):
+        journey = sample_journey()
+        sample_order(user=self.user).tickets.create(
+            journey=journey, cargo=1, seat=2
+        )
+        conflicts = SEAT_CONFLICTS.get(journey=journey.id) or 0
+        data = {"tickets": [{"cargo": 1, "seat": 2, "journey": journey.id}]}
+
+        # As if the other order committed between validation and insert
+        with mock.patch.object(
+            TicketSerializer, "get_validators", return_value=[]
+        ), mock.patch.object(Ticket, "validate_constraints"):
+            res = self.client.post(ORDER_URL, data=data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(SEAT_CONFLICTS.get(journey=journey.id), conflicts + 1)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(Task.objects.exists())
+
     def test_create_order_without_tickets(self):
         data = {"tickets": []}
 
         res = self.client.post(ORDER_URL, data=data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TokenAuthenticatedOrderApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_create_and_list_own_orders(self):
+        data = {
+            "tickets": [
+                {
+                    "cargo": 1,
+                    "seat": 2,
+                    "journey": sample_journey().id
+                }
+            ]
+        }
+        res = self.client.post(ORDER_URL, data=data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(
+            Order.objects.get(id=res.data["results"][0]["id"]).user,
+            self.user
+        )
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.models import Journey, Order, Ticket
+from station.pagination import EstimatedCountPaginator, approximate_count
+from station.tests.test_query_budgets import populate
+
+ORDER_URL = reverse("station:order-list")
+
+
+def analyze(*models):
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+
+class ApproximateCountTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        populate(30, self.user)
+        analyze(Journey, Ticket)
+        cache.clear()
+
+    def test_exact_below_threshold_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                approximate_count(Ticket.objects.all(), threshold=1000),
+                (60, False),
+            )
+
+    def test_table_estimate_above_threshold(self):
+        self.assertEqual(
+            approximate_count(Ticket.objects.all(), threshold=10), (60, True)
+        )
+
+    def test_filtered_estimate_from_explain(self):
+        tickets = Ticket.objects.filter(seat=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            count, is_estimate = approximate_count(tickets, threshold=5)
+
+        self.assertTrue(is_estimate)
+        self.assertGreaterEqual(count, 5)
+        self.assertIn("LIMIT 5", queries[0]["sql"])
+        self.assertTrue(queries[1]["sql"].startswith("EXPLAIN"))
+
+    def test_estimate_cached_per_query(self):
+        approximate_count(Ticket.objects.filter(seat=1), threshold=5)
+
+        with self.assertNumQueries(0):
+            count, is_estimate = approximate_count(
+                Ticket.objects.filter(seat=1), threshold=5
+            )
+        self.assertTrue(is_estimate)
+        with self.assertNumQueries(2):
+            approximate_count(Ticket.objects.filter(seat=2), threshold=5)
+
+    def test_exact_count_not_cached(self):
+        approximate_count(Ticket.objects.all(), threshold=1000)
+
+        with self.assertNumQueries(1):
+            approximate_count(Ticket.objects.all(), threshold=1000)
+
+    def test_empty_queryset(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                approximate_count(Ticket.objects.none()), (0, False)
+            )
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=10)
+    def test_pages_run_past_a_short_estimate(self):
+        paginator = EstimatedCountPaginator(
+            Journey.objects.order_by("id"), 10
+        )
+
+        with mock.patch(
+            "station.pagination.estimated_count", return_value=15
+        ):
+            self.assertEqual(paginator.count, 15)
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertEqual(len(paginator.page(3)), 10)
+        self.assertTrue(paginator.page(2).has_next())
+        self.assertFalse(paginator.page(4).has_next())
+
+
+class EstimatedCountPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        populate(30, self.user)
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_exact_count_flagged(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 30)
+        self.assertIs(res.data["count_is_estimate"], False)
+        self.assertEqual(
+            list(res.data),
+            ["count", "count_is_estimate", "next", "previous", "results"],
+        )
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=10)
+    def test_estimated_count_flagged(self):
+        analyze(Order)
+
+        res = self.client.get(ORDER_URL, {"page": 3})
+
+        self.assertIs(res.data["count_is_estimate"], True)
+        self.assertGreaterEqual(res.data["count"], 10)
+        self.assertEqual(len(res.data["results"]), 10)
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import APIClient
+
+from monitoring.budgets import registered_budgets, view_query_budget
+from station import occupancy, service_days
+from station.models import (
+    Crew,
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from user.serializers import TokenObtainPairSerializer
+
+DEPARTURE = datetime(2024, 5, 2, 13, 30, tzinfo=timezone.utc)
+# Endpoints whose queries cannot be counted per request
+UNBUDGETED = {
+    "station:api-root",
+    "station:journey-seats-stream",
+}
+
+
+def populate(rows, user, first=0):
+    """rows of every model, journeys with crews and sold tickets"""
+    numbers = range(first, first + rows)
+    train_types = TrainType.objects.bulk_create(
+        TrainType(name=f"type {number}") for number in numbers
+    )
+    trains = Train.objects.bulk_create(
+        Train(
+            name=f"train {number}",
+            cargo_num=2,
+            places_in_cargo=2,
+            train_type=train_type,
+        )
+        for number, train_type in enumerate(train_types)
+    )
+    stations = Station.objects.bulk_create(
+        Station(name=f"station {number}", latitude=50.0, longitude=30.0)
+        for number in (*numbers, f"{first} end")
+    )
+    routes = Route.objects.bulk_create(
+        Route(source=source, destination=destination, distance=100)
+        for source, destination in zip(stations, stations[1:])
+    )
+    crews = Crew.objects.bulk_create(
+        Crew(first_name="First", last_name=f"Last {number}")
+        for number in numbers
+    )
+    journeys = Journey.objects.bulk_create(
+        Journey(
+            route=route,
+            train=train,
+            departure_time=DEPARTURE,
+            arrival_time=DEPARTURE + timedelta(hours=2),
+        )
+        for route, train in zip(routes, trains)
+    )
+    Journey.crew.through.objects.bulk_create(
+        Journey.crew.through(journey=journey, crew=crew)
+        for journey, crew in zip(journeys, crews)
+    )
+    orders = Order.objects.bulk_create(Order(user=user) for _ in journeys)
+    Ticket.objects.bulk_create(
+        Ticket(journey=journey, order=order, cargo=1, seat=seat)
+        for journey, order in zip(journeys, orders)
+        for seat in (1, 2)
+    )
+    occupancy.rebuild()
+    service_days.rebuild()
+    return journeys[0]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every read endpoint stays within its declared query budget, and
+    issues as many queries for 100 rows as for one: a count that grows
+    with the rows is an N+1.
+    """
+
+    def setUp(self) -> None:
+        # Staff, to read the admin reports too
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", is_staff=True
+        )
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def endpoints(self, journey):
+        return [
+            reverse("station:crew-list"),
+            reverse("station:traintype-list"),
+            reverse("station:train-list"),
+            reverse("station:train-detail", args=[journey.train_id]),
+            reverse("station:station-list"),
+            reverse(
+                "station:station-detail",
+                args=[journey.route.source_id],
+            ),
+            reverse("station:route-list"),
+            reverse("station:route-detail", args=[journey.route_id]),
+            reverse("station:journey-list"),
+            reverse("station:journey-detail", args=[journey.id]),
+            reverse("station:journey-seats", args=[journey.id]),
+            reverse("station:journey-calendar")
+            + f"?from={journey.route.source_id}"
+            f"&to={journey.route.destination_id}&month=2024-05",
+            reverse("station:journey-search")
+            + f"?from={journey.route.source_id}"
+            f"&to={journey.route.destination_id}&date=2024-05-02",
+            reverse("station:journey-list-async"),
+            reverse("station:journey-detail-async", args=[journey.id]),
+            reverse("station:journey-seats-async", args=[journey.id]),
+            reverse("station:order-list"),
+            reverse("station:occupancy-list"),
+            reverse("station:occupancy-routes"),
+            reverse("station:occupancy-trains"),
+            reverse("station:sales-export"),
+            reverse("user:manage"),
+        ]
+
+    def count_queries(self, journey, rows):
+        """{view name: queries} of every endpoint, checked on the budgets"""
+        counts = {}
+        for path in self.endpoints(journey):
+            # The worst case: authentication state is not cached
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(path)
+                if res.streaming:
+                    b"".join(res.streaming_content)
+            self.assertEqual(res.status_code, 200, path)
+            match = resolve(urlsplit(path).path)
+            counts[match.view_name] = len(queries)
+            budget = view_query_budget(match.func, "GET")
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                f"{path} issued {len(queries)} queries over {rows} rows, "
+                f"its budget is {budget}:\n"
+                + "\n".join(query["sql"] for query in queries),
+            )
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        journey = populate(1, self.user)
+        one = self.count_queries(journey, 1)
+        populate(99, self.user, first=1)
+        hundred = self.count_queries(journey, 100)
+
+        for name, count in one.items():
+            with self.subTest(name):
+                self.assertEqual(hundred[name], count)
+
+    def test_every_read_endpoint_has_a_budget(self):
+        missing = [
+            name
+            for (name, _), budget in registered_budgets().items()
+            if budget is None
+            and name.split(":")[0] in ("station", "user")
+            and name not in UNBUDGETED
+        ]
+
+        self.assertEqual(missing, [])
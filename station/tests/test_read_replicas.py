@@ -0,0 +1,168 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app import replicas
+from app.replicas import ReplicaRouter, reads_from
+from app.replicas import read_database as replicas_read_database
+from station.models import Journey
+from station.tests.test_journey_api import sample_journey
+
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("station:order-list")
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router = ReplicaRouter()
+
+    def test_reads_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(Journey), "default")
+
+    def test_reads_routed_replica(self):
+        with reads_from("replica1"):
+            self.assertEqual(self.router.db_for_read(Journey), "replica1")
+            self.assertEqual(self.router.db_for_write(Journey), "default")
+
+        self.assertEqual(self.router.db_for_read(Journey), "default")
+
+    def test_transaction_reads_primary(self):
+        with reads_from("replica1"), mock.patch.object(
+            connections["default"], "in_atomic_block", True
+        ):
+            self.assertEqual(self.router.db_for_read(Journey), "default")
+
+    def test_migrates_primary_only(self):
+        self.assertTrue(self.router.allow_migrate("default", "station"))
+        self.assertFalse(self.router.allow_migrate("replica1", "station"))
+
+
+@override_settings(
+    REPLICA_DATABASES=["replica1", "replica2"],
+    REPLICA_MAX_LAG_SECONDS=5,
+    REPLICA_LAG_CHECK_SECONDS=2,
+)
+class HealthyReplicaTests(SimpleTestCase):
+    def setUp(self) -> None:
+        replicas._lag_checks.clear()
+        self.addCleanup(replicas._lag_checks.clear)
+
+    def lags(self, **lags):
+        return mock.patch(
+            "app.replicas.replica_lag", side_effect=lambda alias: lags[alias]
+        )
+
+    def test_rotates_replicas(self):
+        with self.lags(replica1=0.0, replica2=0.5):
+            chosen = {replicas.healthy_replica() for _ in range(4)}
+
+        self.assertEqual(chosen, {"replica1", "replica2"})
+
+    def test_skips_lagging_replica(self):
+        with self.lags(replica1=30.0, replica2=0.0):
+            chosen = {replicas.healthy_replica() for _ in range(4)}
+
+        self.assertEqual(chosen, {"replica2"})
+
+    def test_falls_back_to_primary(self):
+        def unreachable(alias):
+            raise OperationalError("connection refused")
+
+        with mock.patch("app.replicas.replica_lag", side_effect=unreachable):
+            self.assertIsNone(replicas.healthy_replica())
+
+        with self.lags(replica1=None, replica2=60.0):
+            replicas._lag_checks.clear()
+            self.assertIsNone(replicas.healthy_replica())
+
+    def test_lag_checked_once_per_interval(self):
+        with self.lags(replica1=0.0, replica2=0.0) as replica_lag, \
+                mock.patch("app.replicas.time.monotonic", return_value=100):
+            for _ in range(6):
+                replicas.healthy_replica()
+
+        self.assertEqual(replica_lag.call_count, 2)
+
+
+@override_settings(REPLICA_DATABASES=["default"])
+@mock.patch("app.replicas.healthy_replica", return_value="default")
+class ReadYourWritesTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def read_databases(self):
+        """Patch recording the database each routed request reads from"""
+        chosen = []
+
+        def read_database(*args):
+            chosen.append(replicas_read_database(*args))
+            return chosen[-1]
+
+        return mock.patch("app.replicas.read_database", read_database), chosen
+
+    def order(self):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"cargo": 1, "seat": 2, "journey": self.journey.id}]},
+            format="json",
+        )
+
+    def test_catalog_reads_replica(self, healthy_replica):
+        patch, chosen = self.read_databases()
+        with patch:
+            res = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(chosen, ["default"])
+        self.assertIsNone(replicas._read_database.get())
+
+    def test_writes_are_not_routed(self, healthy_replica):
+        patch, chosen = self.read_databases()
+        with patch:
+            self.order()
+
+        self.assertEqual(chosen, [])
+
+    def test_order_pins_user_to_primary(self, healthy_replica):
+        res = self.order()
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn("primary_reads", res.cookies)
+
+        patch, chosen = self.read_databases()
+        with patch:
+            self.client.get(JOURNEY_URL)
+
+        self.assertEqual(chosen, [None])
+        healthy_replica.assert_not_called()
+
+    def test_pin_is_bound_to_user(self, healthy_replica):
+        self.order()
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.force_authenticate(other)
+
+        patch, chosen = self.read_databases()
+        with patch:
+            self.client.get(JOURNEY_URL)
+
+        self.assertEqual(chosen, ["default"])
+
+    def test_pin_expires(self, healthy_replica):
+        self.order()
+
+        patch, chosen = self.read_databases()
+        with patch, override_settings(REPLICA_STICKY_SECONDS=-1):
+            self.client.get(JOURNEY_URL)
+
+        self.assertEqual(chosen, ["default"])
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station import exports
+from station.models import Journey, Order, Route, Station, Train, TrainType
+
+EXPORT_URL = reverse("station:sales-export")
+DEPARTURE = datetime(2024, 5, 2, 13, 30, tzinfo=timezone.utc)
+
+
+def read(res):
+    return gzip.decompress(b"".join(res.streaming_content)).decode()
+
+
+class SalesExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        kyiv, lviv = Station.objects.bulk_create(
+            [
+                Station(name="Kyiv", latitude=50.45, longitude=30.52),
+                Station(name="Lviv", latitude=49.84, longitude=24.03),
+            ]
+        )
+        journey = Journey.objects.create(
+            route=Route.objects.create(
+                source=kyiv, destination=lviv, distance=540
+            ),
+            train=Train.objects.create(
+                name="Express",
+                cargo_num=2,
+                places_in_cargo=10,
+                train_type=TrainType.objects.create(name="Intercity"),
+            ),
+            departure_time=DEPARTURE,
+            arrival_time=DEPARTURE + timedelta(hours=6),
+        )
+        self.orders = []
+        for day, seat in ((1, 1), (10, 2)):
+            order = Order.objects.create(user=self.user)
+            order.created_at = datetime(2024, 4, day, tzinfo=timezone.utc)
+            order.save()
+            order.tickets.create(journey=journey, cargo=1, seat=seat)
+            self.orders.append(order)
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/gzip")
+        self.assertIn("sales-start-now.csv.gz", res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(read(res))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(list(rows[0]), list(exports.SALES_COLUMNS))
+        self.assertEqual(rows[0]["email"], "admin@test.com")
+        self.assertEqual(rows[0]["source"], "Kyiv")
+        self.assertEqual(rows[0]["train_type"], "Intercity")
+        self.assertEqual(rows[0]["departure_time"], DEPARTURE.isoformat())
+
+    def test_ndjson_in_period(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"as": "ndjson", "date_from": "2024-04-05", "date_to": "2024-04-10"},
+        )
+
+        lines = read(res).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["order"], self.orders[1].id)
+        self.assertIn(
+            "sales-2024-04-05-2024-04-10.ndjson.gz",
+            res["Content-Disposition"],
+        )
+
+    def test_sync_worker_reported_alive_while_streaming(self):
+        with mock.patch.object(exports, "worker_heartbeat") as heartbeat:
+            res = self.client.get(EXPORT_URL)
+            read(res)
+
+        heartbeat.assert_called()
+
+    async def test_asgi_streamed_from_the_connection_thread(self):
+        res = await self.async_client.get(
+            EXPORT_URL,
+            {"as": "ndjson"},
+            headers={
+                "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        chunks = [chunk async for chunk in res.streaming_content]
+        lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)["order"] for line in lines],
+            [order.id for order in self.orders],
+        )
+
+    def test_bad_parameters_rejected(self):
+        res = self.client.get(EXPORT_URL, {"as": "xlsx", "date_to": "April"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {"as", "date_to"})
+
+    def test_compressed_a_block_at_a_time(self):
+        lines = (f"{number:08}\n" for number in range(100_000))
+
+        chunks = list(exports.gzipped(lines))
+
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(
+            gzip.decompress(b"".join(chunks)).decode().count("\n"), 100_000
+        )
@@ -0,0 +1,201 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from station.searches import cached_search
+from station.tests.test_occupancy import ORDER_URL, OccupancyTestCase, at
+from station.tests.test_service_days import SEARCH_URL
+
+
+class SearchCacheTests(OccupancyTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, route=None, date="2024-05-02"):
+        route = route or self.route
+        return self.client.get(
+            SEARCH_URL,
+            {
+                "from": route.source_id,
+                "to": route.destination_id,
+                "date": date,
+            },
+        )
+
+    def test_cached_per_normalized_params(self):
+        self.search()
+
+        # Only the throttle counter
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                SEARCH_URL,
+                {
+                    "date": "2024-05-02",
+                    "to": f"0{self.route.destination_id}",
+                    "from": self.route.source_id,
+                },
+            )
+        self.assertEqual(
+            [journey["id"] for journey in res.data], [self.journey.id]
+        )
+
+    def test_new_ticket_invalidates_its_route_and_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other_day = self.create_journey(at(3))
+        self.search()
+        self.search(date="2024-05-03")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sell(self.journey, 1)
+
+        self.assertEqual(self.search().data[0]["tickets_available"], 19)
+        with self.assertNumQueries(1):
+            res = self.search(date="2024-05-03")
+        self.assertEqual(res.data[0]["id"], other_day.id)
+
+    def test_journeys_forgotten_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_journey(at(3))
+
+        with mock.patch(
+            "station.signals.forget_departure"
+        ) as forget_departure, self.captureOnCommitCallbacks(execute=True):
+            self.sell(self.journey, 1, 2, 3)
+            self.sell(other, 1)
+            self.journey.save()
+
+        self.assertCountEqual(
+            [call.args[2] for call in forget_departure.call_args_list],
+            [self.journey.departure_time, other.departure_time],
+        )
+
+    def test_order_bumps_search_version_once_per_day(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            later = self.create_journey(at(2, 18))
+        tickets = [
+            {"journey": journey.id, "cargo": 1, "seat": seat}
+            for journey in (self.journey, later)
+            for seat in (1, 2, 3)
+        ]
+
+        with mock.patch(
+            "station.signals.forget_search"
+        ) as forget_search, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+        forget_search.assert_called_once()
+
+    def test_changes_after_rolled_back_savepoint_forgotten(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_journey(at(3))
+
+        with mock.patch(
+            "station.signals.forget_departure"
+        ) as forget_departure, self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                self.sell(self.journey, 1)
+                self.journey.tickets.bulk_create(
+                    self.journey.tickets.all()[:1]
+                )
+            self.sell(other, 1)
+
+        self.assertEqual(
+            [call.args[2] for call in forget_departure.call_args_list],
+            [other.departure_time],
+        )
+
+    def test_moved_journey_invalidates_both_entries(self):
+        self.search()
+        self.search(route=self.other_route)
+
+        self.journey.route = self.other_route
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.save()
+
+        self.assertEqual(self.search().data, [])
+        self.assertEqual(
+            self.search(route=self.other_route).data[0]["id"],
+            self.journey.id,
+        )
+
+    def test_deleted_journey_invalidates(self):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.delete()
+
+        self.assertEqual(self.search().data, [])
+
+
+@override_settings(JOURNEY_SEARCH_WAIT_SECONDS=5)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def concurrently(self, search, threads=8):
+        """Results of the same cached search from several threads"""
+        results = [None] * threads
+
+        def run(number):
+            try:
+                results[number] = cached_search(1, 2, "2024-05-02", search)
+            except Exception as error:
+                results[number] = error
+
+        workers = [
+            threading.Thread(target=run, args=[number])
+            for number in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results
+
+    def test_concurrent_misses_run_one_search(self):
+        calls = []
+
+        def search():
+            calls.append(1)
+            time.sleep(0.2)
+            return [{"id": 1}]
+
+        results = self.concurrently(search)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{"id": 1}]] * 8)
+
+    def test_failure_reaches_waiting_threads(self):
+        def search():
+            time.sleep(0.2)
+            raise ValueError("database gone")
+
+        results = self.concurrently(search, threads=3)
+
+        self.assertTrue(
+            all(isinstance(result, ValueError) for result in results)
+        )
+        self.assertEqual(cached_search(1, 2, "2024-05-02", list), [])
+
+    @override_settings(JOURNEY_SEARCH_WAIT_SECONDS=0.05)
+    def test_waiting_gives_up_after_a_while(self):
+        calls = []
+
+        def search():
+            calls.append(1)
+            call = len(calls)
+            time.sleep(0.3 if call == 1 else 0)
+            return [call]
+
+        results = self.concurrently(search, threads=2)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sorted(results), [[1], [2]])
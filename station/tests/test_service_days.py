@@ -0,0 +1,126 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station import service_days
+from station.models import ServiceDay
+from station.tests.test_occupancy import OccupancyTestCase, at
+
+SEARCH_URL = reverse("station:journey-search")
+
+
+def entries():
+    return sorted(
+        ServiceDay.objects.values_list(
+            "source_id", "destination_id", "day", "journey_ids"
+        )
+    )
+
+
+class ServiceDayTests(OccupancyTestCase):
+    def assertConsistent(self):
+        """The maintained entries equal the ones rebuilt from scratch"""
+        maintained = entries()
+        service_days.rebuild()
+        self.assertEqual(maintained, entries())
+
+    def entry(self, *journeys, route=None, day=date(2024, 5, 2)):
+        route = route or self.route
+        return (
+            route.source_id,
+            route.destination_id,
+            day,
+            [journey.id for journey in journeys],
+        )
+
+    def test_journeys_listed_by_departure(self):
+        evening = self.create_journey(at(2, 18))
+        morning = self.create_journey(at(2, 6), train=self.other_train)
+
+        self.assertEqual(
+            entries(), [self.entry(morning, self.journey, evening)]
+        )
+        self.assertConsistent()
+
+    def test_journey_moved_to_another_day_and_route(self):
+        self.journey.departure_time = at(3)
+        self.journey.route = self.other_route
+        self.journey.save()
+
+        moved = self.entry(
+            self.journey, route=self.other_route, day=date(2024, 5, 3)
+        )
+        self.assertEqual(entries(), [moved])
+        self.assertConsistent()
+
+    def test_journey_delete(self):
+        other = self.create_journey(at(2, 18))
+        self.journey.delete()
+        self.assertEqual(entries(), [self.entry(other)])
+
+        other.delete()
+        self.assertEqual(entries(), [])
+
+    def test_rebuild_command(self):
+        ServiceDay.objects.all().delete()
+
+        call_command("rebuild_service_days", stdout=StringIO())
+
+        self.assertEqual(entries(), [self.entry(self.journey)])
+
+
+class JourneySearchTests(OccupancyTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        return self.client.get(SEARCH_URL, params)
+
+    def test_journeys_of_the_day_by_departure(self):
+        evening = self.create_journey(at(2, 18))
+        morning = self.create_journey(at(2, 6))
+        self.create_journey(at(3))
+        self.create_journey(at(2), route=self.other_route)
+        self.sell(self.journey, 1, 2)
+
+        res = self.search(
+            **{
+                "from": self.route.source_id,
+                "to": self.route.destination_id,
+                "date": "2024-05-02",
+            }
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [journey["id"] for journey in res.data],
+            [morning.id, self.journey.id, evening.id],
+        )
+        self.assertEqual(res.data[1]["tickets_available"], 18)
+
+    def test_no_journeys(self):
+        # The throttle hit and the service day, no journey query
+        with self.assertNumQueries(2):
+            res = self.search(
+                **{
+                    "from": self.route.destination_id,
+                    "to": self.route.source_id,
+                    "date": "2024-05-02",
+                }
+            )
+
+        self.assertEqual(res.data, [])
+
+    def test_bad_params_rejected(self):
+        res = self.search(**{"from": "Kyiv", "date": "02.05.2024"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {"from", "to", "date"})
@@ -0,0 +1,130 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.models import ThrottleCounter
+from station.tasks import prune_throttle_counters
+from station.throttling import (
+    AnonSlidingWindowThrottle,
+    ScopedUserSlidingWindowThrottle,
+)
+
+STATION_URL = reverse("station:station-list")
+ORDER_URL = reverse("station:order-list")
+JOURNEY_URL = reverse("station:journey-list")
+ASYNC_JOURNEY_URL = reverse("station:journey-list-async")
+REGISTER_URL = reverse("user:create")
+
+RATES = {
+    "anon": "2/min",
+    "user": "2/min",
+    "browsing": "3/min",
+    "booking": "2/min",
+}
+
+
+@mock.patch.object(ScopedUserSlidingWindowThrottle, "THROTTLE_RATES", RATES)
+@mock.patch.object(AnonSlidingWindowThrottle, "THROTTLE_RATES", RATES)
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_at(self, url, timestamp):
+        with mock.patch(
+            "station.throttling.SlidingWindowRateThrottle.timer",
+            return_value=timestamp,
+        ):
+            return self.client.get(url)
+
+    def test_scope_budget_exhausted(self):
+        for _ in range(3):
+            res = self.get_at(STATION_URL, 600)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.get_at(STATION_URL, 600)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "60")
+
+    def test_booking_and_browsing_budgets_are_separate(self):
+        for _ in range(3):
+            self.get_at(STATION_URL, 600)
+
+        res = self.get_at(ORDER_URL, 600)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.get_at(STATION_URL, 600)
+
+        # A third into the next window, 2/3 of the 3 previous hits count.
+        res = self.get_at(STATION_URL, 680)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.get_at(STATION_URL, 680)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_rejected_requests_are_not_counted(self):
+        for _ in range(8):
+            self.get_at(STATION_URL, 600)
+
+        # Only the 3 allowed hits weigh on the next window
+        res = self.get_at(STATION_URL, 680)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_async_journeys_share_the_browsing_budget(self):
+        token = AccessToken.for_user(self.user)
+        for _ in range(3):
+            self.get_at(JOURNEY_URL, 600)
+
+        with mock.patch(
+            "station.throttling.SlidingWindowRateThrottle.timer",
+            return_value=600,
+        ):
+            res = Client().get(
+                ASYNC_JOURNEY_URL,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "60")
+
+    def test_one_counter_row_per_key(self):
+        for timestamp in (600, 660, 720, 780):
+            self.get_at(STATION_URL, timestamp)
+
+        counter = ThrottleCounter.objects.get()
+
+        self.assertEqual(counter.window_index, 13)
+        self.assertEqual((counter.previous, counter.current), (1, 1))
+
+    def test_anonymous_requests_limited_per_ip(self):
+        self.client.force_authenticate(None)
+
+        for _ in range(2):
+            self.get_at(REGISTER_URL, 600)
+        res = self.get_at(REGISTER_URL, 600)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_prune_expired_counters(self):
+        self.get_at(STATION_URL, 600)
+        self.client.force_authenticate(None)
+        self.get_at(REGISTER_URL, time.time())
+
+        prune_throttle_counters()
+
+        self.assertEqual(
+            ThrottleCounter.objects.get().key, "throttle_anon_127.0.0.1"
+        )
@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.images import process_train_image
+from station.models import Train, TrainType
+from taskqueue.models import Task
+
+TRAIN_URL = reverse("station:train-list")
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(train_id):
+    return reverse("station:train-upload-image", args=[train_id])
+
+
+def sample_train(**params):
+    defaults = {
+        "name": "sample_train",
+        "cargo_num": 10,
+        "places_in_cargo": 10,
+        "train_type": TrainType.objects.create(name="passenger"),
+    }
+    defaults.update(params)
+    return Train.objects.create(**defaults)
+
+
+def sample_jpeg(size=(2000, 1000)):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(
+        "train.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TrainImageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@admin.com", "testTest"
+            )
+        )
+        self.train = sample_train()
+
+    def test_upload_queues_processing(self):
+        res = self.client.post(
+            image_upload_url(self.train.id),
+            {"image": sample_jpeg()},
+            format="multipart",
+        )
+
+        task = Task.objects.get()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("image", res.data)
+        self.assertEqual(res.data["image_variants"], {})
+        self.assertEqual(task.name, "station.tasks.process_train_image")
+        self.assertEqual(task.payload["args"], [self.train.id])
+
+    def test_process_train_image_variants(self):
+        self.train.image = sample_jpeg()
+        self.train.save()
+
+        process_train_image(self.train.id)
+        self.train.refresh_from_db()
+
+        self.assertEqual(
+            set(self.train.image_variants), {"thumbnail", "medium"}
+        )
+        thumbnail_name = self.train.image_variants["thumbnail"].removeprefix(
+            "/media/"
+        )
+        with default_storage.open(thumbnail_name) as thumbnail_file:
+            thumbnail = Image.open(thumbnail_file)
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (320, 160))
+            self.assertEqual(len(thumbnail.getexif()), 0)
+
+    def test_list_references_thumbnail(self):
+        self.train.image = sample_jpeg()
+        self.train.save()
+        process_train_image(self.train.id)
+        self.train.refresh_from_db()
+
+        res = self.client.get(TRAIN_URL)
+
+        self.assertEqual(
+            res.data[0]["image_thumbnail"],
+            "http://testserver" + self.train.image_variants["thumbnail"],
+        )
+
+    def test_identical_uploads_share_a_file(self):
+        other_train = sample_train(name="other_train")
+
+        for train in (self.train, other_train):
+            self.client.post(
+                image_upload_url(train.id),
+                {"image": sample_jpeg()},
+                format="multipart",
+            )
+            train.refresh_from_db()
+
+        self.assertEqual(self.train.image.name, other_train.image.name)
+        self.assertRegex(
+            self.train.image.name, r"^uploads/train/\w\w/[0-9a-f]{64}\.jpg$"
+        )
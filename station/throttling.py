@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+
+from django.db import connection
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+)
+
+from station.models import ThrottleCounter
+
+# Counts of a counter row rolled over to the window of the request
+ROLLED_PREVIOUS = """
+    CASE
+        WHEN counter.window_index = excluded.window_index
+            THEN counter.previous
+        WHEN counter.window_index = excluded.window_index - 1
+            THEN counter.current
+        ELSE 0
+    END
+"""
+ROLLED_CURRENT = """
+    CASE
+        WHEN counter.window_index = excluded.window_index
+            THEN counter.current
+        ELSE 0
+    END
+"""
+
+# Count one hit and roll the window over in a single statement, so the
+# check is one round trip and atomic across all worker processes. Only
+# allowed hits are counted: the row is left alone, and nothing returned,
+# when the hit would take the weighted count over the limit.
+HIT_SQL = f"""
+    INSERT INTO {{table}} AS counter
+        (key, window_index, current, previous, expires_at)
+    VALUES (%s, %s, 1, 0, %s)
+    ON CONFLICT (key) DO UPDATE SET
+        previous = {ROLLED_PREVIOUS},
+        current = {ROLLED_CURRENT} + 1,
+        window_index = excluded.window_index,
+        expires_at = excluded.expires_at
+    WHERE {ROLLED_PREVIOUS} * %s::float8 + {ROLLED_CURRENT} + 1 <= %s
+    RETURNING previous, current
+"""
+
+COUNTS_SQL = """
+    SELECT window_index, previous, current FROM {table} WHERE key = %s
+"""
+
+
+def hit_counter(key, window_index, expires_at, weight, limit):
+    """
+    Count a request for key if the previous window count times weight
+    plus the current one stays within limit. Return the (previous,
+    current) window counts with it, or None for a rejected request.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            HIT_SQL.format(table=ThrottleCounter._meta.db_table),
+            [key, window_index, expires_at, weight, limit],
+        )
+        return cursor.fetchone()
+
+
+def window_counts(key, window_index):
+    """(previous, current) window counts of key, as of window_index"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            COUNTS_SQL.format(table=ThrottleCounter._meta.db_table), [key]
+        )
+        row = cursor.fetchone()
+
+    counted_index, previous, current = row or (window_index, 0, 0)
+    if counted_index == window_index:
+        return previous, current
+    if counted_index == window_index - 1:
+        return current, 0
+    return 0, 0
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding-window-counter throttle shared by all worker processes.
+    Like DRF's throttles it counts allowed requests only, so a client
+    retrying while throttled gets back under the limit.
+
+    Each key is one ThrottleCounter row with the counts of the current
+    and the previous fixed window. The previous count is weighted by how
+    much of that window still overlaps the sliding window, instead of
+    keeping a history of request timestamps.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window_index = int(self.now // self.duration)
+        elapsed = self.now - window_index * self.duration
+
+        expires_at = datetime.fromtimestamp(
+            (window_index + 2) * self.duration, tz=timezone.utc
+        )
+
+        weight = 1 - elapsed / self.duration
+        counted = hit_counter(
+            self.key, window_index, expires_at, weight, self.num_requests
+        )
+        if counted is None:
+            previous, current = window_counts(self.key, window_index)
+            # Wait until one more request fits
+            self.wait_seconds = self._wait(previous, current + 1, elapsed)
+            return False
+
+        return True
+
+    def _wait(self, previous, current, elapsed):
+        """Seconds until the weighted count drops below the limit"""
+        if current >= self.num_requests or not previous:
+            return self.duration - elapsed
+
+        needed_elapsed = self.duration * (
+            1 - (self.num_requests - current) / previous
+        )
+        return max(needed_elapsed - elapsed, 0)
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle, AnonRateThrottle):
+    """Limits anonymous requests per client IP ("anon" rate)"""
+
+
+class ScopedUserSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """
+    Limits authenticated users per endpoint scope, so that the budgets
+    of e.g. browsing and booking endpoints are counted separately.
+
+    Views choose the scope with a `throttle_scope` attribute; views
+    without one use the "user" rate.
+    """
+
+    default_scope = "user"
+
+    def __init__(self):
+        # The scope and rate depend on the view, see allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scope", self.default_scope)
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": request.user.pk,
+        }
@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from station import async_views
+
 from station.views import (
     CrewViewSet,
     TrainTypeViewSet,
@@ -9,6 +11,8 @@ from station.views import (
     RouteViewSet,
     JourneyViewSet,
     OrderViewSet,
+    OccupancyReportViewSet,
+    SalesExportView,
 )
 
 router = routers.DefaultRouter()
@@ -19,7 +23,37 @@ router.register("stations", StationViewSet)
 router.register("routes", RouteViewSet)
 router.register("journeys", JourneyViewSet)
 router.register("orders", OrderViewSet)
+router.register(
+    "reports/occupancy", OccupancyReportViewSet, basename="occupancy"
+)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "async/journeys/",
+        async_views.journey_list,
+        name="journey-list-async",
+    ),
+    path(
+        "async/journeys/<int:pk>/",
+        async_views.journey_detail,
+        name="journey-detail-async",
+    ),
+    path(
+        "async/journeys/<int:pk>/seats/",
+        async_views.journey_seats,
+        name="journey-seats-async",
+    ),
+    path(
+        "async/journeys/<int:pk>/seats/stream/",
+        async_views.journey_seats_stream,
+        name="journey-seats-stream",
+    ),
+    path(
+        "exports/sales/",
+        SalesExportView.as_view(),
+        name="sales-export",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "station"
@@ -1,15 +1,47 @@
-from datetime import datetime
+import re
+from datetime import date, datetime, time, timedelta
 
 from rest_framework import viewsets, mixins, status
 from rest_framework.viewsets import GenericViewSet
-from django.db.models import F, Count
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count, Prefetch, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.decorators import action
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from app.replicas import ReplicaReadsMixin, pin_to_primary
+from station import exports, service_days
+from station.searches import cached_search
+from station.availability import journey_calendar
+from station.exports import (
+    csv_lines,
+    gzipped,
+    iterate_in_thread,
+    ndjson_lines,
+    sales_rows,
+    with_heartbeat,
+)
+from station.metrics import (
+    ORDER_CREATE_DURATION,
+    SEAT_CONFLICTS,
+    TICKETS_SOLD,
+)
+from station.filters import (
+    DateFilter,
+    DayFilter,
+    IdListFilter,
+    IntegerFilter,
+    PrefixFilter,
+)
+from station.pagination import EstimatedCountPagination
 from station.permissions import IsAdminOrIfAuthenticatedReadOnly
+from station.tasks import process_train_image, send_order_confirmation
 
 from station.models import (
     Crew,
@@ -19,6 +51,8 @@ from station.models import (
     Route,
     Journey,
     Order,
+    Ticket,
+    OccupancyRollup,
 )
 
 from station.serializers import (
@@ -34,13 +68,19 @@ from station.serializers import (
     JourneySerializer,
     JourneyListSerializer,
     JourneyDetailSerializer,
+    JourneySeatsSerializer,
+    JourneyCalendarSerializer,
     OrderSerializer,
     OrderListSerializer,
     TrainImageSerializer,
+    OccupancyRollupSerializer,
+    RouteOccupancySerializer,
+    TrainOccupancySerializer,
 )
 
 
 class CrewViewSet(
+    ReplicaReadsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet
@@ -48,9 +88,12 @@ class CrewViewSet(
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "browsing"
+    query_budgets = {"list": 3}
 
 
 class TrainTypeViewSet(
+    ReplicaReadsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
@@ -58,9 +101,12 @@ class TrainTypeViewSet(
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "browsing"
+    query_budgets = {"list": 3}
 
 
 class TrainViewSet(
+    ReplicaReadsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -70,27 +116,24 @@ class TrainViewSet(
     queryset = Train.objects.select_related("train_type")
     serializer_class = TrainSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
-
-    @staticmethod
-    def _params_to_ints(qs):
-        """Converts a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in qs.split(",")]
-
-    def get_queryset(self):
-        """Retrieve the trains with filters"""
-        name = self.request.query_params.get("name")
-        train_type = self.request.query_params.get("trains")
-
-        queryset = self.queryset
-
-        if name:
-            queryset = queryset.filter(name__icontains=name)
-
-        if train_type:
-            train_type_ids = self._params_to_ints(train_type)
-            queryset = queryset.filter(genres__id__in=train_type_ids)
-
-        return queryset.distinct()
+    throttle_scope = "browsing"
+    query_budgets = {"list": 3, "retrieve": 3}
+    query_filters = {
+        "name": PrefixFilter(
+            "name",
+            index="station_train_name_upper_idx",
+            description="Train name starts with (ex. ?name=Freight)",
+        ),
+        "train_type": IdListFilter(
+            "train_type",
+            description="Train type ids (ex. ?train_type=1,2)",
+        ),
+        "trains": IdListFilter(
+            "train_type",
+            description="Deprecated alias of train_type",
+            deprecated=True,
+        ),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -116,30 +159,16 @@ class TrainViewSet(
         serializer = self.get_serializer(train, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                train = serializer.save(image_variants={})
+                process_train_image.enqueue(train.pk)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @extend_schema(
-        parameters=[
-            OpenApiParameter(
-                "name",
-                type=OpenApiTypes.STR,
-                description="Filter by train name (ex. ?name=Freight Express)",
-            ),
-            OpenApiParameter(
-                "train_type",
-                type=OpenApiTypes.STR,
-                description="Filter by train_type (ex. ?train_type=Local)",
-            ),
-        ]
-    )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
-
 
 class StationViewSet(
+    ReplicaReadsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -148,9 +177,12 @@ class StationViewSet(
     queryset = Station.objects.all()
     serializer_class = StationSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "browsing"
+    query_budgets = {"list": 3, "retrieve": 3}
 
 
 class RouteViewSet(
+    ReplicaReadsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -159,26 +191,17 @@ class RouteViewSet(
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
-
-    @staticmethod
-    def _params_to_ints(qs):
-        """Converts a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in qs.split(",")]
-
-    def get_queryset(self):
-        """Retrieve the trains with filters"""
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-
-        queryset = self.queryset
-
-        if source:
-            queryset = queryset.filter(source_id=source)
-
-        if destination:
-            queryset = queryset.filter(destination_id=destination)
-
-        return queryset.distinct()
+    throttle_scope = "browsing"
+    query_budgets = {"list": 3, "retrieve": 3}
+    query_filters = {
+        "source": IntegerFilter(
+            "source", description="Source station id (ex. ?source=1)"
+        ),
+        "destination": IntegerFilter(
+            "destination",
+            description="Destination station id (ex. ?destination=2)",
+        ),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -189,28 +212,13 @@ class RouteViewSet(
 
         return RouteSerializer
 
-    @extend_schema(
-        parameters=[
-            OpenApiParameter(
-                "source",
-                type=OpenApiTypes.STR,
-                description="Filter by source (ex. ?source=Kharkov Passenger)",
-            ),
-            OpenApiParameter(
-                "destination",
-                type=OpenApiTypes.STR,
-                description=(
-                    "Filter by destination "
-                    "(ex. ?destination=Lviv Railway Station)"
-                ),
-            ),
-        ]
-    )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+
+TAKEN_SEATS_PREFETCH = Prefetch(
+    "tickets", queryset=Ticket.objects.only("journey", "cargo", "seat")
+)
 
 
-class JourneyViewSet(viewsets.ModelViewSet):
+class JourneyViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = (
         Journey.objects.all()
         .select_related("route__source", "route__destination", "train")
@@ -220,97 +228,250 @@ class JourneyViewSet(viewsets.ModelViewSet):
                 - Count("tickets")
             )
         )
+        .order_by("train", "id")
     )
     serializer_class = JourneySerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "browsing"
+    query_budgets = {
+        "list": 3,
+        "retrieve": 4,
+        "seats": 4,
+        "calendar": 3,
+        "search": 4,
+    }
+    # Cached months and searches must not be refilled from a replica
+    # yet to replay the change that dropped them
+    primary_actions = ("calendar", "search")
+    query_filters = {
+        "from": PrefixFilter(
+            "route__source__name",
+            index="station_station_name_upper_idx",
+            description="Source station name starts with (ex. ?from=Kyiv)",
+        ),
+        "to": PrefixFilter(
+            "route__destination__name",
+            index="station_station_name_upper_idx",
+            description="Destination station name starts with (ex. ?to=Lviv)",
+        ),
+        "train_type": IdListFilter(
+            "train__train_type",
+            description="Train type ids (ex. ?train_type=1,2)",
+        ),
+        "departure_date": DayFilter(
+            "departure_time",
+            description="Departure day (ex. ?departure_date=2024-08-20)",
+        ),
+        "arrival_date": DayFilter(
+            "arrival_time",
+            description="Arrival day (ex. ?arrival_date=2024-08-21)",
+        ),
+        # The names of these filters before departure_date and co.
+        "trains": IdListFilter(
+            "train__train_type",
+            description="Deprecated alias of train_type",
+            deprecated=True,
+        ),
+        "departure_time": DayFilter(
+            "departure_time",
+            description="Deprecated alias of departure_date",
+            deprecated=True,
+        ),
+        "arrival_time": DayFilter(
+            "arrival_time",
+            description="Deprecated alias of arrival_date",
+            deprecated=True,
+        ),
+    }
 
-    def get_queryset(self):
-        queryset = self.queryset
-
-        train_type = self.request.query_params.get("trains")
-        from_station = self.request.query_params.get("from")
-        to_station = self.request.query_params.get("to")
-        departure = self.request.query_params.get("departure_time")
-        arrival = self.request.query_params.get("arrival_time")
-
-        if train_type:
-            queryset = queryset.filter(train__train_type__icontains=train_type)
-
-        if from_station:
-            queryset = queryset.filter(
-                route__source__name__icontains=from_station
-            )
-
-        if to_station:
-            queryset = queryset.filter(
-                route__destination__name__icontains=to_station
-            )
-
-        if departure:
-            departure_time = datetime.strptime(departure, "%Y-%m-%d")
-            queryset = queryset.filter(departure_time__date=departure_time)
+    @staticmethod
+    def load_related_for_action(queryset, action):
+        """Load what the action's serializer reads in the same queries"""
+        if action == "retrieve":
+            queryset = queryset.select_related(
+                "train__train_type"
+            ).prefetch_related("crew")
 
-        if arrival:
-            arrival_time = datetime.strptime(arrival, "%Y-%m-%d")
-            queryset = queryset.filter(arrival_time__date=arrival_time)
+        if action == "seats":
+            queryset = queryset.prefetch_related(TAKEN_SEATS_PREFETCH)
 
         return queryset
 
+    def get_queryset(self):
+        return self.load_related_for_action(
+            super().get_queryset(), self.action
+        )
+
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "search"):
             return JourneyListSerializer
 
         if self.action == "retrieve":
             return JourneyDetailSerializer
 
+        if self.action == "seats":
+            return JourneySeatsSerializer
+
+        if self.action == "calendar":
+            return JourneyCalendarSerializer
+
         return JourneySerializer
 
+    @action(methods=["GET"], detail=True, url_path="seats")
+    def seats(self, request, pk=None):
+        """Endpoint for the seat map of a specific journey"""
+        journey = self.get_object()
+        serializer = self.get_serializer(journey)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
-                "train_type",
-                type=OpenApiTypes.STR,
-                description="Filter by train (ex. ?train_type=Express)",
+                "from",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Source station id",
             ),
             OpenApiParameter(
-                "from_station",
-                type=OpenApiTypes.STR,
-                description=(
-                    "Filter by from "
-                    "(ex. ?from_station=Kyiv Train Station)"
-                ),
+                "to",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Destination station id",
             ),
             OpenApiParameter(
-                "to_station",
+                "month",
                 type=OpenApiTypes.STR,
-                description=(
-                    "Filter by to "
-                    "(ex. ?to_station=Kharkov Passenger)"
-                ),
+                required=True,
+                description="Month (ex. ?month=2024-08)",
             ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="calendar")
+    def calendar(self, request):
+        """Journeys and free seats per day of a month for a station pair"""
+        params = request.query_params
+        errors = {}
+        try:
+            source_id = int(params.get("from", ""))
+        except ValueError:
+            errors["from"] = "A source station id is required."
+        try:
+            destination_id = int(params.get("to", ""))
+        except ValueError:
+            errors["to"] = "A destination station id is required."
+        try:
+            month = datetime.strptime(params.get("month", ""), "%Y-%m")
+        except ValueError:
+            errors["month"] = "A month formatted YYYY-MM is required."
+        if errors:
+            raise ValidationError(errors)
+
+        days = journey_calendar(
+            source_id, destination_id, month.strftime("%Y-%m")
+        )
+        serializer = self.get_serializer(days, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
             OpenApiParameter(
-                "departure",
-                type=OpenApiTypes.DATE,
-                description=(
-                    "Filter by datetime of departure"
-                    "(ex. ?date=2024-08-20)"
-                ),
+                "from",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Source station id",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Destination station id",
             ),
             OpenApiParameter(
-                "arrival",
+                "date",
                 type=OpenApiTypes.DATE,
-                description=(
-                    "Filter by datetime of arrival"
-                    "ex. ?date=2024-08-21)"
-                ),
+                required=True,
+                description="Departure day (ex. ?date=2024-08-20)",
             ),
-        ]
+        ],
+        responses=JourneyListSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search",
+        filter_backends=(),
     )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+    def search(self, request):
+        """
+        Journeys between two stations on a day, by departure time: their
+        ids from the service day, then the journeys by primary key.
+        Cached until one of them or their tickets changes.
+        """
+        params = request.query_params
+        errors = {}
+        try:
+            source_id = int(params.get("from", ""))
+        except ValueError:
+            errors["from"] = "A source station id is required."
+        try:
+            destination_id = int(params.get("to", ""))
+        except ValueError:
+            errors["to"] = "A destination station id is required."
+        try:
+            day = date.fromisoformat(params.get("date", ""))
+        except ValueError:
+            errors["date"] = "A date formatted YYYY-MM-DD is required."
+        if errors:
+            raise ValidationError(errors)
+
+        return Response(
+            self.search_results(source_id, destination_id, day),
+            status=status.HTTP_200_OK,
+        )
 
+    def search_results(self, source_id, destination_id, day):
+        """Serialized journeys of a search, cached (station.searches)"""
 
-class OrderPagination(PageNumberPagination):
+        def search():
+            journeys = []
+            if ids := service_days.journey_ids(
+                source_id, destination_id, day
+            ):
+                journeys = (
+                    self.get_queryset()
+                    .filter(pk__in=ids)
+                    .order_by("departure_time", "id")
+                )
+            return self.get_serializer(journeys, many=True).data
+
+        return cached_search(source_id, destination_id, day, search)
+
+
+SEAT_CONFLICT_DETAIL = re.compile(r"\(journey_id, cargo, seat\)=\((\d+),")
+
+
+class SeatTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A seat was taken by another order meanwhile."
+    default_code = "seat_taken"
+
+
+def seat_conflict_journey(error):
+    """
+    Journey id of a unique_journey_cargo_seat violation ("unknown" when
+    the detail is missing), None for any other integrity error
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is None or diag.constraint_name != "unique_journey_cargo_seat":
+        return None
+
+    match = SEAT_CONFLICT_DETAIL.search(diag.message_detail or "")
+    return match[1] if match else "unknown"
+
+
+class OrderPagination(EstimatedCountPagination):
     page_size = 10
     max_page_size = 100
 
@@ -321,16 +482,23 @@ class OrderViewSet(
     GenericViewSet
 ):
     queryset = Order.objects.prefetch_related(
-        "tickets__journey__route__source",
-        "tickets__journey__route__destination",
-        "tickets__journey__train"
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "journey__route__source",
+                "journey__route__destination",
+                "journey__train",
+            ),
+        )
     )
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "booking"
+    query_budgets = {"list": 5}
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user_id=self.request.user.pk)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -338,5 +506,191 @@ class OrderViewSet(
 
         return OrderSerializer
 
+    def create(self, request, *args, **kwargs):
+        with ORDER_CREATE_DURATION.time():
+            response = super().create(request, *args, **kwargs)
+        # The user must find their order and taken seats on the next reads
+        pin_to_primary(response, request.user.pk)
+        return response
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # Validation checks the seats are free, a concurrent order can
+        # still take one before the insert
+        try:
+            with transaction.atomic():
+                order = serializer.save(user_id=self.request.user.pk)
+                send_order_confirmation.enqueue(order.pk)
+        except IntegrityError as error:
+            journey = seat_conflict_journey(error)
+            if journey is None:
+                raise
+            SEAT_CONFLICTS.inc(journey=journey)
+            raise SeatTaken
+
+        TICKETS_SOLD.inc(len(serializer.validated_data["tickets"]))
+
+
+def date_param(query_params, name, errors):
+    """The YYYY-MM-DD date of a query parameter, None when missing"""
+    if not query_params.get(name):
+        return None
+    try:
+        return date.fromisoformat(query_params[name])
+    except ValueError:
+        errors[name] = "A date formatted YYYY-MM-DD is expected."
+
+
+class OccupancyPagination(EstimatedCountPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class OccupancyReportViewSet(mixins.ListModelMixin, GenericViewSet):
+    """
+    Load factors read from the occupancy rollups (station.occupancy):
+    per route, train and day, or totalled per route or per train
+    """
+
+    queryset = OccupancyRollup.objects.filter(journeys__gt=0).select_related(
+        "route__source", "route__destination", "train"
+    )
+    serializer_class = OccupancyRollupSerializer
+    pagination_class = OccupancyPagination
+    permission_classes = (IsAdminUser,)
+    throttle_scope = "browsing"
+    query_budgets = {"list": 4, "routes": 4, "trains": 4}
+    query_filters = {
+        "route": IntegerFilter("route", description="Route id"),
+        "train": IntegerFilter("train", description="Train id"),
+        "date_from": DateFilter(
+            "day",
+            "gte",
+            description="First departure day (ex. ?date_from=2024-08-01)",
+        ),
+        "date_to": DateFilter(
+            "day",
+            "lte",
+            description="Last departure day (ex. ?date_to=2024-08-31)",
+        ),
+    }
+
+    def get_serializer_class(self):
+        if self.action == "routes":
+            return RouteOccupancySerializer
+
+        if self.action == "trains":
+            return TrainOccupancySerializer
+
+        return OccupancyRollupSerializer
+
+    def _totals(self, *group_by):
+        """Rollup rows summed per group, one page of them"""
+        totals = (
+            self.filter_queryset(self.get_queryset())
+            .order_by(group_by[0])
+            .values(*group_by)
+            .annotate(
+                # Before the journeys sum, which shadows the column
+                capacity=Sum(
+                    F("journeys")
+                    * F("train__cargo_num")
+                    * F("train__places_in_cargo")
+                ),
+                journeys=Sum("journeys"),
+                tickets_sold=Sum("tickets_sold"),
+            )
+        )
+        page = self.paginate_queryset(totals)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(responses=RouteOccupancySerializer(many=True))
+    @action(methods=["GET"], detail=False, url_path="routes")
+    def routes(self, request):
+        """Load factor per route over the filtered days"""
+        return self._totals(
+            "route", "route__source__name", "route__destination__name"
+        )
+
+    @extend_schema(responses=TrainOccupancySerializer(many=True))
+    @action(methods=["GET"], detail=False, url_path="trains")
+    def trains(self, request):
+        """Load factor per train over the filtered days"""
+        return self._totals("train", "train__name")
+
+
+SALES_FORMATS = {"csv": csv_lines, "ndjson": ndjson_lines}
+
+
+class SalesExportView(APIView):
+    """
+    Every ticket ordered in a period with its order, user, journey,
+    route and train, as a gzipped CSV or NDJSON download streamed from
+    a server-side cursor: memory stays constant however many rows.
+    """
+
+    permission_classes = (IsAdminUser,)
+    throttle_scope = "export"
+    query_budgets = {"get": 3}
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="First order day (ex. ?date_from=2024-01-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Last order day (ex. ?date_to=2024-12-31)",
+            ),
+            OpenApiParameter(
+                "as",
+                type=OpenApiTypes.STR,
+                enum=list(SALES_FORMATS),
+                description="File format, csv by default",
+            ),
+        ],
+        responses={(200, "application/gzip"): OpenApiTypes.BINARY},
+    )
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+        date_from = date_param(params, "date_from", errors)
+        date_to = date_param(params, "date_to", errors)
+        file_format = params.get("as", "csv")
+        if file_format not in SALES_FORMATS:
+            errors["as"] = f"One of {', '.join(SALES_FORMATS)} is expected."
+        if errors:
+            raise ValidationError(errors)
+
+        ordered_from = ordered_to = None
+        if date_from is not None:
+            ordered_from = timezone.make_aware(
+                datetime.combine(date_from, time.min)
+            )
+        if date_to is not None:
+            ordered_to = timezone.make_aware(
+                datetime.combine(date_to + timedelta(days=1), time.min)
+            )
+
+        encode = SALES_FORMATS[file_format]
+        chunks = gzipped(encode(sales_rows(ordered_from, ordered_to)))
+        if isinstance(request._request, ASGIRequest):
+            chunks = iterate_in_thread(chunks)
+        elif exports.worker_heartbeat is not None:
+            # Streams for longer than the worker timeout
+            chunks = with_heartbeat(chunks)
+
+        response = StreamingHttpResponse(
+            chunks, content_type="application/gzip"
+        )
+        period = f"{date_from or 'start'}-{date_to or 'now'}"
+        response["Content-Disposition"] = (
+            f'attachment; filename="sales-{period}.{file_format}.gz"'
+        )
+        response["X-Accel-Buffering"] = "no"
+        return response
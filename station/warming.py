@@ -0,0 +1,110 @@
+"""
+Warm-up of the journey caches, so that the first minutes after a deploy
+don't send every search and calendar of the busy routes to the database
+at once.
+
+The hot station pairs are listed in WARM_SEARCHES_FILE, a JSON list of
+{"from": <station id>, "to": <station id>} most searched first, or else
+are the pairs with the most departures in the next 24 hours. Their
+searches for the days of the next 24 hours, and the calendar months of
+those days, are filled by a bounded pool of threads.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+
+from station.availability import journey_calendar
+from station.models import Journey
+from station.occupancy import departure_day
+from station.views import JourneyViewSet
+
+WINDOW = timedelta(hours=24)
+
+
+def listed_pairs(path):
+    """(source id, destination id) of the searches listed in a file"""
+    with open(path) as file:
+        return [
+            (int(search["from"]), int(search["to"]))
+            for search in json.load(file)
+        ]
+
+
+def busiest_pairs(start, end, limit):
+    """(source id, destination id) with the most departures in a period"""
+    return list(
+        Journey.objects.filter(
+            departure_time__gte=start, departure_time__lt=end
+        )
+        .values("route__source_id", "route__destination_id")
+        .annotate(departures=Count("id"))
+        .order_by(
+            "-departures", "route__source_id", "route__destination_id"
+        )
+        .values_list("route__source_id", "route__destination_id")[:limit]
+    )
+
+
+def hot_searches(limit):
+    """
+    (source id, destination id, day) of the searches of the `limit`
+    hottest station pairs for the next 24 hours, hottest first
+    """
+    now = timezone.now()
+    if settings.WARM_SEARCHES_FILE:
+        pairs = listed_pairs(settings.WARM_SEARCHES_FILE)[:limit]
+    else:
+        pairs = busiest_pairs(now, now + WINDOW, limit)
+
+    days = sorted({departure_day(now), departure_day(now + WINDOW)})
+    return [
+        (source_id, destination_id, day)
+        for source_id, destination_id in pairs
+        for day in days
+    ]
+
+
+def warm_search(source_id, destination_id, day):
+    view = JourneyViewSet(action="search", request=None, format_kwarg=None)
+    view.search_results(source_id, destination_id, day)
+
+
+def _in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        # The thread's own connections must not outlive it
+        connections.close_all()
+
+
+def warm_caches(limit, workers):
+    """
+    Fill the searches of the hot station pairs and their calendar months,
+    `workers` at a time. Returns the number of searches and months.
+    """
+    searches = hot_searches(limit)
+    months = sorted(
+        {
+            (source_id, destination_id, day.strftime("%Y-%m"))
+            for source_id, destination_id, day in searches
+        }
+    )
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="warm-caches"
+    ) as executor:
+        tasks = [
+            executor.submit(_in_thread, warm_search, *search)
+            for search in searches
+        ] + [
+            executor.submit(_in_thread, journey_calendar, *month)
+            for month in months
+        ]
+        for task in tasks:
+            task.result()
+
+    return len(searches), len(months)
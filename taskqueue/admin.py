@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from taskqueue.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_after",
+        "created_at",
+    )
+    list_filter = ("status", "name")
+    readonly_fields = ("last_error", "locked_until", "created_at")
+    actions = ("requeue",)
+
+    @admin.action(description="Requeue selected tasks")
+    def requeue(self, request, queryset):
+        queryset.filter(status=Task.Status.FAILED).update(
+            status=Task.Status.QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+            last_error="",
+        )
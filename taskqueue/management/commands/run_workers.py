@@ -0,0 +1,82 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from taskqueue.worker import Worker, schedule_periodic_tasks
+
+SCHEDULE_CHECK_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = "Run task queue workers until SIGTERM/SIGINT"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.TASK_QUEUE_WORKERS,
+            help="Worker threads, each with its own database connection",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASK_QUEUE_BATCH_SIZE,
+            help="Tasks claimed per query",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.TASK_QUEUE_POLL_SECONDS,
+            help="Seconds an idle worker waits before polling again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no task is due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        previous_handlers = {
+            signum: signal.signal(signum, lambda *_: stop.set())
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        threads = [
+            threading.Thread(
+                target=Worker(batch_size=options["batch_size"]).run,
+                args=(stop, options["poll_interval"], options["burst"]),
+                name=f"task-worker-{number}",
+            )
+            for number in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Started {len(threads)} task workers")
+
+        try:
+            if options["burst"]:
+                for thread in threads:
+                    thread.join()
+            else:
+                self.schedule_until_stopped(stop)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS("Task workers stopped"))
+
+    def schedule_until_stopped(self, stop):
+        while not stop.is_set():
+            try:
+                schedule_periodic_tasks()
+            except DatabaseError as error:
+                self.stderr.write(f"Periodic scheduling failed: {error}")
+            stop.wait(SCHEDULE_CHECK_SECONDS)
@@ -0,0 +1,56 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A deferred call of a registered task function.
+
+    Rows are deleted once the task succeeds; tasks that ran out of
+    attempts are kept as FAILED for inspection and requeueing.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    # Enqueueing a key that is already queued or running is a no-op
+    key = models.CharField(max_length=255, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(
+                fields=["run_after", "id"],
+                condition=Q(status="queued"),
+                name="task_queued_idx",
+            ),
+            models.Index(
+                fields=["locked_until"],
+                condition=Q(status="running"),
+                name="task_running_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=Q(status__in=["queued", "running"]),
+                name="unique_pending_task_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+
+_registry = {}
+
+
+class TaskFunction:
+    """A function that can be called directly or enqueued for a worker"""
+
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<task {self.name}>"
+
+    def enqueue(self, *args, delay=0, run_after=None, key=None, **kwargs):
+        """
+        Queue a call in the current transaction, so it is only picked up
+        if the surrounding work commits. Arguments must be JSON-encodable.
+        """
+        if run_after is None:
+            run_after = timezone.now() + timedelta(seconds=delay)
+        task = Task(
+            name=self.name,
+            payload={"args": list(args), "kwargs": kwargs},
+            key=key,
+            max_attempts=self.max_attempts,
+            run_after=run_after,
+        )
+        if key is None:
+            task.save()
+        else:
+            Task.objects.bulk_create([task], ignore_conflicts=True)
+        return task
+
+
+def task(name=None, max_attempts=None):
+    """Register a function as a task, named after its dotted path"""
+
+    def decorator(func):
+        task_function = TaskFunction(
+            func,
+            name or f"{func.__module__}.{func.__name__}",
+            max_attempts or settings.TASK_QUEUE_MAX_ATTEMPTS,
+        )
+        _registry[task_function.name] = task_function
+        return task_function
+
+    return decorator
+
+
+def get_task(name):
+    return _registry.get(name)
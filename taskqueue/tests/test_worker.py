@@ -0,0 +1,149 @@
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import task
+from taskqueue.worker import Worker, schedule_periodic_tasks
+
+calls = []
+
+
+@task(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.explode", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class WorkerTests(TestCase):
+    def setUp(self) -> None:
+        calls.clear()
+        self.worker = Worker(batch_size=2, retry_delay=10)
+
+    def test_task_can_still_be_called_directly(self):
+        record("direct")
+
+        self.assertEqual(calls, ["direct"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_run_batch_executes_and_deletes(self):
+        record.enqueue("a")
+        record.enqueue(value="b")
+
+        self.assertEqual(self.worker.run_batch(), 2)
+        self.assertEqual(calls, ["a", "b"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_batch_size_limits_claim(self):
+        for value in range(3):
+            record.enqueue(value)
+
+        self.assertEqual(self.worker.run_batch(), 2)
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_delayed_task_waits(self):
+        record.enqueue("later", delay=60)
+
+        self.assertEqual(self.worker.run_batch(), 0)
+
+    def test_failure_is_retried_with_backoff(self):
+        explode.enqueue()
+
+        with self.assertLogs("taskqueue.worker", logging.ERROR):
+            self.worker.run_batch()
+
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.Status.QUEUED)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("RuntimeError: boom", failed.last_error)
+        self.assertGreater(
+            failed.run_after, timezone.now() + timedelta(seconds=5)
+        )
+
+    def test_failure_after_last_attempt(self):
+        explode.enqueue()
+        Task.objects.update(attempts=1)
+
+        with self.assertLogs("taskqueue.worker", logging.ERROR):
+            self.worker.run_batch()
+
+        self.assertEqual(Task.objects.get().status, Task.Status.FAILED)
+
+    def test_unknown_task_fails(self):
+        Task.objects.create(name="tests.missing")
+
+        self.worker.run_batch()
+
+        self.assertEqual(Task.objects.get().status, Task.Status.FAILED)
+
+    def test_expired_lease_is_requeued(self):
+        record.enqueue("lost")
+        Task.objects.update(
+            status=Task.Status.RUNNING,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertEqual(self.worker.release_expired(), 1)
+        self.worker.run_batch()
+
+        self.assertEqual(calls, ["lost"])
+
+    def test_expired_lease_on_last_attempt_fails(self):
+        explode.enqueue()
+        Task.objects.update(
+            status=Task.Status.RUNNING,
+            attempts=2,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        with self.assertLogs("taskqueue.worker", logging.ERROR):
+            self.assertEqual(self.worker.release_expired(), 0)
+
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.Status.FAILED)
+        self.assertIsNone(failed.locked_until)
+        self.assertIn("lease expired", failed.last_error)
+        self.assertEqual(self.worker.run_batch(), 0)
+
+    def test_pending_key_enqueued_once(self):
+        record.enqueue("once", key="record")
+        record.enqueue("twice", key="record")
+
+        self.assertEqual(Task.objects.count(), 1)
+
+    @override_settings(TASK_QUEUE_PERIODIC={"tests.record": 3600})
+    def test_periodic_task_scheduled_at_next_interval(self):
+        now = datetime(2024, 5, 2, 13, 20, tzinfo=dt_timezone.utc)
+
+        schedule_periodic_tasks(now)
+        schedule_periodic_tasks(now)
+
+        periodic = Task.objects.get()
+        self.assertEqual(
+            periodic.run_after,
+            datetime(2024, 5, 2, 14, tzinfo=dt_timezone.utc),
+        )
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    def setUp(self) -> None:
+        calls.clear()
+
+    def test_burst_drains_queue(self):
+        for value in range(5):
+            record.enqueue(value)
+
+        out = StringIO()
+        call_command("run_workers", "--burst", "--workers", "2", stdout=out)
+
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertIn("Task workers stopped", out.getvalue())
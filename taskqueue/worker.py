@@ -0,0 +1,165 @@
+import logging
+import traceback
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+# Claim a batch in one statement. SKIP LOCKED lets concurrent workers
+# take disjoint batches instead of queueing up behind each other's locks.
+CLAIM_SQL = """
+    UPDATE {table}
+    SET status = 'running', attempts = attempts + 1, locked_until = %s
+    WHERE id IN (
+        SELECT id FROM {table}
+        WHERE status = 'queued' AND run_after <= %s
+        ORDER BY run_after, id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *
+"""
+
+
+class Worker:
+    """
+    Runs queued tasks in batches. Delivery is at least once: a task whose
+    worker died is requeued when its lease expires, unless that was its
+    last attempt, so tasks should be safe to run twice.
+    """
+
+    def __init__(self, batch_size=None, lease=None, retry_delay=None):
+        self.batch_size = batch_size or settings.TASK_QUEUE_BATCH_SIZE
+        self.lease = timedelta(
+            seconds=lease or settings.TASK_QUEUE_LEASE_SECONDS
+        )
+        self.retry_delay = (
+            retry_delay or settings.TASK_QUEUE_RETRY_DELAY_SECONDS
+        )
+
+    def claim(self):
+        now = timezone.now()
+        tasks = Task.objects.raw(
+            CLAIM_SQL.format(table=Task._meta.db_table),
+            [now + self.lease, now, self.batch_size],
+        )
+        # RETURNING does not keep the order of the subquery
+        return sorted(tasks, key=lambda task: (task.run_after, task.pk))
+
+    def run_batch(self):
+        """Run one claimed batch; return the number of tasks claimed"""
+        tasks = self.claim()
+        done = [task.pk for task in tasks if self.execute(task)]
+        if done:
+            Task.objects.filter(pk__in=done).delete()
+        return len(tasks)
+
+    def execute(self, task):
+        task_function = get_task(task.name)
+        if task_function is None:
+            self.fail(task, f"Unknown task {task.name!r}", retry=False)
+            return False
+
+        try:
+            with transaction.atomic():
+                task_function(
+                    *task.payload.get("args", ()),
+                    **task.payload.get("kwargs", {}),
+                )
+        except Exception:
+            logger.exception("Task %s failed", task)
+            self.fail(task, traceback.format_exc())
+            return False
+
+        return True
+
+    def fail(self, task, error, retry=True):
+        if retry and task.attempts < task.max_attempts:
+            delay = self.retry_delay * 2 ** (task.attempts - 1)
+            changes = {
+                "status": Task.Status.QUEUED,
+                "run_after": timezone.now() + timedelta(seconds=delay),
+            }
+        else:
+            changes = {"status": Task.Status.FAILED}
+
+        Task.objects.filter(pk=task.pk).update(
+            locked_until=None, last_error=error, **changes
+        )
+
+    def release_expired(self):
+        """
+        Requeue tasks whose worker stopped before finishing them, and fail
+        those that were on their last attempt: a task that crashes its
+        worker would run forever. Returns the number requeued.
+        """
+        expired = Task.objects.filter(
+            status=Task.Status.RUNNING, locked_until__lt=timezone.now()
+        )
+        with transaction.atomic():
+            failed = expired.filter(attempts__gte=F("max_attempts")).update(
+                status=Task.Status.FAILED,
+                locked_until=None,
+                last_error=(
+                    "The worker stopped during the last attempt, its "
+                    "lease expired"
+                ),
+            )
+            requeued = expired.update(
+                status=Task.Status.QUEUED, locked_until=None
+            )
+        if failed:
+            logger.error("%s tasks failed with their worker", failed)
+        return requeued
+
+    def run(self, stop, poll_interval=None, burst=False):
+        """Work until `stop` is set, or until the queue is empty in burst"""
+        poll_interval = poll_interval or settings.TASK_QUEUE_POLL_SECONDS
+        try:
+            while not stop.is_set():
+                try:
+                    claimed = self.run_batch()
+                    if not claimed:
+                        self.release_expired()
+                except DatabaseError:
+                    logger.exception("Task queue unavailable")
+                    claimed = 0
+
+                if not claimed:
+                    if burst:
+                        break
+                    stop.wait(poll_interval)
+                close_old_connections()
+        finally:
+            connection.close()
+
+
+def schedule_periodic_tasks(now=None):
+    """
+    Queue the next run of every TASK_QUEUE_PERIODIC task at the start of
+    its next interval. A task already pending is left alone, so every
+    worker process may call this.
+    """
+    now = now or timezone.now()
+    for name, interval in settings.TASK_QUEUE_PERIODIC.items():
+        task_function = get_task(name)
+        if task_function is None:
+            logger.error("Unknown periodic task %r", name)
+            continue
+
+        next_run = datetime.fromtimestamp(
+            (now.timestamp() // interval + 1) * interval, tz=dt_timezone.utc
+        )
+        task_function.enqueue(key=f"periodic:{name}", run_after=next_run)
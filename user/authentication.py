@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from monitoring.metrics import record_cache_lookup
+
+
+def _state_cache_key(user_id):
+    return f"user:auth-state:{user_id}"
+
+
+def get_user_state(user_id):
+    """
+    (is_active, is_staff) of a user, or None if it does not exist.
+
+    Cached for AUTH_USER_STATE_TTL seconds. Saving or deleting the user
+    drops the entry (user.signals) from the cache every process shares
+    (CACHE_REDIS_URL), so the change applies to the next request. With
+    the per-process memory cache, the other processes keep the old state
+    until the TTL expires.
+    """
+    key = _state_cache_key(user_id)
+    state = cache.get(key)
+    record_cache_lookup("auth_state", state is not None)
+    if state is None:
+        state = tuple(
+            get_user_model()
+            .objects.filter(pk=user_id)
+            .values_list("is_active", "is_staff")
+            .first()
+            or ()
+        )
+        cache.set(key, state, settings.AUTH_USER_STATE_TTL)
+
+    return state or None
+
+
+def forget_user_state(user_id):
+    cache.delete(_state_cache_key(user_id))
+
+
+class TokenClaimsUser(TokenUser):
+    """
+    request.user built from the access token claims (id, email,
+    is_staff), without loading the User row.
+    """
+
+    def __init__(self, token, is_staff):
+        super().__init__(token)
+        self._is_staff = is_staff
+
+    @cached_property
+    def is_staff(self):
+        return self._is_staff
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def instance(self):
+        """The full User model, loaded on first access"""
+        try:
+            return get_user_model().objects.get(pk=self.pk)
+        except ObjectDoesNotExist:
+            # Deleted since its state was cached
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+
+
+def get_user_instance(user):
+    """The User model behind request.user, loading it only if needed"""
+    return getattr(user, "instance", user)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed claims instead of loading
+    the user on every request. Only the cached account state is checked.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        state = get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+
+        is_active, is_staff = state
+        if not is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        return TokenClaimsUser(validated_token, is_staff=is_staff)
+
+
+def jwt_staff_user(request):
+    """The staff user of a JWT authenticated plain Django request, or None"""
+    try:
+        result = StatelessJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+
+    user = result[0] if result else None
+    return user if user is not None and user.is_staff else None
@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    """The JWT bearer scheme (jwtAuth) of the stateless authentication"""
+
+    target_class = "user.authentication.StatelessJWTAuthentication"
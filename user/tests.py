@@ -1,3 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from user.authentication import (
+    StatelessJWTAuthentication,
+    TokenClaimsUser,
+)
+from user.serializers import TokenObtainPairSerializer
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+ME_URL = reverse("user:manage")
+
+
+def sample_user(**params):
+    defaults = {
+        "email": "user@user.com",
+        "password": "test1234",
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(**defaults)
+
+
+class TokenClaimsTests(TestCase):
+    def test_token_contains_user_claims(self):
+        sample_user(is_staff=True)
+
+        res = APIClient().post(
+            TOKEN_URL, {"email": "user@user.com", "password": "test1234"}
+        )
+        token = AccessToken(res.data["access"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(token["email"], "user@user.com")
+        self.assertTrue(token["is_staff"])
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = sample_user()
+        self.token = AccessToken(
+            str(TokenObtainPairSerializer.get_token(self.user).access_token)
+        )
+        self.authentication = StatelessJWTAuthentication()
+
+    def test_user_built_from_claims(self):
+        user = self.authentication.get_user(self.token)
+
+        self.assertIsInstance(user, TokenClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "user@user.com")
+        self.assertFalse(user.is_staff)
+        self.assertTrue(user.is_authenticated)
+
+    def test_user_state_is_cached(self):
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+
+        with self.assertNumQueries(0):
+            self.authentication.get_user(self.token)
+
+    def test_full_model_loaded_on_demand(self):
+        user = self.authentication.get_user(self.token)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.instance, self.user)
+
+    def test_user_deleted_after_authentication_rejected(self):
+        user = self.authentication.get_user(self.token)
+        get_user_model().objects.filter(pk=self.user.pk).delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            user.instance
+
+    def test_deactivated_user_rejected(self):
+        self.authentication.get_user(self.token)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_staff_flag_follows_account(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertTrue(self.authentication.get_user(self.token).is_staff)
+
+    def test_deleted_user_rejected(self):
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+
+class SchemaTests(TestCase):
+    def test_jwt_bearer_scheme_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEqual(
+            schema["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer",
+        )
+        me = schema["paths"]["/api/user/me/"]["get"]
+        self.assertIn({"jwtAuth": []}, me["security"])
+
+
+class ManageUserApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_retrieve_me(self):
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_update_me(self):
+        res = self.client.patch(ME_URL, {"password": "newpass123"})
+
+        self.user.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.user.check_password("newpass123"))
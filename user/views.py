@@ -1,7 +1,10 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from user.authentication import (
+    StatelessJWTAuthentication,
+    get_user_instance,
+)
 from user.serializers import UserSerializer
 
 
@@ -11,8 +14,9 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (StatelessJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
+    query_budgets = {"get": 3}
 
     def get_object(self):
-        return self.request.user
+        return get_user_instance(self.request.user)